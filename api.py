@@ -0,0 +1,320 @@
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from companies import company_key
+from content_pipeline import decode_content
+from settings import load_config, read_write_stamp
+
+# Columns returned per table; content is large and only returned with content=1
+LIST_COLUMNS = {
+    'candidate': ['id', 'title', 'time', 'candidate', 'createtime'],
+    'crawler': ['id', 'title', 'time', 'condition', 'tenderer', 'address', 'contacts', 'mobile', 'email', 'createtime'],
+}
+
+# URL name of each table
+TABLES = {'candidates': 'candidate', 'announcements': 'crawler'}
+
+
+class ResponseCache:
+    """Response Cache Class - bounded LRU cache of API responses with a time to live
+
+    Entries are dropped all at once when the scraper commits new rows (the write stamp
+    changed); the TTL bounds staleness for writes the stamp does not see, e.g. from
+    workers on other hosts.
+    """
+
+    def __init__(self, maxsize=1000, ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.stamp = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def validate(self, stamp):
+        """Drop every entry if the write stamp moved since the entries were cached"""
+        with self.lock:
+            if stamp != self.stamp:
+                if self.entries:
+                    self.invalidations += 1
+                self.entries.clear()
+                self.stamp = stamp
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                del self.entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def stats(self):
+        """Size, hit/miss and invalidation counters"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'invalidations': self.invalidations,
+            }
+
+
+class ApiError(Exception):
+    """Request error answered with an HTTP status and a message"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ReadApi:
+    """Read API Class - keyset-paginated read-only queries over the scraped tables
+
+    Pages are ordered by id, newest first, and continue with ?before=<id> from the "next"
+    value of the previous page, so deep pages cost the same as the first one. /changes
+    lists rows in insertion order after ?since=<id> for consumers polling for new rows.
+    Responses are cached in memory; repeated consumer queries do not reach the database.
+    """
+
+    def __init__(self, db, config_file='config.ini'):
+        config = load_config(config_file)
+        self.page_size = config.getint('API', 'PAGE_SIZE', fallback=50)
+        self.max_page_size = config.getint('API', 'MAX_PAGE_SIZE', fallback=500)
+        self.write_stamp = config.get('API', 'WRITE_STAMP_FILE', fallback='api_write.stamp')
+        self.cache = ResponseCache(config.getint('API', 'CACHE_SIZE', fallback=1000),
+                                   config.getint('API', 'CACHE_TTL', fallback=30))
+        self.db = db
+        # One connection shared by the request threads; the cache keeps most requests off it
+        self.db_lock = threading.Lock()
+
+    def handle(self, path, query):
+        """JSON-serializable response of a GET request, from the cache if possible"""
+        if path == '/health':
+            return {'status': 'ok', 'cache': self.cache.stats()}
+        params = {name: values[-1] for name, values in parse_qs(query).items()}
+        key = (path, tuple(sorted(params.items())))
+        self.cache.validate(read_write_stamp(self.write_stamp))
+        response = self.cache.get(key)
+        if response is None:
+            response = self.route(path, params)
+            self.cache.put(key, response)
+        return response
+
+    def route(self, path, params):
+        match = re.fullmatch(r'/(candidates|announcements)', path)
+        if match:
+            return self.list_records(TABLES[match.group(1)], params)
+        if path == '/changes':
+            return self.list_changes(params)
+        raise ApiError(404, f"Unknown path {path}")
+
+    def list_records(self, table_type, params):
+        """Newest rows of a table, filtered by date, tenderer (announcements) or company (candidates)"""
+        limit = self.limit(params)
+        table_name = self.db.get_table_name(table_type)
+        columns = self.columns(table_type, params)
+        joins, conditions, values = [], [], []
+
+        if params.get('date'):
+            conditions.append("r.`time` = %s")
+            values.append(self.date(params['date']))
+        if params.get('tenderer'):
+            if table_type != 'crawler':
+                raise ApiError(400, "tenderer filters announcements only")
+            conditions.append("r.`tenderer` = %s")
+            values.append(params['tenderer'].strip())
+        if params.get('company'):
+            if table_type != 'candidate':
+                raise ApiError(400, "company filters candidates only")
+            companies = self.db.companies
+            if not companies.enabled:
+                raise ApiError(400, "company filter needs the company index: set [Companies] ENABLED = true "
+                                    "and run python companies.py --backfill")
+            joins.append(f"JOIN `{companies.link_table}` l ON l.`candidate_id` = r.`id` "
+                         f"JOIN `{companies.company_table}` co ON co.`id` = l.`company_id`")
+            conditions.append("co.`norm_name` = %s")
+            values.append(company_key(params['company']))
+        if params.get('before'):
+            conditions.append("r.`id` < %s")
+            values.append(self.cursor_value(params['before']))
+
+        items = self.query(table_name, columns, joins, conditions, values, 'DESC', limit)
+        next_cursor = items[-1]['id'] if len(items) == limit else None
+        return {'items': items, 'next': next_cursor}
+
+    def list_changes(self, params):
+        """Rows inserted after the ?since=<id> cursor, oldest first"""
+        table_type = TABLES.get(params.get('table', 'announcements'))
+        if not table_type:
+            raise ApiError(400, f"table must be one of {', '.join(TABLES)}")
+        since = self.cursor_value(params.get('since', '0'))
+        limit = self.limit(params)
+        items = self.query(self.db.get_table_name(table_type), self.columns(table_type, params),
+                           [], ["r.`id` > %s"], [since], 'ASC', limit)
+        # The cursor always moves to the last row seen, an empty page keeps it where it was
+        return {'items': items, 'next': items[-1]['id'] if items else since}
+
+    def query(self, table_name, columns, joins, conditions, values, order, limit):
+        column_sql = ', '.join(f"r.`{column}`" for column in columns)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        sql = (f"SELECT {column_sql} FROM `{table_name}` r {' '.join(joins)} {where} "
+               f"ORDER BY r.`id` {order} LIMIT %s")
+        with self.db_lock:
+            if not self.db.connection or not self.db.connection.open:
+                self.db.connect()
+            cursor = self.db.connection.cursor()
+            try:
+                cursor.execute(sql, values + [limit])
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+            # Read-only transactions still hold a snapshot under REPEATABLE READ; end it so new rows show up
+            self.db.connection.commit()
+
+        items = []
+        for row in rows:
+            item = dict(zip(columns, row))
+            item['time'] = str(item['time'])
+            if 'content' in item:
+                item['content'] = decode_content(item['content'] or '')
+            items.append(item)
+        return items
+
+    def columns(self, table_type, params):
+        columns = list(LIST_COLUMNS[table_type])
+        if params.get('content') in ('1', 'true'):
+            columns.append('content')
+        return columns
+
+    def limit(self, params):
+        try:
+            limit = int(params.get('limit', self.page_size))
+        except ValueError:
+            raise ApiError(400, "limit must be an integer")
+        return max(1, min(limit, self.max_page_size))
+
+    def cursor_value(self, value):
+        if not value.isdigit():
+            raise ApiError(400, f"Invalid cursor {value}")
+        return int(value)
+
+    def date(self, value):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').strftime('%Y-%m-%d')
+        except ValueError:
+            raise ApiError(400, "date must be YYYY-MM-DD")
+
+
+class ApiServer:
+    """API Server Class - serves a ReadApi over HTTP in a background thread"""
+
+    def __init__(self, api, host='127.0.0.1', port=8080):
+        self.api = api
+        self.host = host
+        self.port = port
+        self.server = None
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        """Start serving in a background thread"""
+        api = self.api
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlsplit(self.path)
+                try:
+                    status, response = 200, api.handle(url.path.rstrip('/') or '/', url.query)
+                except ApiError as e:
+                    status, response = e.status, {'error': str(e)}
+                except Exception as e:
+                    logging.error(f"API request {self.path} failed: {e}")
+                    status, response = 500, {'error': 'Internal error'}
+                payload = json.dumps(response, ensure_ascii=False, default=str).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                # The request line is only formatted when debug logging is on
+                logging.debug("API %s - " + format, self.address_string(), *args)
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        logging.info(f"Read API serving at {self.url}")
+        return self
+
+    def stop(self):
+        """Stop the server"""
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def main():
+    """Main function - serve the read API until interrupted"""
+    import argparse
+    from log_config import setup_logging
+    from scraper import DatabaseManager
+
+    config = load_config()
+    parser = argparse.ArgumentParser(description='Read-only HTTP API over the candidate and announcement tables')
+    parser.add_argument('--host', default=config.get('API', 'HOST', fallback='127.0.0.1'), help='Listen address')
+    parser.add_argument('--port', type=int, default=config.getint('API', 'PORT', fallback=8080), help='Listen port')
+    args = parser.parse_args()
+
+    setup_logging('api.log')
+    db = DatabaseManager()
+    if not db.connect():
+        return
+    server = ApiServer(ReadApi(db), host=args.host, port=args.port).start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
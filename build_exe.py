@@ -1,14 +1,56 @@
+import argparse
+import glob
 import os
 import subprocess
 import sys
 import shutil
+import zipapp
 
-def main():
-    print("========================================")
-    print("Bid Information Scraper - EXE Builder")
-    print("========================================")
-    print()
-    
+# Executables built, as (name, script, entry point)
+TARGETS = [
+    ("BidScraper", "scraper.py", "scraper:main"),
+    ("BidScheduler", "scheduler.py", "scheduler:main"),
+]
+
+# Build modes: onefile unpacks itself to a temp folder on every launch, onedir starts
+# directly from its folder, zipapp packs only the project modules into a .pyz archive
+BUILD_MODES = ("onefile", "onedir", "zipapp")
+
+# Development modules left out of the .pyz archives, together with the test_*.py files
+DEV_MODULES = ("build_exe.py", "load_test.py", "mock_site.py", "startup_bench.py")
+
+
+def launch_command(name, mode):
+    """Command line a batch file uses to start a built target"""
+    if mode == "onedir":
+        return f'{name}\\{name}.exe'
+    if mode == "zipapp":
+        return f'python {name}.pyz'
+    return f'{name}.exe'
+
+
+def build_zipapps():
+    """Pack the project modules into one .pyz per target
+
+    Tests, the load test and benchmarks are not packed. The archives contain no third-party packages, requirements.txt must be installed
+    in the Python environment that runs them.
+    """
+    staging = os.path.join("build", "zipapp")
+    if os.path.exists(staging):
+        shutil.rmtree(staging)
+    os.makedirs(staging)
+    for path in glob.glob("*.py"):
+        if path not in DEV_MODULES and not path.startswith("test_"):
+            shutil.copy(path, staging)
+
+    for name, _, entry_point in TARGETS:
+        print(f"Building {name}.pyz...")
+        zipapp.create_archive(staging, os.path.join("dist", f"{name}.pyz"),
+                              interpreter="/usr/bin/env python3", main=entry_point, compressed=True)
+
+
+def build_pyinstaller(mode):
+    """Build one PyInstaller executable per target"""
     # Check if PyInstaller is installed
     try:
         import PyInstaller
@@ -16,33 +58,40 @@ def main():
         print("PyInstaller not found. Installing...")
         subprocess.run([sys.executable, "-m", "pip", "install", "pyinstaller"], check=True)
     
+    for name, script, _ in TARGETS:
+        print(f"Building {name} executable with PyInstaller ({mode})...")
+        subprocess.run([
+            sys.executable, "-m", "PyInstaller",
+            f"--name={name}",
+            f"--{mode}",  # Single self-unpacking executable, or a folder that starts faster
+            "--clean",    # Clean PyInstaller cache
+            "--add-data", "config.ini;.",  # Add config file
+            "--icon=NONE",  # No icon (replace with icon path if you have one)
+            script
+        ], check=True)
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build standalone executables of the scraper and scheduler')
+    parser.add_argument('--mode', choices=BUILD_MODES, default='onefile',
+                        help='onefile: single exe (default); onedir: exe folder, faster startup; '
+                             'zipapp: .pyz archives for an existing Python environment')
+    args = parser.parse_args()
+    
+    print("========================================")
+    print("Bid Information Scraper - EXE Builder")
+    print("========================================")
+    print()
+    
     # Create dist directory if it doesn't exist
     if not os.path.exists("dist"):
         os.makedirs("dist")
     
-    # Build the scraper executable
-    print("Building scraper executable with PyInstaller...")
-    subprocess.run([
-        sys.executable, "-m", "PyInstaller",
-        "--name=BidScraper",
-        "--onefile",  # Create a single executable
-        "--clean",    # Clean PyInstaller cache
-        "--add-data", "config.ini;.",  # Add config file
-        "--icon=NONE",  # No icon (replace with icon path if you have one)
-        "scraper.py"    # Main script
-    ], check=True)
-    
-    # Build the scheduler executable
-    print("\nBuilding scheduler executable with PyInstaller...")
-    subprocess.run([
-        sys.executable, "-m", "PyInstaller",
-        "--name=BidScheduler",
-        "--onefile",  # Create a single executable
-        "--clean",    # Clean PyInstaller cache
-        "--add-data", "config.ini;.",  # Add config file
-        "--icon=NONE",  # No icon (replace with icon path if you have one)
-        "scheduler.py"   # Scheduler script
-    ], check=True)
+    if args.mode == "zipapp":
+        build_zipapps()
+    else:
+        build_pyinstaller(args.mode)
     
     # Copy additional files to the dist directory
     print("Copying additional files...")
@@ -54,7 +103,7 @@ def main():
     with open(os.path.join("dist", "start_scraper.bat"), "w") as f:
         f.write('@echo off\r\n')
         f.write('echo Starting Bid Scraper...\r\n')
-        f.write('BidScraper.exe\r\n')
+        f.write(launch_command('BidScraper', args.mode) + '\r\n')
         f.write('pause\r\n')
     
     # Create a simple batch file to run the scheduler
@@ -62,7 +111,7 @@ def main():
         f.write('@echo off\r\n')
         f.write('echo Starting Bid Scheduler...\r\n')
         f.write('echo This will run in the background. Close this window to stop.\r\n')
-        f.write('BidScheduler.exe\r\n')
+        f.write(launch_command('BidScheduler', args.mode) + '\r\n')
         f.write('pause\r\n')
     
     print()
@@ -74,8 +123,8 @@ def main():
     print("Usage:")
     print("1. Navigate to the 'dist' folder")
     print("2. Run one of the following:")
-    print("   - BidScraper.exe (or start_scraper.bat) - for manual scraping")
-    print("   - BidScheduler.exe (or start_scheduler.bat) - for scheduled scraping")
+    print(f"   - {launch_command('BidScraper', args.mode)} (or start_scraper.bat) - for manual scraping")
+    print(f"   - {launch_command('BidScheduler', args.mode)} (or start_scheduler.bat) - for scheduled scraping")
     print()
 
 if __name__ == "__main__":
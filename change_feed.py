@@ -0,0 +1,305 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from settings import load_config
+
+# Woken on every publish so consumers in the same process see new events without polling
+_published = threading.Condition()
+
+
+def event_record(record, include_content=False):
+    """Published fields of a record: its columns, the detail URL and project code, content optionally"""
+    fields = {column: value for column, value in record.items()
+              if not column.startswith('_') and column != 'createtime'}
+    if not include_content:
+        fields.pop('content', None)
+    if record.get('_url'):
+        fields['url'] = record['_url']
+    if record.get('_project_code'):
+        fields['project_code'] = record['_project_code']
+    return fields
+
+
+class ChangeFeed:
+    """Change Feed Class - append-only local log of committed inserts and rewrites
+
+    Every event gets a sequence number from an AUTOINCREMENT key, so the cursor only ever
+    increases and is never reused, even after old events are pruned. Consumers read the
+    events after their offset and store the new offset when they have processed them;
+    a consumer that stops resumes where it left off.
+    """
+
+    def __init__(self, config_file='config.ini', path=None):
+        config = load_config(config_file)
+        self.enabled = config.getboolean('Feed', 'ENABLED', fallback=False) or path is not None
+        self.path = path or config.get('Feed', 'FEED_FILE', fallback='feed.db')
+        self.include_content = config.getboolean('Feed', 'INCLUDE_CONTENT', fallback=False)
+        self.retention_days = config.getint('Feed', 'RETENTION_DAYS', fallback=7)
+        self.lock = threading.Lock()
+        self.connection = None
+
+    def open(self):
+        """Open the feed file on first use and drop events older than RETENTION_DAYS"""
+        with self.lock:
+            if self.connection:
+                return
+            self.connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS events (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    table_name TEXT NOT NULL,
+                    op TEXT NOT NULL,
+                    record_id INTEGER NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at INTEGER NOT NULL
+                )
+            """)
+            self.connection.execute("CREATE INDEX IF NOT EXISTS idx_events_created ON events (created_at)")
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS offsets (
+                    consumer TEXT PRIMARY KEY,
+                    seq INTEGER NOT NULL,
+                    updated_at INTEGER NOT NULL
+                )
+            """)
+            if self.retention_days > 0:
+                cutoff = int(time.time()) - self.retention_days * 86400
+                self.connection.execute("DELETE FROM events WHERE created_at < ?", (cutoff,))
+
+    def publish(self, table_name, op, rows):
+        """Append one event per (record_id, record) pair in one transaction, returns the last sequence number
+
+        Called after the database commit, so consumers never see rows that were rolled back.
+        """
+        if not self.enabled or not rows:
+            return None
+        self.open()
+        now = int(time.time())
+        events = [(table_name, op, record_id,
+                   json.dumps(event_record(record, self.include_content), ensure_ascii=False, default=str), now)
+                  for record_id, record in rows]
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                self.connection.executemany(
+                    "INSERT INTO events (table_name, op, record_id, payload, created_at) VALUES (?, ?, ?, ?, ?)", events)
+                last_seq = self.connection.execute("SELECT MAX(seq) FROM events").fetchone()[0]
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+        with _published:
+            _published.notify_all()
+        logging.debug("Published %d %s events of %s up to seq %d", len(events), op, table_name, last_seq)
+        return last_seq
+
+    def read(self, after, limit=100):
+        """Events with a sequence number above after, oldest first"""
+        self.open()
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT seq, table_name, op, record_id, payload, created_at FROM events "
+                "WHERE seq > ? ORDER BY seq LIMIT ?", (after, limit)).fetchall()
+        return [{
+            'seq': seq,
+            'table': table_name,
+            'op': op,
+            'id': record_id,
+            'record': json.loads(payload),
+            'created_at': datetime.fromtimestamp(created_at).isoformat(timespec='seconds'),
+        } for seq, table_name, op, record_id, payload, created_at in rows]
+
+    def wait(self, after, timeout):
+        """Wait until an event above after is published in this process or timeout seconds pass
+
+        Events published by other processes are picked up when the timeout expires.
+        """
+        with _published:
+            if self.last_seq() > after:
+                return True
+            _published.wait(timeout)
+        return self.last_seq() > after
+
+    def last_seq(self):
+        self.open()
+        with self.lock:
+            return self.connection.execute("SELECT COALESCE(MAX(seq), 0) FROM events").fetchone()[0]
+
+    def get_offset(self, consumer):
+        """Sequence number a consumer has processed up to, 0 for a new consumer"""
+        self.open()
+        with self.lock:
+            row = self.connection.execute("SELECT seq FROM offsets WHERE consumer = ?", (consumer,)).fetchone()
+        return row[0] if row else 0
+
+    def commit_offset(self, consumer, seq):
+        """Store a consumer's offset, it never moves backwards"""
+        self.open()
+        with self.lock:
+            self.connection.execute(
+                "INSERT INTO offsets (consumer, seq, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(consumer) DO UPDATE SET seq = MAX(seq, excluded.seq), updated_at = excluded.updated_at",
+                (consumer, seq, int(time.time())))
+
+    def status(self):
+        """Event count, last sequence number and consumer offsets"""
+        self.open()
+        with self.lock:
+            count, last_seq = self.connection.execute("SELECT COUNT(*), COALESCE(MAX(seq), 0) FROM events").fetchone()
+            offsets = dict(self.connection.execute("SELECT consumer, seq FROM offsets ORDER BY consumer").fetchall())
+        return {'events': count, 'last_seq': last_seq, 'offsets': offsets}
+
+    def close(self):
+        with self.lock:
+            if self.connection:
+                self.connection.close()
+                self.connection = None
+
+
+class WebhookDispatcher(threading.Thread):
+    """Background thread that POSTs feed events to a webhook in batches
+
+    Delivery is at least once and in order: the offset moves only after a 2xx response, a
+    failed batch is retried with exponential backoff and then again on the next round.
+    Receivers de-duplicate by seq.
+    """
+
+    def __init__(self, feed, config_file='config.ini', url=None):
+        super().__init__(name='WebhookDispatcher', daemon=True)
+        config = load_config(config_file)
+        self.feed = feed
+        self.url = url or config.get('Feed', 'WEBHOOK_URL', fallback='')
+        self.consumer = config.get('Feed', 'WEBHOOK_CONSUMER', fallback='webhook')
+        self.batch_size = config.getint('Feed', 'WEBHOOK_BATCH_SIZE', fallback=100)
+        self.max_retries = config.getint('Feed', 'WEBHOOK_MAX_RETRIES', fallback=5)
+        self.timeout = config.getfloat('Feed', 'WEBHOOK_TIMEOUT', fallback=10)
+        self.interval = config.getfloat('Feed', 'WEBHOOK_INTERVAL', fallback=1.0)
+        self.stop_event = threading.Event()
+        self.session = None
+        self.delivered_count = 0
+
+    def post(self, events):
+        """POST one batch, raises if the webhook does not answer with a 2xx status"""
+        if self.session is None:
+            import requests
+            self.session = requests.Session()
+        response = self.session.post(self.url, json={'events': events, 'next': events[-1]['seq']},
+                                     headers={'X-Feed-Cursor': str(events[-1]['seq'])}, timeout=self.timeout)
+        response.raise_for_status()
+
+    def dispatch_once(self):
+        """Deliver one batch after the stored offset, returns the number of events delivered"""
+        offset = self.feed.get_offset(self.consumer)
+        events = self.feed.read(offset, self.batch_size)
+        if not events:
+            return 0
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.post(events)
+                break
+            except Exception as e:
+                if attempt == self.max_retries or self.stop_event.is_set():
+                    raise
+                delay = min(60, 2 ** attempt)
+                logging.warning(f"Webhook delivery of seq {events[0]['seq']}-{events[-1]['seq']} failed ({e}), "
+                                f"retrying in {delay}s")
+                self.stop_event.wait(delay)
+        self.feed.commit_offset(self.consumer, events[-1]['seq'])
+        self.delivered_count += len(events)
+        logging.info("Delivered feed events up to seq %d to %s", events[-1]['seq'], self.url)
+        return len(events)
+
+    def run(self):
+        """Deliver continuously until stopped"""
+        while not self.stop_event.is_set():
+            try:
+                if self.dispatch_once():
+                    continue
+            except Exception as e:
+                logging.error(f"Webhook delivery failed, events are kept in the feed: {e}")
+                self.stop_event.wait(self.interval)
+                continue
+            self.feed.wait(self.feed.get_offset(self.consumer), self.interval)
+
+    def stop(self, flush_timeout=30.0):
+        """Stop the thread and deliver what is left within flush_timeout seconds"""
+        self.stop_event.set()
+        with _published:
+            _published.notify_all()
+        if self.is_alive():
+            self.join()
+
+        deadline = time.monotonic() + flush_timeout
+        while time.monotonic() < deadline:
+            try:
+                if not self.dispatch_once():
+                    break
+            except Exception as e:
+                logging.warning(f"Webhook delivery failed: {e}")
+                break
+        pending = self.feed.last_seq() - self.feed.get_offset(self.consumer)
+        if pending > 0:
+            logging.warning(f"{pending} feed events not delivered to {self.url} yet, they are sent on the next run")
+        logging.info(f"Webhook dispatcher delivered {self.delivered_count} events")
+
+
+def main():
+    """Main function - show the feed, read it as a consumer, or run the webhook dispatcher"""
+    import argparse
+    from log_config import setup_logging
+
+    parser = argparse.ArgumentParser(description='Change feed of newly stored candidate and announcement rows')
+    parser.add_argument('--consumer', type=str, default=None,
+                        help='Print the events after this consumer\'s offset and advance it')
+    parser.add_argument('--follow', action='store_true', help='With --consumer, keep waiting for new events')
+    parser.add_argument('--limit', type=int, default=100, help='Events read per batch')
+    parser.add_argument('--webhook', action='store_true', help='Deliver events to [Feed] WEBHOOK_URL until interrupted')
+    args = parser.parse_args()
+
+    setup_logging('feed.log')
+    config = load_config()
+    feed = ChangeFeed(path=config.get('Feed', 'FEED_FILE', fallback='feed.db'))
+
+    if args.webhook:
+        dispatcher = WebhookDispatcher(feed)
+        if not dispatcher.url:
+            print("Set [Feed] WEBHOOK_URL in config.ini first")
+            return
+        dispatcher.start()
+        try:
+            while dispatcher.is_alive():
+                time.sleep(1)
+        except KeyboardInterrupt:
+            dispatcher.stop()
+        return
+
+    if args.consumer:
+        try:
+            while True:
+                events = feed.read(feed.get_offset(args.consumer), args.limit)
+                for event in events:
+                    print(json.dumps(event, ensure_ascii=False))
+                if events:
+                    feed.commit_offset(args.consumer, events[-1]['seq'])
+                    continue
+                if not args.follow:
+                    break
+                feed.wait(feed.get_offset(args.consumer), 1.0)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    status = feed.status()
+    print(f"{status['events']} events in {feed.path}, last seq {status['last_seq']}")
+    for consumer, seq in status['offsets'].items():
+        print(f"  {consumer}: seq {seq} ({status['last_seq'] - seq} behind)")
+
+
+if __name__ == "__main__":
+    main()
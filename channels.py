@@ -0,0 +1,193 @@
+import configparser
+import logging
+import threading
+import time
+
+DEFAULT_BASE_URL = 'https://zb.shudaojt.com'
+
+# Columns written for each table type (createtime is added on insert)
+TABLE_COLUMNS = {
+    'candidate': ['title', 'time', 'content', 'candidate'],
+    'crawler': ['title', 'time', 'condition', 'content', 'tenderer', 'address', 'contacts', 'mobile', 'email'],
+}
+
+# Channels used when config.ini does not declare any [Channel:*] sections
+DEFAULT_CHANNELS = {
+    'hxrgs': {
+        'NAME': '中标候选人公示',
+        'LIST_URL': '{base_url}/hxrgs/people.html',
+        'PAGE_URL': '{base_url}/hxrgs/{page}.html',
+        'CONTAINER': 'div.zhongbiaoPeople#main',
+        'ITEM': 'div.list-details-right-single',
+        'DATE': 'div.single-time',
+        'CONTENT': 'div.zhongbiaoPeople, div.detail-content',
+        'EXTRACTOR': 'candidate',
+        'TABLE': 'candidate',
+        'PRIORITY': '2',
+    },
+    'zbgg': {
+        'NAME': '招标公告',
+        'LIST_URL': '{base_url}/zbgg/zhaobiao.html',
+        'PAGE_URL': '{base_url}/zbgg/{page}.html',
+        'CONTAINER': 'div.zhaobiao-content#main',
+        'ITEM': 'div.list-details-right-single',
+        'DATE': 'div.single-time',
+        'CONTENT': 'div.zhaobiao-content, div.detail-content, div#main',
+        'EXTRACTOR': 'announcement',
+        'TABLE': 'crawler',
+        'PRIORITY': '1',
+    },
+}
+
+
+class ChannelConfig:
+    """Channel Configuration Class - one section of the site and how to crawl it"""
+
+    def __init__(self, name, title, list_url, page_url, container, item, date, content, extractor, table,
+                 base_url=DEFAULT_BASE_URL, priority=10):
+        self.name = name              # Channel key, e.g. hxrgs
+        self.title = title            # Human readable name
+        self.list_url = list_url      # First list page, may contain {base_url}
+        self.page_url = page_url      # Later list pages, may contain {base_url} and {page}
+        self.container = container    # CSS selector of the list container
+        self.item = item              # CSS selector of one list item inside the container
+        self.date = date              # CSS selector of the date inside a list item
+        self.content = content        # CSS selectors tried in order for the stored detail content
+        self.extractor = extractor    # Detail extractor: candidate or announcement
+        self.table = table            # Table type (candidate, crawler) or a literal table name
+        self.base_url = base_url
+        self.priority = priority      # Channels with lower values are crawled first
+
+    def get_list_url(self, base_url=None):
+        """First list page URL"""
+        return self.list_url.format(base_url=base_url or self.base_url)
+
+    def get_page_url(self, page_num, base_url=None):
+        """List page URL for a page number"""
+        if page_num == 1:
+            return self.get_list_url(base_url)
+        return self.page_url.format(base_url=base_url or self.base_url, page=page_num)
+
+    @classmethod
+    def from_options(cls, name, options, base_url=DEFAULT_BASE_URL):
+        """Build a channel from a dict of config options, falling back to the defaults"""
+        defaults = DEFAULT_CHANNELS.get(name, {})
+
+        def option(key):
+            value = options.get(key, defaults.get(key))
+            if value is None:
+                raise ValueError(f"Channel {name} is missing option {key}")
+            return value
+
+        return cls(
+            name=name,
+            title=options.get('NAME', defaults.get('NAME', name)),
+            list_url=option('LIST_URL'),
+            page_url=option('PAGE_URL'),
+            container=option('CONTAINER'),
+            item=options.get('ITEM', defaults.get('ITEM', 'div.list-details-right-single')),
+            date=options.get('DATE', defaults.get('DATE', 'div.single-time')),
+            content=[selector.strip() for selector in option('CONTENT').split(',') if selector.strip()],
+            extractor=option('EXTRACTOR'),
+            table=option('TABLE'),
+            base_url=base_url,
+            priority=int(options.get('PRIORITY', defaults.get('PRIORITY', 10))),
+        )
+
+
+def load_channels(config):
+    """Load all [Channel:*] sections from a ConfigParser, keyed by channel name"""
+    base_url = config.get('Website', 'BASE_URL', fallback=DEFAULT_BASE_URL).rstrip('/') or DEFAULT_BASE_URL
+
+    channels = {}
+    for section in config.sections():
+        if not section.startswith('Channel:'):
+            continue
+        name = section.split(':', 1)[1].strip()
+        # ConfigParser lower-cases option names, the defaults use upper case
+        options = {key.upper(): value for key, value in config.items(section)}
+        try:
+            channels[name] = ChannelConfig.from_options(name, options, base_url)
+        except ValueError as e:
+            logging.error(f"Invalid channel configuration: {e}")
+
+    # Built-in channels stay available when config.ini does not declare them
+    for name in DEFAULT_CHANNELS:
+        if name not in channels:
+            channels[name] = ChannelConfig.from_options(name, {}, base_url)
+
+    return channels
+
+
+def get_enabled_channels(config, channels):
+    """Channel names listed in [Scraping] CHANNELS, defaults to all known channels"""
+    try:
+        names = [name.strip() for name in config.get('Scraping', 'CHANNELS').split(',') if name.strip()]
+    except (configparser.NoSectionError, configparser.NoOptionError):
+        return list(channels)
+
+    unknown = [name for name in names if name not in channels]
+    if unknown:
+        logging.warning(f"Unknown channels in configuration, ignored: {', '.join(unknown)}")
+    return [name for name in names if name in channels]
+
+
+class RateLimiter:
+    """Thread-safe rate limiter enforcing a minimum interval between requests across all channels"""
+
+    def __init__(self, min_interval):
+        self.min_interval = max(0.0, float(min_interval))
+        self.lock = threading.Lock()
+        self.next_time = 0.0
+
+    def wait(self):
+        """Block until the next request slot is available"""
+        if not self.min_interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_time)
+            self.next_time = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class CrawlBudget:
+    """Crawl Budget Class - wall-clock and request limits shared by all channels of a run
+
+    The clock starts when the budget is created. Retried requests count too, they load the
+    site just the same.
+    """
+
+    def __init__(self, seconds=None, max_requests=None):
+        self.started = time.monotonic()
+        self.deadline = self.started + seconds if seconds else None
+        self.max_requests = max_requests or None
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def consume(self):
+        """Count one request"""
+        with self.lock:
+            self.requests += 1
+
+    def exhausted(self):
+        """Why the budget is used up ('time' or 'requests'), None while work may continue"""
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return 'time'
+        if self.max_requests is not None and self.requests >= self.max_requests:
+            return 'requests'
+        return None
+
+    def remaining_seconds(self):
+        """Seconds left, None without a time limit"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def summary(self):
+        return {
+            'requests': self.requests,
+            'elapsed': round(time.monotonic() - self.started, 1),
+            'exhausted': self.exhausted(),
+        }
@@ -0,0 +1,242 @@
+import configparser
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from settings import load_config
+
+
+class CheckpointJournal:
+    """Checkpoint Journal Class - records crawl progress in a local SQLite file for crash-safe resume"""
+
+    def __init__(self, config_file='config.ini', path=None):
+        """Open (or create) the checkpoint journal"""
+        if path is None:
+            config = load_config(config_file)
+            try:
+                path = config.get('Checkpoint', 'CHECKPOINT_FILE')
+            except (configparser.NoSectionError, configparser.NoOptionError):
+                path = 'checkpoint.db'
+        self.path = path
+        self.lock = threading.Lock()
+
+        # WAL keeps every committed mark durable if the process dies mid-run
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_key TEXT PRIMARY KEY,
+                channel TEXT NOT NULL,
+                start_date TEXT NOT NULL,
+                end_date TEXT NOT NULL,
+                status TEXT NOT NULL,
+                started_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                covered_end TEXT
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                run_key TEXT NOT NULL,
+                page_num INTEGER NOT NULL,
+                completed_at TEXT NOT NULL,
+                PRIMARY KEY (run_key, page_num)
+            );
+            CREATE TABLE IF NOT EXISTS items (
+                run_key TEXT NOT NULL,
+                href TEXT NOT NULL,
+                processed_at TEXT NOT NULL,
+                PRIMARY KEY (run_key, href)
+            );
+            CREATE TABLE IF NOT EXISTS job_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                started_at TEXT NOT NULL,
+                finished_at TEXT,
+                duration REAL,
+                detail TEXT NOT NULL DEFAULT ''
+            );
+            CREATE INDEX IF NOT EXISTS idx_job_runs_job ON job_runs (job_id, id);
+        """)
+        # Journals written before the run ledger had no covered_end; their runs count as not covered
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(runs)")}
+        if 'covered_end' not in columns:
+            self.connection.execute("ALTER TABLE runs ADD COLUMN covered_end TEXT")
+        self.connection.commit()
+
+    @staticmethod
+    def make_run_key(channel, start_date, end_date):
+        """Build the journal key for a channel and date range"""
+        return f"{channel}:{start_date}:{end_date}"
+
+    def begin(self, channel, start_date, end_date, resume=False):
+        """Start a run, keeping previous progress only when resuming an unfinished run"""
+        run_key = self.make_run_key(channel, start_date, end_date)
+        now = datetime.now().isoformat(timespec='seconds')
+        with self.lock:
+            row = self.connection.execute("SELECT status FROM runs WHERE run_key = ?", (run_key,)).fetchone()
+            if resume and row and row[0] == 'running':
+                self.connection.execute("UPDATE runs SET updated_at = ? WHERE run_key = ?", (now, run_key))
+                logging.info(f"Resuming unfinished run {run_key} from checkpoint")
+            else:
+                if resume:
+                    logging.info(f"No unfinished run found for {run_key}, starting from the beginning")
+                self.connection.execute("DELETE FROM pages WHERE run_key = ?", (run_key,))
+                self.connection.execute("DELETE FROM items WHERE run_key = ?", (run_key,))
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO runs (run_key, channel, start_date, end_date, status, started_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, 'running', ?, ?)",
+                    (run_key, channel, start_date, end_date, now, now)
+                )
+            self.connection.commit()
+        return run_key
+
+    def resume_page(self, run_key):
+        """First list page that has not been completed yet"""
+        with self.lock:
+            completed = {row[0] for row in self.connection.execute(
+                "SELECT page_num FROM pages WHERE run_key = ?", (run_key,))}
+        page_num = 1
+        while page_num in completed:
+            page_num += 1
+        return page_num
+
+    def is_processed(self, run_key, href):
+        """Check whether a detail link has already been processed"""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT 1 FROM items WHERE run_key = ? AND href = ?", (run_key, href)).fetchone()
+        return row is not None
+
+    def mark_processed(self, run_key, href):
+        """Record a processed detail link"""
+        now = datetime.now().isoformat(timespec='seconds')
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO items (run_key, href, processed_at) VALUES (?, ?, ?)", (run_key, href, now))
+            self.connection.commit()
+
+    def mark_page_completed(self, run_key, page_num):
+        """Record a list page whose links were all processed"""
+        now = datetime.now().isoformat(timespec='seconds')
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO pages (run_key, page_num, completed_at) VALUES (?, ?, ?)",
+                (run_key, page_num, now))
+            self.connection.execute("UPDATE runs SET updated_at = ? WHERE run_key = ?", (now, run_key))
+            self.connection.commit()
+
+    @staticmethod
+    def last_complete_day(end_date, started_at):
+        """Last day of a range that a run started at started_at has crawled completely
+        
+        Notices keep being published on the day a run starts, so only the days before it count.
+        """
+        day_before = (datetime.fromisoformat(started_at) - timedelta(days=1)).strftime('%Y-%m-%d')
+        return min(end_date, day_before)
+
+    def finish(self, run_key, record=True):
+        """Mark a run as finished so the next run starts fresh
+        
+        The days of its range before the run started are recorded in the run ledger, unless
+        record is False (refresh runs re-check days that may still be missing).
+        """
+        now = datetime.now().isoformat(timespec='seconds')
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT end_date, started_at FROM runs WHERE run_key = ?", (run_key,)).fetchone()
+            covered_end = self.last_complete_day(*row) if row and record else None
+            self.connection.execute(
+                "UPDATE runs SET status = 'finished', covered_end = ?, updated_at = ? WHERE run_key = ?",
+                (covered_end, now, run_key))
+            self.connection.execute("DELETE FROM pages WHERE run_key = ?", (run_key,))
+            self.connection.execute("DELETE FROM items WHERE run_key = ?", (run_key,))
+            self.connection.commit()
+
+    def record_covered(self, run_key, start_date, end_date):
+        """Record part of a run's range as complete, e.g. the newest days of a run cut short by its budget
+        
+        Like finish, only the days before the run started are recorded.
+        """
+        now = datetime.now().isoformat(timespec='seconds')
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT channel, started_at FROM runs WHERE run_key = ?", (run_key,)).fetchone()
+            if row is None:
+                return
+            channel, started_at = row
+            covered_end = self.last_complete_day(end_date, started_at)
+            if covered_end < start_date:
+                return
+            self.connection.execute(
+                "INSERT OR REPLACE INTO runs (run_key, channel, start_date, end_date, status, started_at, updated_at, "
+                "covered_end) VALUES (?, ?, ?, ?, 'finished', ?, ?, ?)",
+                (self.make_run_key(channel, start_date, end_date), channel, start_date, end_date, started_at, now,
+                 covered_end))
+            self.connection.commit()
+
+    def covered_dates(self, channel, start_date, end_date):
+        """Dates between start_date and end_date (inclusive) the run ledger records as covered for a channel"""
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT start_date, covered_end FROM runs WHERE channel = ? AND status = 'finished' "
+                "AND covered_end IS NOT NULL AND covered_end >= ? AND start_date <= ?",
+                (channel, start_date, end_date)).fetchall()
+
+        covered = set()
+        for run_start, run_end in rows:
+            day = datetime.strptime(max(run_start, start_date), '%Y-%m-%d')
+            last = datetime.strptime(min(run_end, end_date), '%Y-%m-%d')
+            while day <= last:
+                covered.add(day.strftime('%Y-%m-%d'))
+                day += timedelta(days=1)
+        return covered
+
+    def begin_job(self, job_id, status='running', detail=''):
+        """Record the start of a scheduled job run, returns its history id"""
+        now = datetime.now().isoformat(timespec='seconds')
+        with self.lock:
+            cursor = self.connection.execute(
+                "INSERT INTO job_runs (job_id, status, started_at, detail) VALUES (?, ?, ?, ?)",
+                (job_id, status, now, detail))
+            self.connection.commit()
+        return cursor.lastrowid
+
+    def end_job(self, run_id, status, duration, detail=''):
+        """Record how a job run ended (success, failed, skipped) and how many seconds it took"""
+        now = datetime.now().isoformat(timespec='seconds')
+        with self.lock:
+            self.connection.execute(
+                "UPDATE job_runs SET status = ?, finished_at = ?, duration = ?, detail = ? WHERE id = ?",
+                (status, now, round(duration, 3), detail, run_id))
+            self.connection.commit()
+
+    def job_history(self, job_id=None, limit=20):
+        """Latest job runs, newest first, of one job or of all jobs"""
+        sql = "SELECT id, job_id, status, started_at, finished_at, duration, detail FROM job_runs"
+        params = []
+        if job_id:
+            sql += " WHERE job_id = ?"
+            params.append(job_id)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        with self.lock:
+            rows = self.connection.execute(sql, params).fetchall()
+        columns = ('id', 'job_id', 'status', 'started_at', 'finished_at', 'duration', 'detail')
+        return [dict(zip(columns, row)) for row in rows]
+
+    def job_stats(self):
+        """Run count, outcome counts and average/longest duration of every job"""
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT job_id, COUNT(*), SUM(status = 'success'), SUM(status = 'failed'), "
+                "SUM(status IN ('skipped', 'missed', 'overlap')), AVG(duration), MAX(duration), MAX(started_at) "
+                "FROM job_runs GROUP BY job_id ORDER BY job_id").fetchall()
+        columns = ('job_id', 'runs', 'success', 'failed', 'skipped', 'avg_duration', 'max_duration', 'last_started')
+        return [dict(zip(columns, row)) for row in rows]
+
+    def close(self):
+        """Close the journal"""
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,253 @@
+import logging
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime
+
+from settings import load_config
+
+# Placeholder stored in the candidate column when no names were found
+NO_CANDIDATE = 'No candidate information extracted'
+
+# Legal-form variants written differently across notices, mapped to one spelling
+SUFFIX_VARIANTS = [
+    ('有限责任公司', '有限公司'),
+    ('股份公司', '股份有限公司'),
+    ('集团公司', '集团有限公司'),
+]
+
+SCHEMAS = {
+    'mysql': [
+        """
+        CREATE TABLE IF NOT EXISTS `{company}` (
+            `id` INT UNSIGNED NOT NULL AUTO_INCREMENT,
+            `name` VARCHAR(255) NOT NULL,
+            `norm_name` VARCHAR(255) NOT NULL,
+            `createtime` INT UNSIGNED NOT NULL,
+            PRIMARY KEY (`id`),
+            UNIQUE KEY `uniq_norm_name` (`norm_name`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS `{link}` (
+            `company_id` INT UNSIGNED NOT NULL,
+            `candidate_id` INT UNSIGNED NOT NULL,
+            `rank` TINYINT UNSIGNED NOT NULL,
+            PRIMARY KEY (`company_id`, `candidate_id`),
+            KEY `idx_candidate` (`candidate_id`, `rank`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """,
+    ],
+    'sqlite': [
+        """
+        CREATE TABLE IF NOT EXISTS `{company}` (
+            `id` INTEGER PRIMARY KEY AUTOINCREMENT,
+            `name` TEXT NOT NULL, `norm_name` TEXT NOT NULL UNIQUE, `createtime` INTEGER NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS `{link}` (
+            `company_id` INTEGER NOT NULL, `candidate_id` INTEGER NOT NULL, `rank` INTEGER NOT NULL,
+            PRIMARY KEY (`company_id`, `candidate_id`)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS `idx_{link}_candidate` ON `{link}` (`candidate_id`, `rank`)",
+    ],
+}
+
+INSERT_IGNORE = {'mysql': 'INSERT IGNORE', 'sqlite': 'INSERT OR IGNORE'}
+
+
+def normalize_company_name(name):
+    """Canonical spelling of a company name
+
+    Full-width letters, digits and spaces become half-width (NFKC), whitespace is removed,
+    parentheses become the full-width ones used in Chinese registrations, and legal-form
+    suffix variants are unified.
+    """
+    if not name:
+        return ''
+    name = unicodedata.normalize('NFKC', name)
+    name = re.sub(r'\s+', '', name)
+    name = name.replace('(', '（').replace(')', '）').replace('（集团）', '集团')
+    name = name.strip('，,;；、.。')
+    for variant, canonical in SUFFIX_VARIANTS:
+        if name.endswith(variant):
+            name = name[:-len(variant)] + canonical
+            break
+    return name
+
+
+def company_key(name):
+    """Lookup key of a company name, case-insensitive for Latin letters"""
+    return normalize_company_name(name).upper()
+
+
+def split_candidates(candidate):
+    """Candidate names in rank order from the candidate column"""
+    if not candidate or candidate == NO_CANDIDATE:
+        return []
+    return [name.strip() for name in candidate.split(';') if name.strip()]
+
+
+class CompanyIndex:
+    """Company Index Class - company dictionary and candidate<->company link table
+
+    Each candidate row is linked to the companies named in it, with their rank, so
+    "which bids did company X appear in" is an indexed join instead of a string scan.
+    Company ids are cached by key so repeated names do not hit the database.
+    """
+
+    def __init__(self, config_file='config.ini', dialect='mysql'):
+        config = load_config(config_file)
+        self.enabled = config.getboolean('Companies', 'ENABLED', fallback=False)
+        self.cache_size = config.getint('Companies', 'CACHE_SIZE', fallback=10000)
+        self.company_table = config.get('Tables', 'COMPANY_TABLE', fallback='fa_company')
+        self.link_table = config.get('Tables', 'COMPANY_LINK_TABLE', fallback='fa_candidate_company')
+        self.dialect = dialect
+
+        self.lock = threading.Lock()
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.tables_ready = False
+
+    def create_tables(self, cursor):
+        """Create the company and link tables if needed"""
+        for sql in SCHEMAS[self.dialect]:
+            cursor.execute(sql.format(company=self.company_table, link=self.link_table))
+        self.tables_ready = True
+
+    def get_company_id(self, cursor, name):
+        """Id of a company, inserted into the dictionary on first sight"""
+        key = company_key(name)
+        if not key:
+            return None
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return self.cache[key]
+            self.misses += 1
+
+        cursor.execute(
+            f"{INSERT_IGNORE[self.dialect]} INTO `{self.company_table}` (`name`, `norm_name`, `createtime`) "
+            f"VALUES (%s, %s, %s)", (normalize_company_name(name), key, int(datetime.now().timestamp())))
+        cursor.execute(f"SELECT `id` FROM `{self.company_table}` WHERE `norm_name` = %s", (key,))
+        company_id = cursor.fetchone()[0]
+
+        with self.lock:
+            self.cache[key] = company_id
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return company_id
+
+    def link_candidates(self, cursor, rows):
+        """Link candidate rows to their companies, rows are (candidate_id, candidate column) pairs"""
+        if not self.tables_ready:
+            self.create_tables(cursor)
+
+        links = []
+        for candidate_id, candidate in rows:
+            for rank, name in enumerate(split_candidates(candidate), 1):
+                company_id = self.get_company_id(cursor, name)
+                if company_id is not None:
+                    links.append((company_id, candidate_id, rank))
+
+        if links:
+            # The first (best) rank wins when two spellings of one company appear in a notice
+            cursor.executemany(
+                f"{INSERT_IGNORE[self.dialect]} INTO `{self.link_table}` (`company_id`, `candidate_id`, `rank`) "
+                f"VALUES (%s, %s, %s)", links)
+        return len(links)
+
+    def relink_candidate(self, cursor, candidate_id, candidate):
+        """Replace the links of a rewritten candidate row"""
+        if not self.tables_ready:
+            self.create_tables(cursor)
+        cursor.execute(f"DELETE FROM `{self.link_table}` WHERE `candidate_id` = %s", (candidate_id,))
+        return self.link_candidates(cursor, [(candidate_id, candidate)])
+
+    def clear_cache(self):
+        """Forget all cached ids, called when a transaction that may have inserted some of them is rolled back"""
+        with self.lock:
+            self.cache.clear()
+
+    def stats(self):
+        """Name cache statistics"""
+        with self.lock:
+            return {'size': len(self.cache), 'hits': self.hits, 'misses': self.misses}
+
+
+def backfill(db, batch_size=500):
+    """Link candidate rows stored before the company index existed, returns the number of rows linked"""
+    companies = db.companies
+    cursor = db.connection.cursor()
+    total = 0
+    last_id = 0
+    try:
+        companies.create_tables(cursor)
+        while True:
+            cursor.execute(
+                f"SELECT c.`id`, c.`candidate` FROM `{db.candidate_table}` c "
+                f"LEFT JOIN `{companies.link_table}` l ON l.`candidate_id` = c.`id` "
+                f"WHERE l.`candidate_id` IS NULL AND c.`candidate` != %s AND c.`id` > %s ORDER BY c.`id` LIMIT %s",
+                (NO_CANDIDATE, last_id, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            companies.link_candidates(cursor, rows)
+            db.connection.commit()
+            last_id = rows[-1][0]
+            total += len(rows)
+            logging.info(f"Linked {total} candidate rows to companies")
+    finally:
+        cursor.close()
+    return total
+
+
+def find_bids(db, name, limit=50):
+    """Candidate notices naming a company, newest first, as (time, title, rank) tuples"""
+    companies = db.companies
+    cursor = db.connection.cursor()
+    try:
+        cursor.execute(
+            f"SELECT c.`time`, c.`title`, l.`rank` FROM `{companies.company_table}` co "
+            f"JOIN `{companies.link_table}` l ON l.`company_id` = co.`id` "
+            f"JOIN `{db.candidate_table}` c ON c.`id` = l.`candidate_id` "
+            f"WHERE co.`norm_name` = %s ORDER BY c.`time` DESC LIMIT %s", (company_key(name), limit))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def main():
+    """Main function - look up a company's bids or backfill the link table"""
+    import argparse
+    from log_config import setup_logging
+    from scraper import DatabaseManager
+
+    parser = argparse.ArgumentParser(description='Company index: look up bids by company, or link existing candidate rows')
+    parser.add_argument('name', nargs='?', help='Company name to look up (any spelling variant)')
+    parser.add_argument('--backfill', action='store_true', help='Link candidate rows that are not in the company index yet')
+    parser.add_argument('--limit', type=int, default=50, help='Maximum number of results')
+    args = parser.parse_args()
+
+    setup_logging('scraper.log')
+    db = DatabaseManager()
+    if not db.connect():
+        return
+    try:
+        if args.backfill:
+            print(f"Linked {backfill(db)} candidate rows")
+        if args.name:
+            print(f"{normalize_company_name(args.name)}:")
+            for time_str, title, rank in find_bids(db, args.name, args.limit):
+                print(f"  {time_str}  第{rank}名  {title}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
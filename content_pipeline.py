@@ -0,0 +1,158 @@
+import base64
+import logging
+import re
+import threading
+import zlib
+from contextlib import contextmanager
+
+from settings import load_config
+
+# Storage modes for the content column
+CONTENT_MODES = ('raw', 'minified', 'text', 'compressed')
+
+# Prefix marking a compressed content value, see decode_content
+COMPRESSED_PREFIX = 'zlib:'
+
+# Tags dropped entirely, including their content
+DROP_TAGS = ['script', 'style', 'noscript', 'iframe', 'link', 'meta', 'object', 'embed']
+
+# Attributes kept on inner elements, everything else (inline styles, Word classes, event handlers) is dropped
+KEEP_ATTRIBUTES = {'href', 'src', 'alt', 'title', 'colspan', 'rowspan'}
+
+# Elements kept even when they have no text
+KEEP_EMPTY_TAGS = {'img', 'br', 'hr', 'td', 'th', 'tr', 'table', 'tbody', 'thead'}
+
+
+def parse_html(html):
+    """BeautifulSoup tree of an HTML string
+
+    bs4 is imported on first use, so commands that never parse a page (--help, status and
+    search tools, an idle scheduler) start without loading it.
+    """
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, 'html.parser')
+
+
+@contextmanager
+def parsed_html(html):
+    """Parse tree of an HTML string, released as soon as the block exits
+
+    Tags link to their parents and siblings, so a dropped tree would otherwise wait for the
+    cyclic garbage collector while the next pages are parsed. Values taken out of the tree
+    must be plain strings (get_text(), str(tag)), not tags or NavigableStrings.
+    """
+    soup = parse_html(html)
+    try:
+        yield soup
+    finally:
+        soup.decompose()
+
+
+def sanitize_html(html):
+    """Drop scripts, styles, comments, presentational attributes and empty tags, and collapse whitespace"""
+    from bs4 import Comment
+
+    if not html:
+        return html
+    with parsed_html(html) as soup:
+        for tag in soup(DROP_TAGS):
+            tag.decompose()
+        for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
+            comment.extract()
+
+        root = soup.find(True)
+        for tag in soup.find_all(True):
+            # The container keeps its class/id so the stored block stays recognisable
+            keep = KEEP_ATTRIBUTES | {'class', 'id'} if tag is root else KEEP_ATTRIBUTES
+            tag.attrs = {name: value for name, value in tag.attrs.items() if name in keep}
+
+        # Innermost first, so parents emptied by removing their children are dropped too
+        for tag in reversed(soup.find_all(True)):
+            if tag is root or tag.name in KEEP_EMPTY_TAGS:
+                continue
+            if not tag.get_text(strip=True) and not tag.find(list(KEEP_EMPTY_TAGS)):
+                tag.decompose()
+        html = str(soup)
+
+    minified = re.sub(r'\s+', ' ', html)
+    return re.sub(r'>\s+<', '><', minified).strip()
+
+
+def html_to_text(html):
+    """Plain-text rendering of an HTML block, one line per block element"""
+    if not html:
+        return ''
+    with parsed_html(html) as soup:
+        for tag in soup(DROP_TAGS):
+            tag.decompose()
+        text = soup.get_text('\n')
+    lines = (re.sub(r'[ \t　\xa0]+', ' ', line).strip() for line in text.split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+
+def compress_content(text, level=6):
+    """Compress a content value into a text-safe string"""
+    return COMPRESSED_PREFIX + base64.b64encode(zlib.compress(text.encode('utf-8'), level)).decode('ascii')
+
+
+def decode_content(value):
+    """Return the HTML of a stored content value, whatever mode it was stored in"""
+    if value and value.startswith(COMPRESSED_PREFIX):
+        return zlib.decompress(base64.b64decode(value[len(COMPRESSED_PREFIX):])).decode('utf-8')
+    return value
+
+
+class ContentPipeline:
+    """Content Pipeline Class - turns the extracted HTML block into the stored content value"""
+
+    def __init__(self, config_file='config.ini', mode=None):
+        config = load_config(config_file)
+        self.mode = (mode or config.get('Content', 'CONTENT_MODE', fallback='raw')).strip().lower()
+        if self.mode not in CONTENT_MODES:
+            logging.warning(f"Unknown CONTENT_MODE {self.mode}, storing raw HTML")
+            self.mode = 'raw'
+        # Optional plain-text twin column for search, empty to disable
+        self.text_column = config.get('Content', 'TEXT_COLUMN', fallback='').strip()
+        self.compression_level = config.getint('Content', 'COMPRESSION_LEVEL', fallback=6)
+
+        self.lock = threading.Lock()
+        self.rows = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+
+    def process(self, html):
+        """Stored content value for an extracted HTML block"""
+        if self.mode == 'raw' or not html:
+            return html
+        if self.mode == 'text':
+            return html_to_text(html)
+        minified = sanitize_html(html)
+        if self.mode == 'compressed':
+            return compress_content(minified, self.compression_level)
+        return minified
+
+    def apply(self, record):
+        """Replace record['content'] with its stored form and add the text twin if configured"""
+        raw = record.get('content') or ''
+        record['content'] = self.process(raw)
+        if self.text_column:
+            record[self.text_column] = html_to_text(raw)
+
+        with self.lock:
+            self.rows += 1
+            self.raw_bytes += len(raw.encode('utf-8'))
+            self.stored_bytes += len((record['content'] or '').encode('utf-8'))
+        return record
+
+    def summary(self):
+        """Bytes before and after the pipeline, and the average saving per row"""
+        with self.lock:
+            saved = self.raw_bytes - self.stored_bytes
+            return {
+                'mode': self.mode,
+                'rows': self.rows,
+                'raw_bytes': self.raw_bytes,
+                'stored_bytes': self.stored_bytes,
+                'saved_per_row': saved / self.rows if self.rows else 0,
+                'ratio': self.stored_bytes / self.raw_bytes if self.raw_bytes else 1.0,
+            }
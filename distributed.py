@@ -0,0 +1,207 @@
+import logging
+import multiprocessing
+import os
+import socket
+import time
+
+from channels import RateLimiter, get_enabled_channels, load_channels
+from checkpoint import CheckpointJournal
+from log_config import setup_logging
+from scraper import DatabaseManager, Link, create_scraper
+from settings import load_config
+from spool import RecordSpool, SpoolDrainer
+from work_queue import open_queue
+
+
+class Coordinator:
+    """Coordinator Class - paginates channel lists and puts detail-page tasks on the shared queue"""
+
+    def __init__(self, queue, channels=None, target_date=None, start_date=None, end_date=None,
+                 base_url=None, config_file='config.ini'):
+        self.queue = queue
+        config = load_config(config_file)
+        available = load_channels(config)
+        names = channels or get_enabled_channels(config, available)
+
+        rate_limiter = RateLimiter(config.getfloat('Scraping', 'REQUEST_DELAY', fallback=1.0))
+        spool = RecordSpool(config_file)
+        checkpoint = CheckpointJournal(config_file)
+        self.scrapers = [
+            create_scraper(available[name], target_date=target_date, start_date=start_date, end_date=end_date,
+                           base_url=base_url, rate_limiter=rate_limiter, spool=spool, checkpoint=checkpoint,
+                           config_file=config_file)
+            for name in names
+        ]
+
+    def enqueue_channel(self, scraper):
+        """Paginate one channel and enqueue its detail links, returns (found, enqueued)"""
+        name = scraper.channel.name
+        found = 0
+        enqueued = 0
+        for page_num in range(1, scraper.max_pages + 1):
+            page_url = scraper.get_page_url(page_num)
+            logging.info(f"[{name}] Listing page {page_num}: {page_url}")
+            try:
+                links, should_continue = scraper.fetch_links(page_url)
+            except Exception as e:
+                logging.error(f"[{name}] Error listing page {page_num}: {e}")
+                break
+
+            for link_info in links:
+                found += 1
+                # The href identifies a detail page, re-enqueueing it is a no-op
+                if self.queue.put(f"{name}:{link_info.href}", dict(link_info.to_dict(), channel=name)):
+                    enqueued += 1
+
+            if not should_continue:
+                break
+        return found, enqueued
+
+    def run(self):
+        """Enqueue all channels, returns per-channel (found, enqueued) counts"""
+        results = {}
+        for scraper in self.scrapers:
+            results[scraper.channel.name] = self.enqueue_channel(scraper)
+            found, enqueued = results[scraper.channel.name]
+            logging.info(f"[{scraper.channel.name}] Found {found} links, enqueued {enqueued} new tasks")
+        return results
+
+
+class Worker:
+    """Worker Class - leases detail-page tasks, then fetches, parses and stores them"""
+
+    def __init__(self, queue, worker_id=None, base_url=None, idle_timeout=None, config_file='config.ini'):
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.base_url = base_url
+        self.config_file = config_file
+
+        self.config = load_config(config_file)
+        self.channels = load_channels(self.config)
+        if idle_timeout is None:
+            idle_timeout = self.config.getfloat('Distributed', 'WORKER_IDLE_TIMEOUT', fallback=0)
+        self.idle_timeout = idle_timeout
+        self.poll_interval = 2.0
+
+        self.rate_limiter = RateLimiter(self.config.getfloat('Scraping', 'REQUEST_DELAY', fallback=1.0))
+        self.spool = RecordSpool(config_file)
+        self.checkpoint = CheckpointJournal(config_file)
+        self.scrapers = {}
+        self.processed = 0
+        self.saved = 0
+        self.failed = 0
+
+    def get_scraper(self, channel_name):
+        """Scraper for a channel, created on first use"""
+        if channel_name not in self.scrapers:
+            scraper = create_scraper(self.channels[channel_name], base_url=self.base_url,
+                                     rate_limiter=self.rate_limiter, spool=self.spool, checkpoint=self.checkpoint,
+                                     config_file=self.config_file)
+            if not self.spool.enabled and not scraper.db.connect():
+                raise ConnectionError("Cannot connect to database")
+            self.scrapers[channel_name] = scraper
+        return self.scrapers[channel_name]
+
+    def process(self, task):
+        """Process one leased task"""
+        try:
+            scraper = self.get_scraper(task.payload['channel'])
+            if scraper.process_link(Link.from_dict(task.payload)):
+                self.saved += 1
+            if not self.queue.complete(task.task_id, self.worker_id):
+                logging.warning(f"[{self.worker_id}] Lease on task {task.task_id} expired before it finished, "
+                                f"another worker may process it again")
+            self.processed += 1
+        except Exception as e:
+            self.failed += 1
+            logging.error(f"[{self.worker_id}] Task {task.task_id} failed (attempt {task.attempts}): {e}")
+            self.queue.fail(task.task_id, self.worker_id, e)
+
+    def run(self):
+        """Lease and process tasks until the queue stays empty for idle_timeout seconds"""
+        logging.info(f"[{self.worker_id}] Worker started")
+        drainer = None
+        if self.spool.enabled:
+            drainer = SpoolDrainer(self.spool, DatabaseManager(self.config_file))
+            drainer.start()
+
+        idle_since = time.monotonic()
+        try:
+            while True:
+                task = self.queue.lease(self.worker_id)
+                if task is None:
+                    if self.idle_timeout and time.monotonic() - idle_since >= self.idle_timeout:
+                        break
+                    time.sleep(self.poll_interval)
+                    continue
+                self.process(task)
+                idle_since = time.monotonic()
+        except KeyboardInterrupt:
+            logging.info(f"[{self.worker_id}] Interrupted, leased tasks will be retried after their lease expires")
+        finally:
+            if drainer:
+                drainer.stop()
+                drainer.db.close()
+            for scraper in self.scrapers.values():
+                scraper.db.close()
+
+        logging.info(f"[{self.worker_id}] Worker finished: processed {self.processed} tasks, "
+                     f"saved {self.saved} records, {self.failed} failures")
+
+
+def run_worker_process(worker_index, base_url, idle_timeout, config_file):
+    """Entry point of one worker process"""
+    # Each process gets its own listener and file, rotating one file from several processes is unsafe
+    setup_logging(f"worker_{worker_index}.log", config_file)
+    queue = open_queue(config_file)
+    worker_id = f"{socket.gethostname()}-{os.getpid()}-{worker_index}"
+    Worker(queue, worker_id, base_url=base_url, idle_timeout=idle_timeout, config_file=config_file).run()
+    queue.close()
+
+
+def main():
+    """Main function - run the coordinator, workers, or show queue status"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Distributed crawl: coordinator and worker processes sharing a work queue')
+    parser.add_argument('role', choices=['coordinator', 'worker', 'status'], help='Process role')
+    parser.add_argument('--date', type=str, help='Specify scraping date (format: YYYY-MM-DD)')
+    parser.add_argument('--start-date', type=str, help='Start of date range to enqueue (format: YYYY-MM-DD)')
+    parser.add_argument('--end-date', type=str, help='End of date range to enqueue (format: YYYY-MM-DD)')
+    parser.add_argument('--channels', type=str, help='Comma-separated channel names to enqueue')
+    parser.add_argument('--processes', type=int, default=1, help='Number of worker processes on this machine')
+    parser.add_argument('--idle-timeout', type=float, default=None,
+                        help='Seconds a worker waits on an empty queue before exiting (default: from config)')
+    parser.add_argument('--base-url', type=str, default=None, help='Override the site base URL')
+    parser.add_argument('--config', type=str, default='config.ini', help='Configuration file')
+    args = parser.parse_args()
+
+    setup_logging('distributed.log' if args.role == 'coordinator' else None, args.config)
+    if args.role == 'status':
+        queue = open_queue(args.config)
+        print(queue.stats())
+        queue.close()
+        return
+
+    if args.role == 'coordinator':
+        channels = [name.strip() for name in args.channels.split(',') if name.strip()] if args.channels else None
+        queue = open_queue(args.config)
+        Coordinator(queue, channels, target_date=args.date, start_date=args.start_date, end_date=args.end_date,
+                    base_url=args.base_url, config_file=args.config).run()
+        logging.info(f"Queue status: {queue.stats()}")
+        queue.close()
+        return
+
+    processes = [
+        multiprocessing.Process(target=run_worker_process,
+                                args=(index, args.base_url, args.idle_timeout, args.config))
+        for index in range(max(1, args.processes))
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
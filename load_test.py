@@ -0,0 +1,309 @@
+import configparser
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from channels import RateLimiter
+from companies import CompanyIndex
+from log_config import setup_logging
+from mock_site import MockSite, MockSiteConfig
+from near_duplicates import NearDuplicateIndex
+from projects import ProjectIndex
+from revisions import RevisionStore
+from scraper import BidAnnouncementScraper, BidCandidateScraper, DatabaseManager
+from settings import load_config
+from storage import StorageManager
+
+# Local state files and directories, (section, option, name in the work directory)
+STATE_PATHS = [
+    ('Checkpoint', 'CHECKPOINT_FILE', 'checkpoint.db'),
+    ('Spool', 'SPOOL_FILE', 'spool.db'),
+    ('Feed', 'FEED_FILE', 'feed.db'),
+    ('Search', 'INDEX_FILE', 'search.db'),
+    ('Distributed', 'QUEUE_FILE', 'work_queue.db'),
+    ('API', 'WRITE_STAMP_FILE', 'api_write.stamp'),
+    ('Scraping', 'LOCK_DIR', 'locks'),
+    ('Cache', 'NAME_CACHE_FILE', 'name_cache.json'),
+]
+
+# SQLite schema mirroring the MySQL tables used by DatabaseManager
+SQLITE_SCHEMA = {
+    'candidate': """
+        CREATE TABLE IF NOT EXISTS `{table}` (
+            `id` INTEGER PRIMARY KEY AUTOINCREMENT,
+            `title` TEXT, `time` TEXT, `content` TEXT, `candidate` TEXT, `createtime` INTEGER
+        )
+    """,
+    'crawler': """
+        CREATE TABLE IF NOT EXISTS `{table}` (
+            `id` INTEGER PRIMARY KEY AUTOINCREMENT,
+            `title` TEXT, `time` TEXT, `condition` TEXT, `content` TEXT, `tenderer` TEXT,
+            `address` TEXT, `contacts` TEXT, `mobile` TEXT, `email` TEXT, `createtime` INTEGER
+        )
+    """,
+}
+
+
+class _SQLiteCursor:
+    """Cursor wrapper translating pymysql %s placeholders to sqlite3 ? placeholders"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, sql, params=()):
+        return self._cursor.execute(sql.replace('%s', '?'), params)
+
+    def executemany(self, sql, seq_of_params):
+        return self._cursor.executemany(sql.replace('%s', '?'), seq_of_params)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class _SQLiteConnection:
+    """Connection wrapper exposing the parts of the pymysql connection API DatabaseManager uses"""
+
+    def __init__(self, path):
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self.open = True
+
+    def cursor(self):
+        return _SQLiteCursor(self._connection.cursor())
+
+    def begin(self):
+        if not self._connection.in_transaction:
+            self._connection.execute("BEGIN")
+
+    def close(self):
+        self._connection.close()
+        self.open = False
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+class SQLiteDatabaseManager(DatabaseManager):
+    """Database Manager backed by a local SQLite file instead of MySQL"""
+
+    def __init__(self, db_path, config_file='config.ini'):
+        super().__init__(config_file)
+        self.db_path = db_path
+        self.companies = CompanyIndex(config_file, dialect='sqlite')
+        self.projects = ProjectIndex(config_file, dialect='sqlite')
+        self.storage = StorageManager(config_file, dialect='sqlite')
+        self.revisions = RevisionStore(config_file, dialect='sqlite')
+        self.near_duplicates = NearDuplicateIndex(config_file, dialect='sqlite')
+
+    def connect(self):
+        """Open the SQLite file and create the tables if needed"""
+        try:
+            self.connection = _SQLiteConnection(self.db_path)
+            cursor = self.connection.cursor()
+            cursor.execute(SQLITE_SCHEMA['candidate'].format(table=self.candidate_table))
+            cursor.execute(SQLITE_SCHEMA['crawler'].format(table=self.crawler_table))
+            self.connection.commit()
+            cursor.close()
+            return self.prepare_tables()
+        except Exception as e:
+            logging.error(f"SQLite connection failed: {e}")
+            return False
+
+    def count_rows(self, table_type):
+        """Count rows stored in the candidate or crawler table"""
+        table_name = self.candidate_table if table_type == 'candidate' else self.crawler_table
+        connection = sqlite3.connect(self.db_path)
+        try:
+            connection.execute(SQLITE_SCHEMA[table_type].format(table=table_name))
+            return connection.execute(f"SELECT COUNT(*) FROM `{table_name}`").fetchone()[0]
+        finally:
+            connection.close()
+
+
+def write_test_config(work_dir, use_spool=True, config_file='config.ini'):
+    """Copy of the configuration with every local state file moved into work_dir, returns its path
+
+    Load test runs must not leave mock rows in the production checkpoint journal, spool or
+    change feed, nor touch its name cache, run locks or API write stamp.
+    """
+    config = configparser.ConfigParser()
+    config.read_dict(load_config(config_file))
+    for section, option, name in STATE_PATHS:
+        if not config.has_section(section):
+            config.add_section(section)
+        config.set(section, option, os.path.join(work_dir, name))
+    config.set('Spool', 'SPOOL_ENABLED', str(use_spool).lower())
+    path = os.path.join(work_dir, 'config.ini')
+    with open(path, 'w', encoding='utf-8') as f:
+        config.write(f)
+    return path
+
+
+def run_load_test(site_config, target_date, scrape_type='both', db_path=None, use_mysql=False, request_delay=0.0,
+                  use_spool=True, start_date=None):
+    """Run the full scrape flow against a mock site and return a result summary
+
+    With start_date the scrapers crawl the range start_date ~ target_date instead of one day.
+    Local state (checkpoint journal, spool, change feed...) is kept in a temporary directory.
+    """
+    start_date = start_date or target_date
+    work_dir = tempfile.mkdtemp(prefix='zb_load_test_')
+    config_file = write_test_config(work_dir, use_spool)
+    if db_path is None:
+        db_path = os.path.join(work_dir, 'load_test.db')
+
+    results = {}
+    with MockSite(site_config) as site:
+        jobs = []
+        if scrape_type in ['candidates', 'both']:
+            jobs.append(('candidate', BidCandidateScraper(target_date, base_url=site.url, start_date=start_date,
+                                                          end_date=target_date, config_file=config_file),
+                         'scrape_candidates'))
+        if scrape_type in ['announcements', 'both']:
+            jobs.append(('crawler', BidAnnouncementScraper(target_date, base_url=site.url, start_date=start_date,
+                                                           end_date=target_date, config_file=config_file),
+                         'scrape_announcements'))
+
+        for table_type, scraper, method in jobs:
+            if not use_mysql:
+                scraper.db = SQLiteDatabaseManager(db_path, config_file)
+            scraper.rate_limiter = RateLimiter(request_delay)
+            before = scraper.db.count_rows(table_type) if not use_mysql else 0
+
+            started = time.perf_counter()
+            getattr(scraper, method)()
+            elapsed = time.perf_counter() - started
+
+            stored = scraper.db.count_rows(table_type) - before if not use_mysql else None
+            results[table_type] = {
+                'expected': sum(site.count_items(date) for date in site.dates() if start_date <= date <= target_date),
+                'stored': stored,
+                'seconds': elapsed,
+            }
+
+        results['site'] = dict(site.stats)
+    results['db_path'] = None if use_mysql else db_path
+    return results
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, None where the resource module is unavailable (Windows)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_memory_benchmark(day_counts, items_per_day=50, items_per_page=15, scrape_type='both'):
+    """Crawl date ranges of increasing length in one process and measure memory of each run
+
+    Returns one (days, records, traced peak MB, peak RSS MB so far) tuple per range. Records are
+    written as they are scraped, so the traced peak should stay flat as the range grows; the
+    process RSS peak only rises if a longer range needs more memory than a shorter one did.
+    """
+    import tracemalloc
+
+    # Untraced warm-up run, so lazily imported modules and caches are not counted as crawl memory
+    warm_up = MockSiteConfig(pages=2, items_per_page=items_per_page, items_per_day=items_per_day)
+    run_load_test(warm_up, MockSite(warm_up).dates()[0], scrape_type=scrape_type)
+
+    results = []
+    for days in day_counts:
+        # Two extra days so the crawl stops on an older date, like a real backfill
+        pages = -(-(days + 2) * items_per_day // items_per_page)
+        site_config = MockSiteConfig(pages=pages, items_per_page=items_per_page, items_per_day=items_per_day)
+        dates = MockSite(site_config).dates()
+
+        tracemalloc.start()
+        result = run_load_test(site_config, dates[1], scrape_type=scrape_type, start_date=dates[days])
+        traced_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        records = sum(result[table]['stored'] for table in ('candidate', 'crawler') if table in result)
+        results.append((days, records, traced_peak / (1024 * 1024), peak_rss_mb()))
+    return results
+
+
+def print_report(results):
+    """Print the records/sec report"""
+    print("=" * 60)
+    print("Load test results")
+    print("=" * 60)
+    total_records = 0
+    total_seconds = 0.0
+    for table_type in ['candidate', 'crawler']:
+        if table_type not in results:
+            continue
+        result = results[table_type]
+        records = result['stored'] if result['stored'] is not None else result['expected']
+        rate = records / result['seconds'] if result['seconds'] else 0.0
+        total_records += records
+        total_seconds += result['seconds']
+        print(f"{table_type:<10} expected={result['expected']:<6} stored={result['stored']!s:<6} "
+              f"time={result['seconds']:.2f}s rate={rate:.1f} records/sec")
+    overall = total_records / total_seconds if total_seconds else 0.0
+    print(f"{'total':<10} records={total_records:<6} time={total_seconds:.2f}s rate={overall:.1f} records/sec")
+    site = results['site']
+    print(f"site       requests={site['requests']} ok={site['ok']} 429={site['rate_limited']} "
+          f"500={site['errors']} 404={site['not_found']}")
+    if results['db_path']:
+        print(f"SQLite database: {results['db_path']}")
+
+
+def main():
+    """Main function - run an end-to-end crawl against the mock site"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='End-to-end crawl load test against a local mock site')
+    parser.add_argument('--date', default=None, help='Target scraping date (default: second newest mock date)')
+    parser.add_argument('--type', choices=['candidates', 'announcements', 'both'], default='both',
+                        help='Specify scraping type: candidates, announcements, or both')
+    parser.add_argument('--pages', type=int, default=10, help='List pages per channel')
+    parser.add_argument('--per-page', type=int, default=15, help='Items per list page')
+    parser.add_argument('--per-day', type=int, default=10, help='Items published per day')
+    parser.add_argument('--start-date', default='2025-07-20', help='Date of the newest mock item (YYYY-MM-DD)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Injected latency per request in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Probability of a 500 response')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Probability of a 429 response')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for fault injection')
+    parser.add_argument('--request-delay', type=float, default=0.0, help='Delay between detail requests in seconds')
+    parser.add_argument('--db-path', default=None, help='SQLite database file (default: temporary file)')
+    parser.add_argument('--mysql', action='store_true', help='Write to the MySQL database from config.ini instead of SQLite')
+    parser.add_argument('--no-spool', action='store_true', help='Insert records directly instead of through the local spool')
+    parser.add_argument('--log-level', default='WARNING', help='Log level during the run')
+    parser.add_argument('--memory', type=str, default=None, metavar='DAYS',
+                        help='Memory benchmark: crawl ranges of these day counts, e.g. 1,4,16 (uses --per-day and --per-page)')
+    args = parser.parse_args()
+
+    setup_logging()
+    logging.getLogger().setLevel(args.log_level.upper())
+
+    if args.memory:
+        day_counts = [int(days) for days in args.memory.split(',')]
+        print(f"{'days':>5} {'records':>8} {'traced peak':>12} {'peak RSS':>10}")
+        for days, records, traced_peak, rss in run_memory_benchmark(day_counts, args.per_day, args.per_page, args.type):
+            rss_text = f"{rss:.1f}MB" if rss is not None else 'n/a'
+            print(f"{days:>5} {records:>8} {traced_peak:>10.1f}MB {rss_text:>10}")
+        return
+
+    site_config = MockSiteConfig(pages=args.pages, items_per_page=args.per_page, items_per_day=args.per_day,
+                                 start_date=args.start_date, latency=args.latency, error_rate=args.error_rate,
+                                 rate_limit_rate=args.rate_limit_rate, seed=args.seed)
+    target_date = args.date
+    if not target_date:
+        dates = MockSite(site_config).dates()
+        target_date = dates[1] if len(dates) > 1 else dates[0]
+
+    print(f"Target date: {target_date}")
+    results = run_load_test(site_config, target_date, scrape_type=args.type, db_path=args.db_path,
+                            use_mysql=args.mysql, request_delay=args.request_delay, use_spool=not args.no_spool)
+    print_report(results)
+
+
+if __name__ == "__main__":
+    main()
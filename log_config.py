@@ -0,0 +1,75 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+from datetime import datetime
+
+from settings import load_config
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# The running listener, so setup_logging can be called more than once
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log shippers"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logging(log_file=None, config_file='config.ini'):
+    """Route all logging through a queue to a background listener writing the console and a rotating file
+
+    Callers only put records on an in-memory queue; formatting and file I/O happen on the
+    listener thread. Configured by the [Logging] section: LEVEL, FORMAT (text or json),
+    MAX_BYTES and BACKUP_COUNT.
+    """
+    global _listener
+
+    config = load_config(config_file)
+    level = config.get('Logging', 'LEVEL', fallback='INFO').strip().upper()
+    log_format = config.get('Logging', 'FORMAT', fallback='text').strip().lower()
+    max_bytes = config.getint('Logging', 'MAX_BYTES', fallback=10 * 1024 * 1024)
+    backup_count = config.getint('Logging', 'BACKUP_COUNT', fallback=5)
+
+    formatter = JsonFormatter() if log_format == 'json' else logging.Formatter(TEXT_FORMAT)
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    if _listener:
+        _listener.stop()
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(getattr(logging, level, logging.INFO))
+
+
+def stop_logging():
+    """Flush queued records and stop the listener"""
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,94 @@
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+
+class MemoCache:
+    """Memo Cache Class - bounded LRU cache of pure function results, shared by all threads
+
+    Entries are keyed by (kind, key) so several functions can share one cache. Values must be
+    JSON serializable when the cache is persisted; a file written with a different version
+    (cleaning rules changed) is ignored.
+    """
+
+    def __init__(self, maxsize=20000, version=1):
+        self.maxsize = maxsize
+        self.version = version
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.path = None
+
+    def configure(self, maxsize=None, path=None):
+        """Set the size limit and load the persisted entries the first time a path is given"""
+        with self.lock:
+            if maxsize:
+                self.maxsize = maxsize
+            if not path or path == self.path:
+                return
+            self.path = path
+        self.load(path)
+
+    def get(self, kind, key, compute):
+        """Cached compute(key)"""
+        entry = (kind, key)
+        with self.lock:
+            if entry in self.entries:
+                self.entries.move_to_end(entry)
+                self.hits += 1
+                return self.entries[entry]
+            self.misses += 1
+
+        value = compute(key)
+        with self.lock:
+            self.entries[entry] = value
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return value
+
+    def stats(self):
+        """Size and hit/miss counters"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def load(self, path):
+        """Load entries persisted by a previous run"""
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Cannot read memo cache {path}: {e}")
+            return
+        if data.get('version') != self.version:
+            logging.info(f"Memo cache {path} was written by other cleaning rules, ignored")
+            return
+        with self.lock:
+            for kind, key, value in data.get('entries', [])[-self.maxsize:]:
+                self.entries.setdefault((kind, key), value)
+            logging.info(f"Loaded {len(self.entries)} memo cache entries from {path}")
+
+    def save(self, path=None):
+        """Persist the entries, most recently used last"""
+        path = path or self.path
+        if not path:
+            return
+        with self.lock:
+            data = {'version': self.version, 'entries': [[kind, key, value] for (kind, key), value in self.entries.items()]}
+        temp_path = path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logging.warning(f"Cannot write memo cache {path}: {e}")
@@ -0,0 +1,266 @@
+import logging
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from log_config import setup_logging
+
+# Channel layout of zb.shudaojt.com: path prefix -> (first list page name, main container class)
+CHANNELS = {
+    'hxrgs': ('people', 'zhongbiaoPeople'),
+    'zbgg': ('zhaobiao', 'zhaobiao-content'),
+}
+
+RANK_NAMES = ['一', '二', '三', '四', '五']
+
+PARAGRAPH_STYLE = 'margin:0pt;text-indent:21pt;line-height:150%;font-family:宋体;font-size:10.5pt;color:#000000'
+
+
+class MockSiteConfig:
+    """Mock Site Configuration Class"""
+
+    def __init__(self, pages=10, items_per_page=15, items_per_day=10, start_date='2025-07-20',
+                 latency=0.0, error_rate=0.0, rate_limit_rate=0.0, seed=42):
+        self.pages = pages                      # Number of list pages per channel
+        self.items_per_page = items_per_page    # Items on each list page
+        self.items_per_day = items_per_day      # Items published per day (controls dates)
+        self.start_date = start_date            # Date of the newest item
+        self.latency = latency                  # Injected latency per request in seconds
+        self.error_rate = error_rate            # Probability of a 500 response
+        self.rate_limit_rate = rate_limit_rate  # Probability of a 429 response
+        self.seed = seed
+
+    @property
+    def total_items(self):
+        return self.pages * self.items_per_page
+
+
+class MockSite:
+    """Local stand-in for zb.shudaojt.com serving generated list and detail pages"""
+
+    def __init__(self, config=None, host='127.0.0.1', port=0):
+        self.config = config or MockSiteConfig()
+        self.host = host
+        self.port = port
+        self.server = None
+        self.thread = None
+        self.random = random.Random(self.config.seed)
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'ok': 0, 'errors': 0, 'rate_limited': 0, 'not_found': 0, 'not_modified': 0}
+        # Amendment count per (channel, index), see amend
+        self.revisions = {}
+        self._newest = datetime.strptime(self.config.start_date, '%Y-%m-%d')
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def item_date(self, index):
+        """Publish date of the item at the given position (0 = newest)"""
+        day = self._newest - timedelta(days=index // self.config.items_per_day)
+        return day.strftime('%Y-%m-%d')
+
+    def dates(self):
+        """All distinct dates served by the site, newest first"""
+        return sorted({self.item_date(i) for i in range(self.config.total_items)}, reverse=True)
+
+    def count_items(self, date_str):
+        """Number of items per channel published on the given date"""
+        return sum(1 for i in range(self.config.total_items) if self.item_date(i) == date_str)
+
+    def render_list_page(self, channel, page_num):
+        """Render a list page in the same structure as the real site"""
+        container_class = CHANNELS[channel][1]
+        first = (page_num - 1) * self.config.items_per_page
+        items = []
+        for index in range(first, min(first + self.config.items_per_page, self.config.total_items)):
+            items.append(
+                '<div class="list-details-right-single">'
+                f'<a href="/{channel}/detail/{index}.html" title="{self.item_title(channel, index)}">'
+                f'{self.item_title(channel, index)}</a>'
+                f'<div class="single-time">{self.item_date(index)}</div>'
+                '</div>'
+            )
+        return (
+            '<html><head><meta charset="utf-8"><title>list</title>'
+            '<style>.list-details-right-single{margin:0}</style></head><body>'
+            f'<div class="{container_class}" id="main">{"".join(items)}</div>'
+            '</body></html>'
+        )
+
+    def amend(self, channel, index):
+        """Publish a correction of a detail page, changing its content and ETag"""
+        with self.lock:
+            self.revisions[(channel, index)] = self.revisions.get((channel, index), 0) + 1
+
+    def etag(self, channel, index):
+        """ETag of a detail page, changes with every amendment"""
+        return f'"{channel}-{index}-{self.revisions.get((channel, index), 0)}"'
+
+    def item_title(self, channel, index):
+        kind = '中标候选人公示' if channel == 'hxrgs' else '招标公告'
+        return f"蜀道测试项目{index:05d}标段{kind}"
+
+    def render_detail_page(self, channel, index):
+        """Render a detail page with candidate or announcement content"""
+        title = self.item_title(channel, index)
+        if channel == 'hxrgs':
+            lines = [f"<p>第{RANK_NAMES[rank]}中标候选人：四川测试{(index + rank) % 500:03d}建设工程有限公司"
+                     f"（投标报价：{1000 + index}.00万元）</p>" for rank in range(3)]
+            # Like the real site, only some candidate notices repeat the tender code
+            if index % 2 == 0:
+                lines.insert(0, f"<p>招标编号：SDJT-2025-{index:05d}</p>")
+        else:
+            lines = [
+                f"<p>项目编号：SDJT-2025-{index:05d}</p>",
+                f"<p>招标条件：本招标项目蜀道测试项目{index:05d}已由主管部门批准建设，已具备招标条件，现对该项目进行公开招标。</p>",
+                f"<p>招标人：四川测试{index % 50:02d}投资集团有限公司</p>",
+                f"<p>地址：成都市高新区测试路{index}号</p>",
+                "<p>联系人：张工</p>",
+                f"<p>联系电话：028-{8000000 + index}</p>",
+                f"<p>邮箱：bid{index}@example.com</p>",
+            ]
+        revision = self.revisions.get((channel, index), 0)
+        if revision:
+            lines.append(f"<p>更正公告：本项目第{revision}次更正，开标时间顺延。</p>")
+        # Real detail pages carry Word-style inline formatting on every paragraph
+        content = '\n'.join(line.replace('<p>', f'<p class="MsoNormal" style="{PARAGRAPH_STYLE}">') for line in lines)
+        return (
+            '<html><head><meta charset="utf-8"><title>detail</title>'
+            '<script>var tracking = true;</script></head><body>'
+            f'<div class="{CHANNELS[channel][1]}">'
+            f'<h3 class="detail-tt">{title}</h3>'
+            f'<span>{self.item_date(index)} 10:00:00</span>'
+            f'<div class="detail-content">\n{content}\n</div>'
+            '</div></body></html>'
+        )
+
+    def route(self, path):
+        """Resolve a request path to (status, body)"""
+        match = re.fullmatch(r'/(hxrgs|zbgg)/(\w+)\.html', path)
+        if match:
+            channel, name = match.groups()
+            if name == CHANNELS[channel][0]:
+                return 200, self.render_list_page(channel, 1)
+            if name.isdigit() and 1 <= int(name) <= self.config.pages:
+                return 200, self.render_list_page(channel, int(name))
+        match = re.fullmatch(r'/(hxrgs|zbgg)/detail/(\d+)\.html', path)
+        if match and int(match.group(2)) < self.config.total_items:
+            return 200, self.render_detail_page(match.group(1), int(match.group(2)))
+        return 404, '<html><body>Not Found</body></html>'
+
+    def inject_fault(self):
+        """Decide whether this request gets an injected 429 or 500"""
+        with self.lock:
+            roll = self.random.random()
+        if roll < self.config.rate_limit_rate:
+            return 429
+        if roll < self.config.rate_limit_rate + self.config.error_rate:
+            return 500
+        return None
+
+    def record(self, key):
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats[key] += 1
+
+    def start(self):
+        """Start serving in a background thread"""
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if site.config.latency:
+                    time.sleep(site.config.latency)
+                fault = site.inject_fault()
+                if fault == 429:
+                    site.record('rate_limited')
+                    self.send_response(429)
+                    self.send_header('Retry-After', '1')
+                    self.end_headers()
+                    return
+                if fault == 500:
+                    site.record('errors')
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+                path = self.path.split('?', 1)[0]
+                detail = re.fullmatch(r'/(hxrgs|zbgg)/detail/(\d+)\.html', path)
+                etag = site.etag(detail.group(1), int(detail.group(2))) if detail else None
+                if etag and self.headers.get('If-None-Match') == etag:
+                    site.record('not_modified')
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                status, body = site.route(path)
+                site.record('ok' if status == 200 else 'not_found')
+                payload = body.encode('utf-8')
+                self.send_response(status)
+                if etag and status == 200:
+                    self.send_header('ETag', etag)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        logging.info(f"Mock site serving at {self.url}")
+        return self
+
+    def stop(self):
+        """Stop the server"""
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def main():
+    """Main function - serve the mock site until interrupted"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Local stand-in for zb.shudaojt.com')
+    parser.add_argument('--host', default='127.0.0.1', help='Listen address')
+    parser.add_argument('--port', type=int, default=8000, help='Listen port')
+    parser.add_argument('--pages', type=int, default=10, help='List pages per channel')
+    parser.add_argument('--per-page', type=int, default=15, help='Items per list page')
+    parser.add_argument('--per-day', type=int, default=10, help='Items published per day')
+    parser.add_argument('--start-date', default='2025-07-20', help='Date of the newest item (YYYY-MM-DD)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Injected latency per request in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Probability of a 500 response')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Probability of a 429 response')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for fault injection')
+    args = parser.parse_args()
+
+    setup_logging()
+    config = MockSiteConfig(pages=args.pages, items_per_page=args.per_page, items_per_day=args.per_day,
+                            start_date=args.start_date, latency=args.latency, error_rate=args.error_rate,
+                            rate_limit_rate=args.rate_limit_rate, seed=args.seed)
+    site = MockSite(config, host=args.host, port=args.port).start()
+    logging.info(f"Dates served: {site.dates()[-1]} .. {site.dates()[0]}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        site.stop()
+
+
+if __name__ == "__main__":
+    main()
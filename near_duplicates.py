@@ -0,0 +1,331 @@
+import hashlib
+import logging
+import re
+import unicodedata
+import zlib
+
+from content_pipeline import decode_content, html_to_text
+from projects import NOTICE_SUFFIXES, normalize_project_name
+from settings import load_config
+
+# Parenthesized words a reposted or amended notice adds anywhere in the title of the original
+REPOST_MARKERS = ['（重新）', '（更正）', '（二次）', '（第二次）', '（补充）', '（变更）']
+
+# The same words written without parentheses only count in front of the notice type at the end,
+# e.g. 施工招标更正公告; elsewhere they are part of the project name, e.g. 重新装修工程
+REPOST_WORDS = ['重新招标', '第二次', '重新', '更正', '二次', '补充', '变更', '澄清', '延期']
+REPOST_WORD_PATTERN = re.compile(
+    f"(?:{'|'.join(REPOST_WORDS)})(?=(?:{'|'.join(NOTICE_SUFFIXES)})?$)")
+
+# Lot, batch and code numbers; notices whose titles carry different numbers are never near-duplicates
+TITLE_NUMBER_PATTERN = re.compile(r'[0-9一二三四五六七八九十百零〇]+')
+
+SIMHASH_BITS = 64
+
+# Title shingles outweigh content shingles, titles are short
+TITLE_WEIGHT = 4
+
+SCHEMAS = {
+    'mysql': [
+        """
+        CREATE TABLE IF NOT EXISTS `{simhash}` (
+            `table_name` VARCHAR(64) NOT NULL,
+            `record_id` INT UNSIGNED NOT NULL,
+            `simhash` BIGINT NOT NULL,
+            `title_numbers` INT UNSIGNED NOT NULL,
+            `cluster_id` INT UNSIGNED NOT NULL,
+            PRIMARY KEY (`table_name`, `record_id`),
+            KEY `idx_cluster` (`table_name`, `cluster_id`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS `{band}` (
+            `table_name` VARCHAR(64) NOT NULL,
+            `band` TINYINT UNSIGNED NOT NULL,
+            `value` INT UNSIGNED NOT NULL,
+            `record_id` INT UNSIGNED NOT NULL,
+            PRIMARY KEY (`table_name`, `band`, `value`, `record_id`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """,
+    ],
+    'sqlite': [
+        """
+        CREATE TABLE IF NOT EXISTS `{simhash}` (
+            `table_name` TEXT NOT NULL, `record_id` INTEGER NOT NULL, `simhash` INTEGER NOT NULL,
+            `title_numbers` INTEGER NOT NULL, `cluster_id` INTEGER NOT NULL, PRIMARY KEY (`table_name`, `record_id`)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS `idx_{simhash}_cluster` ON `{simhash}` (`table_name`, `cluster_id`)",
+        """
+        CREATE TABLE IF NOT EXISTS `{band}` (
+            `table_name` TEXT NOT NULL, `band` INTEGER NOT NULL, `value` INTEGER NOT NULL,
+            `record_id` INTEGER NOT NULL, PRIMARY KEY (`table_name`, `band`, `value`, `record_id`)
+        )
+        """,
+    ],
+}
+
+
+def normalize_title(title):
+    """Title with repost markers, the notice type, punctuation and whitespace removed
+
+    Markers and notice types are stripped from the end in turns until nothing changes, so
+    关于XX招标公告的更正公告 and XX招标更正公告 both come down to the XX of XX招标公告.
+    """
+    name = unicodedata.normalize('NFKC', title or '').replace('(', '（').replace(')', '）')
+    for marker in REPOST_MARKERS:
+        name = name.replace(marker, '')
+    previous = None
+    while name != previous:
+        previous = name
+        name = normalize_project_name(REPOST_WORD_PATTERN.sub('', name))
+    return re.sub(r'[\W_]+', '', name)
+
+
+def title_numbers(title):
+    """CRC of the numbers in a normalized title, e.g. the lot number in 2标段"""
+    return zlib.crc32(' '.join(TITLE_NUMBER_PATTERN.findall(normalize_title(title))).encode('utf-8'))
+
+
+def normalize_text(text):
+    """Content text reduced to letters and digits, so spacing and punctuation changes do not count"""
+    return re.sub(r'[\W_]+', '', unicodedata.normalize('NFKC', text)).upper()
+
+
+def shingles(text, size):
+    """Distinct character n-grams of a text, the text itself if it is shorter"""
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def bit_counts(features):
+    """Number of features whose hash has each bit set, most significant bit first"""
+    hashes = [format(int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big'), '064b')
+              for feature in features]
+    # zip(*) transposes the bit strings, so each column is counted in C instead of a Python bit loop
+    return [column.count('1') for column in zip(*hashes)] if hashes else [0] * SIMHASH_BITS
+
+
+def simhash(title, text=''):
+    """64-bit SimHash of a notice from its normalized title (bigrams) and content (4-grams)"""
+    title_features = shingles(normalize_title(title), 2)
+    text_features = shingles(normalize_text(text), 4)
+    title_counts = bit_counts(title_features)
+    text_counts = bit_counts(text_features)
+    value = 0
+    for title_ones, text_ones in zip(title_counts, text_counts):
+        weight = (TITLE_WEIGHT * (2 * title_ones - len(title_features))
+                  + 2 * text_ones - len(text_features))
+        value = (value << 1) | (weight > 0)
+    return value
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+def to_signed(value):
+    """A 64-bit hash as a signed BIGINT / SQLite INTEGER"""
+    return value - (1 << SIMHASH_BITS) if value >= 1 << (SIMHASH_BITS - 1) else value
+
+
+def to_unsigned(value):
+    return value + (1 << SIMHASH_BITS) if value < 0 else value
+
+
+class NearDuplicateIndex:
+    """Near-Duplicate Index Class - SimHash signatures of stored rows with banded lookups
+
+    Reposted and amended notices differ from the original in a few title words or characters,
+    so (title, time) does not match them. Each row gets a SimHash over its normalized title and
+    content. The 64 bits are split into MAX_DISTANCE + 1 bands (at least 2, so a band fits an
+    INT UNSIGNED column); two signatures within
+    MAX_DISTANCE bits agree on at least one band, so the candidates of a new row are one
+    indexed lookup per band instead of a comparison with every stored row. A near-duplicate
+    joins the cluster of the row it matches; cluster_id is the id of the first row of the cluster.
+    """
+
+    def __init__(self, config_file='config.ini', dialect='mysql'):
+        config = load_config(config_file)
+        self.enabled = config.getboolean('NearDuplicates', 'ENABLED', fallback=False)
+        self.max_distance = min(15, max(1, config.getint('NearDuplicates', 'MAX_DISTANCE', fallback=3)))
+        self.content_chars = config.getint('NearDuplicates', 'CONTENT_CHARS', fallback=4000)
+        self.max_candidates = config.getint('NearDuplicates', 'MAX_CANDIDATES', fallback=50)
+        self.simhash_table = config.get('Tables', 'SIMHASH_TABLE', fallback='fa_simhash')
+        self.band_table = config.get('Tables', 'SIMHASH_BAND_TABLE', fallback='fa_simhash_band')
+        self.dialect = dialect
+        self.tables_ready = False
+
+        # Bit offsets and widths of the bands, covering all 64 bits
+        count = self.max_distance + 1
+        widths = [SIMHASH_BITS // count + (1 if i < SIMHASH_BITS % count else 0) for i in range(count)]
+        self.bands = []
+        offset = 0
+        for width in widths:
+            self.bands.append((offset, width))
+            offset += width
+
+    def create_tables(self, cursor):
+        """Create the signature and band tables if needed"""
+        if self.tables_ready:
+            return
+        for sql in SCHEMAS[self.dialect]:
+            cursor.execute(sql.format(simhash=self.simhash_table, band=self.band_table))
+        self.tables_ready = True
+
+    def signature(self, record):
+        """SimHash of a record, kept on the record as _simhash so it is computed once"""
+        if '_simhash' not in record:
+            text = html_to_text(decode_content(record.get('content') or ''))[:self.content_chars]
+            record['_simhash'] = simhash(record.get('title', ''), text)
+        return record['_simhash']
+
+    def band_values(self, value):
+        return [(band, (value >> offset) & ((1 << width) - 1)) for band, (offset, width) in enumerate(self.bands)]
+
+    def find_match(self, cursor, table_name, value, numbers, exclude_id=None):
+        """(record_id, cluster_id, distance) of the closest stored row within MAX_DISTANCE, or None
+
+        Only rows with the same title numbers qualify: lots of one project share most of
+        their text and differ in little more than the lot number. With more than MAX_CANDIDATES
+        candidates the newest rows are compared, a repost follows its original closely.
+        """
+        bands = self.band_values(value)
+        band_sql = ' OR '.join(['(b.`band` = %s AND b.`value` = %s)'] * len(bands))
+        cursor.execute(
+            f"SELECT DISTINCT s.`record_id`, s.`simhash`, s.`cluster_id` FROM `{self.band_table}` b "
+            f"JOIN `{self.simhash_table}` s ON s.`table_name` = b.`table_name` AND s.`record_id` = b.`record_id` "
+            f"WHERE b.`table_name` = %s AND ({band_sql}) AND s.`title_numbers` = %s ORDER BY s.`record_id` DESC LIMIT %s",
+            [table_name] + [part for band in bands for part in band] + [numbers, self.max_candidates])
+        best = None
+        for record_id, stored, cluster_id in cursor.fetchall():
+            if record_id == exclude_id:
+                continue
+            distance = hamming_distance(value, to_unsigned(stored))
+            if distance <= self.max_distance and (best is None or distance < best[2]):
+                best = (record_id, cluster_id, distance)
+        return best
+
+    def add(self, cursor, table_name, record_id, value, numbers, cluster_id):
+        cursor.execute(
+            f"INSERT INTO `{self.simhash_table}` (`table_name`, `record_id`, `simhash`, `title_numbers`, `cluster_id`) "
+            f"VALUES (%s, %s, %s, %s, %s)", (table_name, record_id, to_signed(value), numbers, cluster_id))
+        cursor.executemany(
+            f"INSERT INTO `{self.band_table}` (`table_name`, `band`, `value`, `record_id`) VALUES (%s, %s, %s, %s)",
+            [(table_name, band, band_value, record_id) for band, band_value in self.band_values(value)])
+
+    def index_records(self, cursor, table_name, rows):
+        """Index new rows given as (record_id, record) pairs in id order, returns the number of near-duplicates
+
+        Rows are added one by one, so a repost later in the same batch matches an earlier one.
+        """
+        self.create_tables(cursor)
+        duplicates = 0
+        for record_id, record in rows:
+            value = self.signature(record)
+            numbers = title_numbers(record.get('title'))
+            match = self.find_match(cursor, table_name, value, numbers)
+            cluster_id = match[1] if match else record_id
+            self.add(cursor, table_name, record_id, value, numbers, cluster_id)
+            if match:
+                duplicates += 1
+                logging.info("Near-duplicate in %s: id %s matches id %s (%d bits apart): %.50s",
+                             table_name, record_id, match[0], match[2], record.get('title', ''))
+        return duplicates
+
+    def reindex_record(self, cursor, table_name, record_id, record):
+        """Replace the signature of a rewritten row, it keeps its cluster if it still matches one"""
+        self.create_tables(cursor)
+        cursor.execute(f"DELETE FROM `{self.band_table}` WHERE `table_name` = %s AND `record_id` = %s",
+                       (table_name, record_id))
+        cursor.execute(f"DELETE FROM `{self.simhash_table}` WHERE `table_name` = %s AND `record_id` = %s",
+                       (table_name, record_id))
+        record.pop('_simhash', None)
+        value = self.signature(record)
+        numbers = title_numbers(record.get('title'))
+        match = self.find_match(cursor, table_name, value, numbers, exclude_id=record_id)
+        self.add(cursor, table_name, record_id, value, numbers, match[1] if match else record_id)
+
+
+def backfill(db, batch_size=500):
+    """Index rows stored before the near-duplicate index existed, returns the number of rows indexed"""
+    index = db.near_duplicates
+    cursor = db.connection.cursor()
+    total = 0
+    try:
+        index.create_tables(cursor)
+        for table_name in (db.crawler_table, db.candidate_table):
+            last_id = 0
+            while True:
+                cursor.execute(
+                    f"SELECT r.`id`, r.`title`, r.`content` FROM `{table_name}` r "
+                    f"LEFT JOIN `{index.simhash_table}` s ON s.`table_name` = %s AND s.`record_id` = r.`id` "
+                    f"WHERE s.`record_id` IS NULL AND r.`id` > %s ORDER BY r.`id` LIMIT %s",
+                    (table_name, last_id, batch_size))
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                duplicates = index.index_records(cursor, table_name, [
+                    (record_id, {'title': title, 'content': content}) for record_id, title, content in rows
+                ])
+                db.connection.commit()
+                last_id = rows[-1][0]
+                total += len(rows)
+                logging.info(f"Indexed {total} rows, {duplicates} near-duplicates in the last batch of {table_name}")
+    finally:
+        cursor.close()
+    return total
+
+
+def find_clusters(db, table_name, limit=50):
+    """Clusters with more than one row, newest first, as (cluster_id, [(record_id, time, title), ...])"""
+    index = db.near_duplicates
+    cursor = db.connection.cursor()
+    try:
+        index.create_tables(cursor)
+        cursor.execute(
+            f"SELECT `cluster_id` FROM `{index.simhash_table}` WHERE `table_name` = %s "
+            f"GROUP BY `cluster_id` HAVING COUNT(*) > 1 ORDER BY `cluster_id` DESC LIMIT %s", (table_name, limit))
+        clusters = []
+        for (cluster_id,) in cursor.fetchall():
+            cursor.execute(
+                f"SELECT r.`id`, r.`time`, r.`title` FROM `{index.simhash_table}` s "
+                f"JOIN `{table_name}` r ON r.`id` = s.`record_id` "
+                f"WHERE s.`table_name` = %s AND s.`cluster_id` = %s ORDER BY r.`id`", (table_name, cluster_id))
+            clusters.append((cluster_id, cursor.fetchall()))
+        return clusters
+    finally:
+        cursor.close()
+
+
+def main():
+    """Main function - list near-duplicate clusters or index existing rows"""
+    import argparse
+    from log_config import setup_logging
+    from scraper import DatabaseManager
+
+    parser = argparse.ArgumentParser(description='Near-duplicate index of reposted and amended notices')
+    parser.add_argument('--backfill', action='store_true', help='Index rows that are not in the near-duplicate index yet')
+    parser.add_argument('--table', choices=['candidate', 'crawler'], default='crawler',
+                        help='Table whose clusters are listed')
+    parser.add_argument('--limit', type=int, default=50, help='Maximum number of clusters')
+    args = parser.parse_args()
+
+    setup_logging('scraper.log')
+    db = DatabaseManager()
+    if not db.connect():
+        return
+    try:
+        if args.backfill:
+            print(f"Indexed {backfill(db)} rows")
+        for cluster_id, rows in find_clusters(db, db.get_table_name(args.table), args.limit):
+            print(f"Cluster {cluster_id}:")
+            for record_id, time_str, title in rows:
+                print(f"  {record_id:>8}  {time_str}  {title}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
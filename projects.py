@@ -0,0 +1,353 @@
+import logging
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime
+
+from companies import INSERT_IGNORE
+from content_pipeline import decode_content, html_to_text
+from settings import load_config
+
+# Labels in front of a project or tender code on detail pages
+PROJECT_CODE_PATTERN = re.compile(
+    r'(?:招标项目编号|项目编号|招标编号|采购编号|项目代码|标段编号)\s*[:：]?\s*'
+    r'([A-Za-z0-9][A-Za-z0-9\-_/.〔〕\[\]【】]{2,63})')
+
+# Notice-type words at the end of a title, stripped so all notices of a project share one name
+NOTICE_SUFFIXES = [
+    '中标候选人公示', '成交候选人公示', '入围单位公示', '评标结果公示', '中标结果公示', '候选人公示',
+    '资格预审公告', '竞争性谈判公告', '招标公告', '采购公告', '比选公告', '询价公告', '公告', '公示',
+]
+
+# A code written into the title, e.g. （项目编号：XXX）
+TITLE_CODE_PATTERN = re.compile(r'（(?:招标项目编号|项目编号|招标编号|采购编号)[:：][^）]*）')
+
+SCHEMAS = {
+    'mysql': [
+        """
+        CREATE TABLE IF NOT EXISTS `{project}` (
+            `id` INT UNSIGNED NOT NULL AUTO_INCREMENT,
+            `code` VARCHAR(64) NULL,
+            `norm_name` VARCHAR(255) NOT NULL,
+            `createtime` INT UNSIGNED NOT NULL,
+            PRIMARY KEY (`id`),
+            UNIQUE KEY `uniq_code` (`code`),
+            KEY `idx_norm_name` (`norm_name`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS `{link}` (
+            `project_id` INT UNSIGNED NOT NULL,
+            `table_name` VARCHAR(64) NOT NULL,
+            `record_id` INT UNSIGNED NOT NULL,
+            PRIMARY KEY (`table_name`, `record_id`),
+            KEY `idx_project` (`project_id`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """,
+    ],
+    'sqlite': [
+        """
+        CREATE TABLE IF NOT EXISTS `{project}` (
+            `id` INTEGER PRIMARY KEY AUTOINCREMENT,
+            `code` TEXT UNIQUE, `norm_name` TEXT NOT NULL, `createtime` INTEGER NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS `idx_{project}_norm_name` ON `{project}` (`norm_name`)",
+        """
+        CREATE TABLE IF NOT EXISTS `{link}` (
+            `project_id` INTEGER NOT NULL, `table_name` TEXT NOT NULL, `record_id` INTEGER NOT NULL,
+            PRIMARY KEY (`table_name`, `record_id`)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS `idx_{link}_project` ON `{link}` (`project_id`)",
+    ],
+}
+
+UPDATE_IGNORE = {'mysql': 'UPDATE IGNORE', 'sqlite': 'UPDATE OR IGNORE'}
+
+
+def normalize_project_code(code):
+    """Canonical spelling of a project code: half-width, upper case, no trailing punctuation"""
+    if not code:
+        return None
+    code = unicodedata.normalize('NFKC', code).strip().upper().rstrip('.-_/')
+    return code or None
+
+
+def extract_project_code(text):
+    """First project or tender code found in a text, or None"""
+    if not text:
+        return None
+    match = PROJECT_CODE_PATTERN.search(unicodedata.normalize('NFKC', text))
+    return normalize_project_code(match.group(1)) if match else None
+
+
+def normalize_project_name(title):
+    """Project name shared by the tender announcement and the candidate notice of a project
+
+    The title is normalized like a company name (NFKC, no whitespace, full-width parentheses),
+    a code written into it is dropped, and notice-type suffixes such as 招标公告 or
+    中标候选人公示 are stripped.
+    """
+    if not title:
+        return ''
+    name = unicodedata.normalize('NFKC', title)
+    name = re.sub(r'\s+', '', name).replace('(', '（').replace(')', '）')
+    name = TITLE_CODE_PATTERN.sub('', name)
+    if name.startswith('关于'):
+        name = name[2:]
+    stripped = True
+    while stripped:
+        stripped = False
+        name = name.strip('，,;；、.。:：-')
+        for suffix in NOTICE_SUFFIXES:
+            if name.endswith(suffix) and len(name) > len(suffix):
+                name = name[:-len(suffix)].rstrip('的')
+                stripped = True
+                break
+    return name.upper()
+
+
+def project_keys(record):
+    """(code, normalized name) of a record
+
+    Scraped records carry the values extracted from the detail page as _project_code and
+    _project_name; for other records (backfill, older spool entries) they are derived from
+    the title and, if present, the content.
+    """
+    name = record.get('_project_name') or normalize_project_name(record.get('title'))
+    if '_project_code' in record:
+        return record['_project_code'], name
+    code = extract_project_code(record.get('title'))
+    if not code and record.get('content'):
+        code = extract_project_code(html_to_text(decode_content(record['content'])))
+    return code, name
+
+
+class ProjectIndex:
+    """Project Index Class - project dictionary and notice<->project link table
+
+    Tender announcements and candidate notices are linked to one project row, matched by
+    project code, or by normalized project name when a notice carries no code. "The tender
+    and its candidates" is then an indexed lookup on the link table instead of fuzzy title
+    matching. Project ids are cached by code and name.
+    """
+
+    def __init__(self, config_file='config.ini', dialect='mysql'):
+        config = load_config(config_file)
+        self.enabled = config.getboolean('Projects', 'ENABLED', fallback=False)
+        self.cache_size = config.getint('Projects', 'CACHE_SIZE', fallback=10000)
+        self.project_table = config.get('Tables', 'PROJECT_TABLE', fallback='fa_project')
+        self.link_table = config.get('Tables', 'PROJECT_LINK_TABLE', fallback='fa_project_notice')
+        self.dialect = dialect
+
+        self.lock = threading.Lock()
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.tables_ready = False
+
+    def create_tables(self, cursor):
+        """Create the project and link tables if needed"""
+        for sql in SCHEMAS[self.dialect]:
+            cursor.execute(sql.format(project=self.project_table, link=self.link_table))
+        self.tables_ready = True
+
+    def cached(self, key):
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return self.cache[key]
+            self.misses += 1
+            return None
+
+    def remember(self, key, project_id):
+        with self.lock:
+            self.cache[key] = project_id
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    def get_project_id(self, cursor, code, name):
+        """Id of the project of a notice, inserted into the dictionary on first sight
+
+        A code is matched first; a project known only by name adopts the code of the first
+        notice that has one. Without a code the newest project of that name is used.
+        """
+        if not code and not name:
+            return None
+        key = ('code', code) if code else ('name', name)
+        project_id = self.cached(key)
+        if project_id is not None:
+            return project_id
+
+        if code:
+            cursor.execute(f"SELECT `id` FROM `{self.project_table}` WHERE `code` = %s", (code,))
+            row = cursor.fetchone()
+            if not row and name:
+                cursor.execute(f"SELECT `id` FROM `{self.project_table}` WHERE `norm_name` = %s AND `code` IS NULL "
+                               f"ORDER BY `id` DESC LIMIT 1", (name,))
+                row = cursor.fetchone()
+                if row:
+                    cursor.execute(f"{UPDATE_IGNORE[self.dialect]} `{self.project_table}` SET `code` = %s "
+                                   f"WHERE `id` = %s AND `code` IS NULL", (code, row[0]))
+        else:
+            cursor.execute(f"SELECT `id` FROM `{self.project_table}` WHERE `norm_name` = %s "
+                           f"ORDER BY `id` DESC LIMIT 1", (name,))
+            row = cursor.fetchone()
+
+        if row:
+            project_id = row[0]
+        else:
+            cursor.execute(
+                f"{INSERT_IGNORE[self.dialect]} INTO `{self.project_table}` (`code`, `norm_name`, `createtime`) "
+                f"VALUES (%s, %s, %s)", (code, name, int(datetime.now().timestamp())))
+            if code:
+                cursor.execute(f"SELECT `id` FROM `{self.project_table}` WHERE `code` = %s", (code,))
+            else:
+                cursor.execute(f"SELECT `id` FROM `{self.project_table}` WHERE `norm_name` = %s "
+                               f"ORDER BY `id` DESC LIMIT 1", (name,))
+            project_id = cursor.fetchone()[0]
+            if name:
+                # Later notices without a code go to the newest project of the name
+                self.remember(('name', name), project_id)
+
+        self.remember(key, project_id)
+        return project_id
+
+    def link_records(self, cursor, table_name, rows):
+        """Link rows of a table to their projects, rows are (record_id, code, name) tuples"""
+        if not self.tables_ready:
+            self.create_tables(cursor)
+
+        links = []
+        for record_id, code, name in rows:
+            project_id = self.get_project_id(cursor, code, name)
+            if project_id is not None:
+                links.append((project_id, table_name, record_id))
+
+        if links:
+            cursor.executemany(
+                f"{INSERT_IGNORE[self.dialect]} INTO `{self.link_table}` (`project_id`, `table_name`, `record_id`) "
+                f"VALUES (%s, %s, %s)", links)
+        return len(links)
+
+    def relink_record(self, cursor, table_name, record_id, code, name):
+        """Replace the link of a rewritten row"""
+        if not self.tables_ready:
+            self.create_tables(cursor)
+        cursor.execute(f"DELETE FROM `{self.link_table}` WHERE `table_name` = %s AND `record_id` = %s",
+                       (table_name, record_id))
+        return self.link_records(cursor, table_name, [(record_id, code, name)])
+
+    def clear_cache(self):
+        """Forget all cached ids, called when a transaction that may have inserted some of them is rolled back"""
+        with self.lock:
+            self.cache.clear()
+
+    def stats(self):
+        """Project cache statistics"""
+        with self.lock:
+            return {'size': len(self.cache), 'hits': self.hits, 'misses': self.misses}
+
+
+def backfill(db, batch_size=500):
+    """Link rows stored before the project index existed, returns the number of rows linked"""
+    projects = db.projects
+    cursor = db.connection.cursor()
+    total = 0
+    try:
+        projects.create_tables(cursor)
+        for table_name in (db.crawler_table, db.candidate_table):
+            last_id = 0
+            while True:
+                cursor.execute(
+                    f"SELECT t.`id`, t.`title`, t.`content` FROM `{table_name}` t "
+                    f"LEFT JOIN `{projects.link_table}` l ON l.`table_name` = %s AND l.`record_id` = t.`id` "
+                    f"WHERE l.`record_id` IS NULL AND t.`id` > %s ORDER BY t.`id` LIMIT %s",
+                    (table_name, last_id, batch_size))
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                projects.link_records(cursor, table_name, [
+                    (record_id,) + project_keys({'title': title, 'content': content})
+                    for record_id, title, content in rows
+                ])
+                db.connection.commit()
+                last_id = rows[-1][0]
+                total += len(rows)
+                logging.info(f"Linked {total} rows to projects")
+    finally:
+        cursor.close()
+    return total
+
+
+def find_project(db, text):
+    """Project matching a code or title, with its tender announcements and candidate notices
+
+    Returns None if no project matches, else a dict with the project id, code and name,
+    the tenders as (time, title, tenderer) tuples and the candidate notices as
+    (time, title, candidate) tuples, newest first.
+    """
+    projects = db.projects
+    cursor = db.connection.cursor()
+    try:
+        code = normalize_project_code(text)
+        cursor.execute(f"SELECT `id`, `code`, `norm_name` FROM `{projects.project_table}` WHERE `code` = %s", (code,))
+        project = cursor.fetchone()
+        if not project:
+            cursor.execute(f"SELECT `id`, `code`, `norm_name` FROM `{projects.project_table}` WHERE `norm_name` = %s "
+                           f"ORDER BY `id` DESC LIMIT 1", (normalize_project_name(text),))
+            project = cursor.fetchone()
+        if not project:
+            return None
+
+        notices = {}
+        for key, table_name, column in (('tenders', db.crawler_table, 'tenderer'),
+                                        ('candidates', db.candidate_table, 'candidate')):
+            cursor.execute(
+                f"SELECT t.`time`, t.`title`, t.`{column}` FROM `{projects.link_table}` l "
+                f"JOIN `{table_name}` t ON t.`id` = l.`record_id` "
+                f"WHERE l.`project_id` = %s AND l.`table_name` = %s ORDER BY t.`time` DESC", (project[0], table_name))
+            notices[key] = cursor.fetchall()
+        return {'id': project[0], 'code': project[1], 'name': project[2], **notices}
+    finally:
+        cursor.close()
+
+
+def main():
+    """Main function - show a project's tender and candidates, or backfill the link table"""
+    import argparse
+    from log_config import setup_logging
+    from scraper import DatabaseManager
+
+    parser = argparse.ArgumentParser(description='Project index: show the tender and candidate notices of a project')
+    parser.add_argument('project', nargs='?', help='Project code or title (any notice title of the project)')
+    parser.add_argument('--backfill', action='store_true', help='Link stored rows that are not in the project index yet')
+    args = parser.parse_args()
+
+    setup_logging('scraper.log')
+    db = DatabaseManager()
+    if not db.connect():
+        return
+    try:
+        if args.backfill:
+            print(f"Linked {backfill(db)} rows")
+        if args.project:
+            project = find_project(db, args.project)
+            if not project:
+                print(f"No project found for {args.project}")
+                return
+            print(f"{project['name']}  编号: {project['code'] or '-'}")
+            for time_str, title, tenderer in project['tenders']:
+                print(f"  招标公告  {time_str}  {title}  招标人: {tenderer}")
+            for time_str, title, candidate in project['candidates']:
+                print(f"  候选人公示  {time_str}  {title}")
+                print(f"      {candidate}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
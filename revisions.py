@@ -0,0 +1,140 @@
+import hashlib
+import json
+from datetime import datetime
+
+from content_pipeline import decode_content, html_to_text
+from settings import load_config
+
+SCHEMAS = {
+    'mysql': [
+        """
+        CREATE TABLE IF NOT EXISTS `{fingerprint}` (
+            `table_name` VARCHAR(64) NOT NULL,
+            `record_id` INT UNSIGNED NOT NULL,
+            `url` VARCHAR(512) NOT NULL,
+            `fingerprint` CHAR(40) NOT NULL,
+            `etag` VARCHAR(255) NULL,
+            `last_modified` VARCHAR(64) NULL,
+            `checked_at` INT UNSIGNED NOT NULL,
+            PRIMARY KEY (`table_name`, `record_id`),
+            UNIQUE KEY `uniq_url` (`url`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS `{revision}` (
+            `id` INT UNSIGNED NOT NULL AUTO_INCREMENT,
+            `table_name` VARCHAR(64) NOT NULL,
+            `record_id` INT UNSIGNED NOT NULL,
+            `fingerprint` CHAR(40) NOT NULL,
+            `data` LONGTEXT NOT NULL,
+            `createtime` INT UNSIGNED NOT NULL,
+            PRIMARY KEY (`id`),
+            KEY `idx_record` (`table_name`, `record_id`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """,
+    ],
+    'sqlite': [
+        """
+        CREATE TABLE IF NOT EXISTS `{fingerprint}` (
+            `table_name` TEXT NOT NULL, `record_id` INTEGER NOT NULL, `url` TEXT NOT NULL UNIQUE,
+            `fingerprint` TEXT NOT NULL, `etag` TEXT, `last_modified` TEXT, `checked_at` INTEGER NOT NULL,
+            PRIMARY KEY (`table_name`, `record_id`)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS `{revision}` (
+            `id` INTEGER PRIMARY KEY AUTOINCREMENT, `table_name` TEXT NOT NULL, `record_id` INTEGER NOT NULL,
+            `fingerprint` TEXT NOT NULL, `data` TEXT NOT NULL, `createtime` INTEGER NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS `idx_{revision}_record` ON `{revision}` (`table_name`, `record_id`)",
+    ],
+}
+
+
+def record_fingerprint(record):
+    """SHA-1 over the stored fields of a record
+
+    The content is compared as plain text, so markup-only differences (or a different
+    CONTENT_MODE) do not count as a change. Keys starting with "_" carry fetch metadata
+    and createtime is set on insert, neither is part of the fingerprint.
+    """
+    parts = []
+    for key in sorted(record):
+        if key == 'createtime' or key == 'id' or key.startswith('_'):
+            continue
+        value = record[key]
+        if key == 'content':
+            value = html_to_text(decode_content(value or ''))
+        parts.append(f"{key}={'' if value is None else value}")
+    return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+class RevisionStore:
+    """Revision Store Class - per-record content fingerprints and the history of amended rows
+
+    The fingerprint table maps each stored row to its detail URL, fingerprint and the
+    validators (ETag / Last-Modified) of its last fetch, so a refresh can use conditional
+    requests and only rewrite rows whose content changed. The previous version of every
+    rewritten row is kept in the revision table.
+    """
+
+    def __init__(self, config_file='config.ini', dialect='mysql'):
+        config = load_config(config_file)
+        self.enabled = config.getboolean('Refresh', 'ENABLED', fallback=False)
+        self.fingerprint_table = config.get('Tables', 'FINGERPRINT_TABLE', fallback='fa_fingerprint')
+        self.revision_table = config.get('Tables', 'REVISION_TABLE', fallback='fa_revision')
+        self.dialect = dialect
+        self.tables_ready = False
+
+    def create_tables(self, cursor):
+        """Create the fingerprint and revision tables if needed"""
+        if self.tables_ready:
+            return
+        for sql in SCHEMAS[self.dialect]:
+            cursor.execute(sql.format(fingerprint=self.fingerprint_table, revision=self.revision_table))
+        self.tables_ready = True
+
+    def lookup(self, cursor, url):
+        """(table_name, record_id, fingerprint, etag, last_modified) stored for a URL, or None"""
+        self.create_tables(cursor)
+        cursor.execute(
+            f"SELECT `table_name`, `record_id`, `fingerprint`, `etag`, `last_modified` "
+            f"FROM `{self.fingerprint_table}` WHERE `url` = %s", (url,))
+        return cursor.fetchone()
+
+    def save_fingerprints(self, cursor, table_name, rows):
+        """Store fingerprints, rows are (record_id, url, fingerprint, etag, last_modified) tuples"""
+        if not rows:
+            return
+        self.create_tables(cursor)
+        checked_at = int(datetime.now().timestamp())
+        # REPLACE also drops the old entry of a URL that now points at another row
+        cursor.executemany(
+            f"REPLACE INTO `{self.fingerprint_table}` "
+            f"(`table_name`, `record_id`, `url`, `fingerprint`, `etag`, `last_modified`, `checked_at`) "
+            f"VALUES (%s, %s, %s, %s, %s, %s, %s)",
+            [(table_name,) + tuple(row) + (checked_at,) for row in rows])
+
+    def touch(self, cursor, url):
+        """Record that a URL was checked and found unchanged"""
+        self.create_tables(cursor)
+        cursor.execute(f"UPDATE `{self.fingerprint_table}` SET `checked_at` = %s WHERE `url` = %s",
+                       (int(datetime.now().timestamp()), url))
+
+    def add_revision(self, cursor, table_name, record_id, fingerprint, data):
+        """Keep the previous version of a row before it is rewritten"""
+        self.create_tables(cursor)
+        cursor.execute(
+            f"INSERT INTO `{self.revision_table}` (`table_name`, `record_id`, `fingerprint`, `data`, `createtime`) "
+            f"VALUES (%s, %s, %s, %s, %s)",
+            (table_name, record_id, fingerprint, json.dumps(data, ensure_ascii=False, default=str),
+             int(datetime.now().timestamp())))
+
+    def history(self, cursor, table_name, record_id):
+        """Previous versions of a row, oldest first, as (createtime, fingerprint, data) tuples"""
+        self.create_tables(cursor)
+        cursor.execute(
+            f"SELECT `createtime`, `fingerprint`, `data` FROM `{self.revision_table}` "
+            f"WHERE `table_name` = %s AND `record_id` = %s ORDER BY `id`", (table_name, record_id))
+        return [(createtime, fingerprint, json.loads(data)) for createtime, fingerprint, data in cursor.fetchall()]
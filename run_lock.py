@@ -0,0 +1,80 @@
+import json
+import logging
+import os
+from datetime import datetime
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+
+def _lock_file(handle):
+    """Lock an open file without waiting, raises OSError if another handle holds it"""
+    if os.name == 'nt':
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+    else:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+def _unlock_file(handle):
+    if os.name == 'nt':
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+class RunLock:
+    """Run Lock Class - cross-process lock held while one channel is crawled
+
+    An operating system lock on a file in LOCK_DIR (flock on Linux/macOS, msvcrt on
+    Windows). It is per open file, so it also keeps two threads of one process apart, and
+    the operating system drops it when the holding process exits: a crashed or killed run
+    never leaves a stale lock behind. The file names the pid and start time of the holder.
+    """
+
+    def __init__(self, name, lock_dir='locks'):
+        self.name = name
+        self.path = os.path.join(lock_dir, f"{name}.lock")
+        self.handle = None
+
+    def acquire(self):
+        """Take the lock without waiting, returns False if another run holds it"""
+        if self.handle:
+            return True
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        handle = open(self.path, 'a+', encoding='utf-8')
+        try:
+            _lock_file(handle)
+        except OSError:
+            handle.close()
+            return False
+        # Byte 0 is the lock on Windows, the holder details follow it
+        handle.seek(1)
+        handle.truncate()
+        handle.write(json.dumps({'pid': os.getpid(), 'started_at': datetime.now().isoformat(timespec='seconds')}))
+        handle.flush()
+        self.handle = handle
+        return True
+
+    def holder(self):
+        """pid and start time of the run holding the lock, None if unknown"""
+        try:
+            with open(self.path, encoding='utf-8') as handle:
+                text = handle.read()
+            return json.loads(text[text.find('{'):]) if '{' in text else None
+        except (OSError, ValueError):
+            return None
+
+    def release(self):
+        if not self.handle:
+            return
+        try:
+            _unlock_file(self.handle)
+        except OSError as e:
+            logging.warning(f"Cannot release run lock {self.path}: {e}")
+        finally:
+            self.handle.close()
+            self.handle = None
@@ -1,31 +1,166 @@
-import requests
-from bs4 import BeautifulSoup
 import logging
 from datetime import datetime, timedelta
-from apscheduler.schedulers.blocking import BlockingScheduler
-import time
 import os
 import atexit
 import configparser
+import multiprocessing
 import signal
 import sys
-from scraper import BidCandidateScraper, BidAnnouncementScraper
+import time
+from channels import RateLimiter, get_enabled_channels, load_channels
+from checkpoint import CheckpointJournal
+from log_config import setup_logging
+from settings import load_config
+
+class CrawlTask:
+    """Crawl Task Class - one scheduled crawl of the channels: the days they missed, then amended notices"""
+    
+    def __init__(self, config_file='config.ini'):
+        self.config = load_config(config_file)
+        self.config_file = config_file
+        
+        # Gap detection: days of the last CATCHUP_DAYS days without a finished run are crawled again
+        self.catchup_days = self.config.getint('Schedule', 'CATCHUP_DAYS', fallback=7)
+        self.catchup_time_budget = self.config.getfloat('Schedule', 'CATCHUP_TIME_BUDGET', fallback=3600) or None
+        # Amended notices are re-checked after new notices, with what is left of the run's budget
+        self.refresh_days = self.config.getint('Schedule', 'REFRESH_DAYS', fallback=0)
+        self.time_budget = self.config.getfloat('Scraping', 'TIME_BUDGET', fallback=0) or None
+        self.request_budget = self.config.getint('Scraping', 'REQUEST_BUDGET', fallback=0) or None
+    
+    def find_missing_dates(self, channels):
+        """Days up to yesterday that have no finished run for every given channel, oldest first"""
+        yesterday = datetime.now() - timedelta(days=1)
+        days = [(yesterday - timedelta(days=offset)).strftime('%Y-%m-%d')
+                for offset in range(max(1, self.catchup_days) - 1, -1, -1)]
+        
+        # The checkpoint journal is the run ledger: finished runs record the channel and date range they covered
+        journal = CheckpointJournal(self.config_file)
+        try:
+            covered = set(days)
+            for channel in channels:
+                covered &= journal.covered_dates(channel, days[0], days[-1])
+        finally:
+            journal.close()
+        return [day for day in days if day not in covered]
+    
+    def run(self, channels):
+        """Crawl the channels, returns the job status (success or skipped) and a one-line result"""
+        # The crawler and its HTTP/HTML/MySQL libraries are loaded on the first run, not at startup
+        from channels import CrawlBudget
+        from scraper import CrawlEngine
+        
+        # 计算要抓取的日期：昨天，以及最近几天中因停机或失败而漏抓的日期
+        missing = self.find_missing_dates(channels)
+        time_budget = self.time_budget
+        if len(missing) > 1:
+            time_budget = self.catchup_time_budget
+        # One budget and one rate limit for all channels of the task: new notices first (channels
+        # in PRIORITY order), then amended ones with what is left
+        budget = CrawlBudget(time_budget, self.request_budget)
+        rate_limiter = RateLimiter(self.config.getfloat('Scraping', 'REQUEST_DELAY', fallback=1.0))
+        
+        summaries = []
+        details = []
+        if missing:
+            start_date, end_date = missing[0], missing[-1]
+            if len(missing) > 1:
+                # One range crawl over all gaps instead of one run per missed day, newest days first
+                logging.info(f"Catching up {len(missing)} missed days in one crawl: {', '.join(missing)}")
+            logging.info(f"Setting scraping date range to: {start_date} ~ {end_date}")
+            
+            engine = CrawlEngine(channels, target_date=end_date, start_date=start_date, end_date=end_date, resume=True,
+                                 budget=budget, rate_limiter=rate_limiter, config_file=self.config_file)
+            summaries += engine.run()
+            details.append(f"{start_date} ~ {end_date}: saved {sum(s['saved'] for s in summaries)}, "
+                           f"failed {sum(s['failed'] for s in summaries)}")
+            
+            remaining = self.find_missing_dates(channels)
+            if remaining:
+                logging.warning(f"Days still missing, will be retried on the next run: {', '.join(remaining)}")
+                details.append(f"still missing {len(remaining)} days")
+        else:
+            logging.info("All recent days are already covered, nothing to scrape")
+            details.append("nothing missing")
+        
+        if self.refresh_days > 0:
+            if budget.exhausted():
+                logging.warning("No budget left to re-check amended notices, skipped until the next run")
+            else:
+                today = datetime.now()
+                logging.info(f"Re-checking the last {self.refresh_days} days for amended notices...")
+                refreshed = CrawlEngine(channels, target_date=today.strftime('%Y-%m-%d'),
+                                        start_date=(today - timedelta(days=self.refresh_days)).strftime('%Y-%m-%d'),
+                                        end_date=today.strftime('%Y-%m-%d'), refresh=True, budget=budget,
+                                        rate_limiter=rate_limiter, config_file=self.config_file).run()
+                summaries += refreshed
+                details.append(f"refresh updated {sum(s.get('refresh', {}).get('updated', 0) for s in refreshed)}")
+        
+        usage = budget.summary()
+        details.append(f"{usage['requests']} requests")
+        # Every crawl found its channel locked by another run (a manual run, a second scheduler)
+        if summaries and all(summary.get('skipped') for summary in summaries):
+            return 'skipped', 'another crawl of the channel was running'
+        return 'success', '; '.join(details)
+
+
+def run_job(job_id, func, config_file='config.ini'):
+    """Run a job function returning (status, detail) and record the run and its duration in the job history"""
+    journal = CheckpointJournal(config_file)
+    run_id = journal.begin_job(job_id)
+    started = time.monotonic()
+    status, detail = 'failed', ''
+    try:
+        logging.info("=" * 60)
+        logging.info(f"Scheduled job {job_id} started")
+        logging.info("=" * 60)
+        status, detail = func()
+    except Exception as e:
+        detail = str(e)
+        logging.error(f"Scheduled job {job_id} failed: {e}")
+    finally:
+        duration = time.monotonic() - started
+        journal.end_job(run_id, status, duration, detail)
+        journal.close()
+        logging.info(f"Scheduled job {job_id} finished: {status} in {duration:.1f}s ({detail})")
+    return status
+
+
+def run_crawl_job(job_id, channels, config_file='config.ini'):
+    """Scheduled crawl of the channels, module level so the process executor can pickle it"""
+    if multiprocessing.parent_process() is not None:
+        # The worker process has no running log listener of its own, the job logs to its own file
+        setup_logging(f'scheduler_{job_id}.log', config_file)
+    return run_job(job_id, lambda: CrawlTask(config_file).run(channels), config_file)
+
+
+def show_history(job_id=None, limit=20, config_file='config.ini'):
+    """Print the run count and durations of every job, then its latest runs"""
+    journal = CheckpointJournal(config_file)
+    try:
+        stats = journal.job_stats()
+        runs = journal.job_history(job_id, limit)
+    finally:
+        journal.close()
+    
+    if not stats:
+        print("No scheduled job has run yet")
+        return
+    print(f"{'Job':<24}{'Runs':>6}{'OK':>6}{'Failed':>8}{'Skipped':>9}{'Avg(s)':>10}{'Max(s)':>10}  Last started")
+    for row in stats:
+        if job_id and row['job_id'] != job_id:
+            continue
+        print(f"{row['job_id']:<24}{row['runs']:>6}{row['success']:>6}{row['failed']:>8}{row['skipped']:>9}"
+              f"{row['avg_duration'] or 0:>10.1f}{row['max_duration'] or 0:>10.1f}  {row['last_started']}")
+    print()
+    for run in runs:
+        duration = f"{run['duration']:.1f}s" if run['duration'] is not None else '-'
+        print(f"#{run['id']:<6}{run['job_id']:<24}{run['status']:<9}{run['started_at']}  {duration:>9}  {run['detail']}")
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('scheduler.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
 
 class ScheduledScraper:
     def __init__(self, config_file='config.ini'):
         # Read configuration file
-        self.config = configparser.ConfigParser()
-        self.config.read(config_file, encoding='utf-8')
+        self.config = load_config(config_file)
         
         # Read scheduled task settings from config file
         try:
@@ -37,18 +172,58 @@ class ScheduledScraper:
             self.schedule_hour = 8
             self.schedule_minute = 0
         
-        self.candidate_scraper = BidCandidateScraper()
-        self.announcement_scraper = BidAnnouncementScraper()
-        self.scheduler = BlockingScheduler()
+        self.catchup_on_startup = self.config.getboolean('Schedule', 'CATCHUP_ON_STARTUP', fallback=True)
+        
+        # The crawl job runs in a worker thread or a worker process; it never overlaps itself and
+        # runs missed while the scheduler was busy or down are coalesced into one. Its channels
+        # run side by side inside the job (MAX_CONCURRENT_CHANNELS) under one budget and rate limit
+        self.executor = self.config.get('Schedule', 'EXECUTOR', fallback='thread').strip().lower()
+        if self.executor not in ('thread', 'process'):
+            logging.warning(f"Unknown executor {self.executor}, using thread")
+            self.executor = 'thread'
+        self.misfire_grace_time = self.config.getint('Schedule', 'MISFIRE_GRACE_TIME', fallback=3600) or None
+        self.channels = get_enabled_channels(self.config, load_channels(self.config))
         
-        # Set up scheduled task
+        # Daily partition and archive maintenance, only scheduled when one of them is configured
+        self.maintenance_enabled = (self.config.getboolean('Storage', 'PARTITIONING', fallback=False)
+                                    or self.config.getint('Storage', 'ARCHIVE_AFTER_DAYS', fallback=0) > 0)
+        self.maintenance_hour = self.config.getint('Storage', 'MAINTENANCE_HOUR', fallback=3)
+        
+        self.config_file = config_file
+        from apscheduler.events import EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED
+        from apscheduler.executors.pool import ProcessPoolExecutor, ThreadPoolExecutor
+        from apscheduler.schedulers.blocking import BlockingScheduler
+        if self.executor == 'process':
+            pool = ProcessPoolExecutor(1)
+        else:
+            pool = ThreadPoolExecutor(1)
+        self.scheduler = BlockingScheduler(
+            executors={'default': pool, 'maintenance': ThreadPoolExecutor(1)},
+            job_defaults={'coalesce': True, 'max_instances': 1, 'misfire_grace_time': self.misfire_grace_time})
+        self.scheduler.add_listener(self.record_skipped_run, EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES)
+        
+        # Set up the daily crawl of all channels, run at once on startup to catch up days missed while down
+        job_options = {'next_run_time': datetime.now()} if self.catchup_on_startup else {}
         self.scheduler.add_job(
-            func=self.run_scraping_task,
+            func=run_crawl_job,
             trigger="cron",
             hour=self.schedule_hour,
             minute=self.schedule_minute,
-            id='daily_scraping'
+            id='daily_scraping',
+            name='daily_scraping',
+            args=['daily_scraping', self.channels, config_file],
+            **job_options
         )
+        if self.maintenance_enabled:
+            self.scheduler.add_job(
+                func=run_job,
+                trigger="cron",
+                hour=self.maintenance_hour,
+                minute=0,
+                id='storage_maintenance',
+                args=['storage_maintenance', self.run_storage_maintenance, config_file],
+                executor='maintenance'
+            )
         
         # Register cleanup function on exit
         atexit.register(self.shutdown)
@@ -57,57 +232,60 @@ class ScheduledScraper:
         signal.signal(signal.SIGINT, self.signal_handler)
         signal.signal(signal.SIGTERM, self.signal_handler)
     
+    def run_storage_maintenance(self):
+        """Add upcoming monthly partitions and archive old content"""
+        from scraper import DatabaseManager
+        
+        db = DatabaseManager(self.config_file)
+        if not db.connect():
+            raise RuntimeError("cannot connect to database")
+        try:
+            result = db.maintain_storage()
+            logging.info(f"Storage maintenance: {result['partitions']} partitions added, "
+                         f"content of {result['archived']} rows archived")
+            return 'success', f"{result['partitions']} partitions added, {result['archived']} rows archived"
+        finally:
+            db.close()
+    
+    def record_skipped_run(self, event):
+        """Record job runs the scheduler did not start: too late (missed) or the previous run still going (overlap)"""
+        from apscheduler.events import EVENT_JOB_MISSED
+        
+        status = 'missed' if event.code == EVENT_JOB_MISSED else 'overlap'
+        scheduled = getattr(event, 'scheduled_run_time', None) or event.scheduled_run_times[0]
+        if status == 'missed':
+            logging.warning(f"Job {event.job_id} scheduled at {scheduled:%Y-%m-%d %H:%M:%S} missed its start "
+                            f"by more than {self.misfire_grace_time}s, skipped")
+        else:
+            logging.warning(f"Job {event.job_id} scheduled at {scheduled:%Y-%m-%d %H:%M:%S} skipped, "
+                            f"its previous run is still going")
+        journal = CheckpointJournal(self.config_file)
+        try:
+            journal.begin_job(event.job_id, status, f"scheduled at {scheduled:%Y-%m-%d %H:%M:%S}")
+        finally:
+            journal.close()
+    
     def signal_handler(self, signum, frame):
         """Handle termination signals"""
         logging.info(f"Received signal {signum}, shutting down...")
         self.shutdown()
         sys.exit(0)
     
-    def run_scraping_task(self):
-        """Execute scraping task"""
-        try:
-            logging.info("=" * 60)
-            logging.info("Scheduled task started")
-            logging.info("=" * 60)
-            
-            # 计算要抓取的日期：当前日期的前一天（即真正的昨天）
-            target_date = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-            logging.info(f"Setting target scraping date to: {target_date}")
-            
-            # Execute bid candidate scraping with explicit target date
-            logging.info("Starting bid candidate information scraping...")
-            self.candidate_scraper = BidCandidateScraper(target_date=target_date)
-            self.candidate_scraper.scrape_candidates()
-            
-            # Wait a while
-            logging.info("Candidate scraping completed, waiting 5 seconds before starting bid announcement scraping...")
-            time.sleep(5)
-            
-            # Execute bid announcement scraping with explicit target date
-            logging.info("Starting bid announcement information scraping...")
-            self.announcement_scraper = BidAnnouncementScraper(target_date=target_date)
-            self.announcement_scraper.scrape_announcements()
-            
-            logging.info("=" * 60)
-            logging.info("Scheduled task completed")
-            logging.info("=" * 60)
-            
-        except Exception as e:
-            logging.error(f"Scheduled task execution failed: {e}")
-    
     def start(self):
         """Start the scheduler"""
         try:
             logging.info("Starting scheduled task scheduler...")
-            logging.info(f"Task will run daily at {self.schedule_hour:02d}:{self.schedule_minute:02d}")
+            logging.info(f"Channels {', '.join(self.channels)} will be crawled daily at "
+                         f"{self.schedule_hour:02d}:{self.schedule_minute:02d} "
+                         f"in a worker {self.executor}")
             logging.info("Press Ctrl+C to stop")
             
             # Print special message for Windows users about termination
             if os.name == 'nt':  # Windows
                 logging.info("On Windows: If Ctrl+C doesn't work, press Ctrl+Break or close the terminal window")
-                
-            self.scheduler.start()
             
+            self.scheduler.start()
+        
         except KeyboardInterrupt:
             logging.info("Received stop signal (KeyboardInterrupt), shutting down...")
             self.shutdown()
@@ -126,7 +304,23 @@ class ScheduledScraper:
             logging.error(f"Error during shutdown: {e}")
 
 def main():
-    """Main function"""
+    """Main function - run the scheduler, or print the run history of its jobs"""
+    import argparse
+    
+    # Process pool workers of the packaged executable start through main() again
+    multiprocessing.freeze_support()
+    
+    parser = argparse.ArgumentParser(description='Daily scheduled crawl of the configured channels')
+    parser.add_argument('--history', action='store_true', help='Print the run history and durations of the jobs and exit')
+    parser.add_argument('--job', type=str, default=None, help='With --history, only this job, e.g. daily_scraping')
+    parser.add_argument('--limit', type=int, default=20, help='With --history, number of latest runs shown')
+    args = parser.parse_args()
+    
+    if args.history:
+        show_history(args.job, args.limit)
+        return
+    
+    setup_logging('scheduler.log')
     scheduled_scraper = ScheduledScraper()
     scheduled_scraper.start()
 
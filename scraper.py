@@ -1,32 +1,140 @@
-import requests
-from bs4 import BeautifulSoup
 import logging
 from datetime import datetime, timedelta
-from apscheduler.schedulers.blocking import BlockingScheduler
 import time
 import os
 import sys
 import re
-import pymysql
+import codecs
 import configparser
+from concurrent.futures import ThreadPoolExecutor
+from change_feed import ChangeFeed, WebhookDispatcher
+from channels import TABLE_COLUMNS, CrawlBudget, RateLimiter, get_enabled_channels, load_channels
+from checkpoint import CheckpointJournal
+from companies import CompanyIndex
+from content_pipeline import ContentPipeline, parsed_html
+from log_config import setup_logging
+from memo import MemoCache
+from near_duplicates import NearDuplicateIndex
+from projects import ProjectIndex, extract_project_code, normalize_project_name, project_keys
+from revisions import RevisionStore, record_fingerprint
+from run_lock import RunLock
+from settings import load_config, touch_write_stamp
+from sinks import open_sinks
+from spool import RecordSpool, SpoolDrainer
+from storage import StorageManager
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('scraper.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+# Dates on list and detail pages start with YYYY-MM-DD
+DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}')
+# Any date in a chunk of a list page, a hint that the stop condition may have been reached
+ANY_DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+# Bytes read from a response at a time
+CHUNK_SIZE = 16384
+
+# Candidate line formats, tried in order on each line of a candidate notice
+CANDIDATE_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    # Standard formats
+    r'第[一二三四五六七八九十\d]+入围单位\s*[:：]\s*(.+)',
+    r'第[一二三四五六七八九十\d]+中标候选人\s*[:：]\s*(.+)',
+    r'第[一二三四五六七八九十\d]+名\s*[:：]\s*(.+)',
+    r'入围单位\s*[:：]\s*(.+)',
+    r'中标候选人\s*[:：]\s*(.+)',
+    r'成交候选人\s*[:：]\s*(.+)',
+    r'供应商\s*[:：]\s*(.+)',
+    
+    # Extended formats - handle more complex expressions
+    r'第[一二三四五六七八九十\d]+\s*[:：]\s*(.+)',  # Simplified: No.[X]: Company name
+    r'[一二三四五六七八九十\d]+\s*[:：]\s*(.+)',    # More simplified: Number: Company name
+    r'入围.*?[:：]\s*(.+)',                        # Line containing "shortlisted"
+    r'中标.*?[:：]\s*(.+)',                        # Line containing "winning bid"
+    r'成交.*?[:：]\s*(.+)',                        # Line containing "transaction"
+    r'候选人.*?[:：]\s*(.+)',                      # Line containing "candidate"
+    
+    # Common formats in tables
+    r'^\s*([^：:]*有限公司)\s*$',                  # Company name on its own line
+    r'^\s*([^：:]*集团[^：:]*)\s*$',               # Group name on its own line
+    r'^\s*([^：:]*企业[^：:]*)\s*$',               # Enterprise name on its own line
+    r'^\s*([^：:]*股份[^：:]*)\s*$',               # Corporation name on its own line
+]]
+
+# Bump when the candidate patterns or cleaning rules change, so persisted memo entries are dropped
+NAME_RULES_VERSION = 1
+
+# Process-wide memo of cleaned names and line classifications, the same companies recur in most notices
+CANDIDATE_CACHE = MemoCache(version=NAME_RULES_VERSION)
+
+# Links and extraction results use __slots__ classes: thousands of them can be in flight
+# during a long backfill, and a slotted instance is a fraction of the size of a dict
+
+class Link:
+    """Link Class - one detail link found on a list page"""
+    
+    __slots__ = ('href', 'title', 'date')
+    
+    def __init__(self, href, title='', date=''):
+        self.href = href
+        self.title = title
+        self.date = date
+    
+    def to_dict(self):
+        """Plain dict, e.g. for a work queue payload"""
+        return {'href': self.href, 'title': self.title, 'date': self.date}
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Link from a dict with href, title and date keys"""
+        return cls(data['href'], data.get('title', ''), data.get('date', ''))
+    
+    def __repr__(self):
+        return f"Link({self.href!r}, {self.title!r}, {self.date!r})"
+
+class Page:
+    """Page Class - decoded body of a fetched page with the response fields the scrapers use"""
+    
+    __slots__ = ('url', 'status_code', 'headers', 'text', 'truncated')
+    
+    def __init__(self, url, status_code, headers, text, truncated=False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+        self.truncated = truncated  # Reading stopped early, by the size cap or a stop condition
+
+class CandidateDetails:
+    """Candidate Details Class - fields extracted from a candidate notice"""
+    
+    __slots__ = ('title', 'date', 'candidates', 'project_code')
+    
+    def __init__(self, title, date, candidates, project_code=None):
+        self.title = title
+        self.date = date
+        self.candidates = candidates  # Cleaned company names in rank order
+        self.project_code = project_code
+
+class AnnouncementDetails:
+    """Announcement Details Class - fields extracted from a tender announcement"""
+    
+    __slots__ = ('title', 'time', 'bid_conditions', 'tenderer', 'address', 'contact_person', 'contact_phone',
+                 'email', 'packages', 'project_code')
+    
+    def __init__(self, title, time):
+        self.title = title
+        self.time = time
+        self.bid_conditions = ''
+        self.tenderer = ''
+        self.address = ''
+        self.contact_person = ''
+        self.contact_phone = ''
+        self.email = ''
+        self.packages = ''
+        self.project_code = None
 
 class DatabaseManager:
     """Database Manager Class"""
     
     def __init__(self, config_file='config.ini'):
         """Initialize database connection"""
-        self.config = configparser.ConfigParser()
-        self.config.read(config_file, encoding='utf-8')
+        self.config = load_config(config_file)
         
         # Read database connection information from config file
         try:
@@ -61,17 +169,58 @@ class DatabaseManager:
             self.crawler_table = 'fa_crawler'
             logging.warning("Using default database configuration")
         
+        # Company dictionary and candidate<->company links, filled as candidate rows are inserted
+        self.companies = CompanyIndex(config_file)
+        self.projects = ProjectIndex(config_file)
+        self.storage = StorageManager(config_file)
+        # Content fingerprints and revision history used by --refresh
+        self.revisions = RevisionStore(config_file)
+        # SimHash signatures grouping reposted and amended notices into clusters
+        self.near_duplicates = NearDuplicateIndex(config_file)
+        # Touched after every committed write so read API processes drop their cached responses
+        self.write_stamp = self.config.get('API', 'WRITE_STAMP_FILE', fallback='api_write.stamp')
+        # Committed inserts and rewrites are published here for downstream consumers
+        self.feed = ChangeFeed(config_file)
+        
         self.connection = None
     
     def connect(self):
         """Establish database connection"""
+        import pymysql
+        
         try:
             self.connection = pymysql.connect(**self.db_config)
             logging.info("Database connection successful")
-            return True
         except Exception as e:
             logging.error(f"Database connection failed: {e}")
             return False
+        return self.prepare_tables()
+    
+    def prepare_tables(self):
+        """Create the index tables of the enabled features, returns False if that is not possible
+        
+        Done once after connecting rather than inside the insert transactions, because MySQL
+        commits implicitly on DDL and would commit a half-written batch.
+        """
+        cursor = self.connection.cursor()
+        try:
+            if self.companies.enabled:
+                self.companies.create_tables(cursor)
+            if self.projects.enabled:
+                self.projects.create_tables(cursor)
+            if self.revisions.enabled:
+                self.revisions.create_tables(cursor)
+            if self.near_duplicates.enabled:
+                self.near_duplicates.create_tables(cursor)
+            self.connection.commit()
+            return True
+        except Exception as e:
+            logging.error(f"Cannot create the index tables, grant CREATE or disable the feature in config.ini: {e}")
+            self.connection.close()
+            self.connection = None
+            return False
+        finally:
+            cursor.close()
     
     def close(self):
         """Close database connection"""
@@ -79,6 +228,26 @@ class DatabaseManager:
             self.connection.close()
             logging.info("Database connection closed")
     
+    def maintain_storage(self, archive_before=None):
+        """Keep monthly partitions ahead of the current month and archive old content, see StorageManager
+        
+        Tables are converted to partitions here only when [Storage] PARTITIONING is on.
+        Returns the number of partitions added and rows archived.
+        """
+        result = {'partitions': 0, 'archived': 0}
+        table_names = [self.candidate_table, self.crawler_table]
+        cursor = self.connection.cursor()
+        try:
+            for table_name in table_names:
+                if self.storage.partitioning and self.storage.dialect == 'mysql' and not self.storage.partitions(cursor, table_name):
+                    self.storage.partition_table(cursor, table_name)
+                result['partitions'] += self.storage.ensure_partitions(cursor, table_name)
+        finally:
+            cursor.close()
+        for table_name in table_names:
+            result['archived'] += self.storage.archive_content(self.connection, table_name, archive_before)
+        return result
+    
     def insert_candidate(self, title, time_str, content, candidate):
         """Insert bid candidate data to the configured candidate table"""
         try:
@@ -98,6 +267,7 @@ class DatabaseManager:
             
             cursor.execute(sql, (title, time_str, content, candidate, createtime))
             self.connection.commit()
+            touch_write_stamp(self.write_stamp)
             
             logging.info(f"Successfully inserted candidate data to {self.candidate_table}: {title[:50]}...")
             return True
@@ -128,6 +298,7 @@ class DatabaseManager:
             
             cursor.execute(sql, (title, time_str, condition, content, tenderer, address, contacts, mobile, email, createtime))
             self.connection.commit()
+            touch_write_stamp(self.write_stamp)
             
             logging.info(f"Successfully inserted announcement data to {self.crawler_table}: {title[:50]}...")
             return True
@@ -139,6 +310,228 @@ class DatabaseManager:
             if cursor:
                 cursor.close()
     
+    def get_table_name(self, table_type):
+        """Resolve a table type to the configured table name"""
+        if table_type == 'candidate':
+            return self.candidate_table
+        elif table_type == 'crawler':
+            return self.crawler_table
+        return table_type
+    
+    def find_existing(self, table_type, keys):
+        """Return the subset of (title, time) keys that already exist in the table"""
+        if not keys:
+            return set()
+        cursor = self.connection.cursor()
+        try:
+            placeholders = ', '.join(['(%s, %s)'] * len(keys))
+            sql = f"SELECT `title`, `time` FROM `{self.get_table_name(table_type)}` WHERE (`title`, `time`) IN ({placeholders})"
+            cursor.execute(sql, [value for key in keys for value in key])
+            return {(row[0], str(row[1])) for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+    
+    def find_ids(self, table_type, keys):
+        """Map (title, time) keys to row ids"""
+        cursor = self.connection.cursor()
+        try:
+            placeholders = ', '.join(['(%s, %s)'] * len(keys))
+            sql = f"SELECT `id`, `title`, `time` FROM `{self.get_table_name(table_type)}` WHERE (`title`, `time`) IN ({placeholders})"
+            cursor.execute(sql, [value for key in keys for value in key])
+            return {(row[1], str(row[2])): row[0] for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+    
+    def insert_records(self, table_type, records):
+        """Bulk insert records into the candidate or crawler table, skipping duplicates
+        
+        Raises on database errors so callers (the spool drainer) can keep the records and retry.
+        Returns the number of rows inserted.
+        """
+        # Known columns first, then extra columns carried by the records (custom tables, text twin);
+        # keys starting with "_" are fetch metadata (URL, validators), not columns
+        columns = list(TABLE_COLUMNS.get(table_type, []))
+        columns += [column for column in records[0]
+                    if column not in columns and column != 'createtime' and not column.startswith('_')]
+        existing = self.find_existing(table_type, list({(r['title'], r['time']) for r in records}))
+        
+        rows = []
+        inserted = []
+        createtime = int(datetime.now().timestamp())
+        for record in records:
+            key = (record['title'], record['time'])
+            if key in existing:
+                continue
+            existing.add(key)  # Also drop duplicates within the batch
+            rows.append([record.get(column, '') for column in columns] + [createtime])
+            inserted.append(record)
+        
+        if not rows:
+            return 0
+        
+        column_sql = ', '.join(f"`{column}`" for column in columns + ['createtime'])
+        placeholders = ', '.join(['%s'] * (len(columns) + 1))
+        sql = f"INSERT INTO `{self.get_table_name(table_type)}` ({column_sql}) VALUES ({placeholders})"
+        
+        cursor = self.connection.cursor()
+        try:
+            # The rows and their index entries are one transaction, also with DB_AUTOCOMMIT: if indexing
+            # fails nothing is stored and the spool retries the whole batch
+            self.connection.begin()
+            cursor.executemany(sql, rows)
+            new_rows = self.index_inserted(cursor, table_type, inserted)
+            self.connection.commit()
+        except Exception:
+            self.rollback()
+            raise
+        finally:
+            cursor.close()
+        touch_write_stamp(self.write_stamp)
+        self.publish(self.get_table_name(table_type), 'insert', new_rows)
+        
+        logging.info("Bulk inserted %d records to %s", len(rows), self.get_table_name(table_type))
+        return len(rows)
+    
+    def publish(self, table_name, op, rows):
+        """Publish committed rows to the change feed
+        
+        The rows are stored already, so a feed error is logged instead of raised: the spool
+        drainer would otherwise report the batch as failed and its retry would skip the rows
+        as duplicates.
+        """
+        try:
+            self.feed.publish(table_name, op, rows)
+        except Exception as e:
+            logging.error(f"Cannot publish {len(rows)} {op} events of {table_name} to the change feed: {e}")
+    
+    def rollback(self):
+        """Roll back the open transaction
+        
+        Company and project ids cached while it was open may belong to dictionary rows that are
+        now gone, so both caches are cleared; later links look the ids up again.
+        """
+        self.connection.rollback()
+        self.companies.clear_cache()
+        self.projects.clear_cache()
+    
+    def index_inserted(self, cursor, table_type, records):
+        """Link new rows to their projects, candidate rows to companies, and store the fingerprints
+        and near-duplicate signatures of new rows
+        
+        Returns the (id, record) pairs of the new rows for the change feed.
+        """
+        link_companies = table_type == 'candidate' and self.companies.enabled
+        link_projects = table_type in TABLE_COLUMNS and self.projects.enabled
+        fingerprints = self.revisions.enabled and any('_url' in record for record in records)
+        near_duplicates = table_type in TABLE_COLUMNS and self.near_duplicates.enabled
+        if not (link_companies or link_projects or fingerprints or near_duplicates or self.feed.enabled):
+            return []
+        
+        ids = self.find_ids(table_type, list({(record['title'], record['time']) for record in records}))
+        records = sorted(((ids[(record['title'], record['time'])], record)
+                          for record in records if (record['title'], record['time']) in ids), key=lambda row: row[0])
+        
+        if link_companies:
+            links = self.companies.link_candidates(cursor, [(record_id, record['candidate']) for record_id, record in records])
+            logging.info("Linked %d candidate names to companies", links)
+        if link_projects:
+            self.projects.link_records(cursor, self.get_table_name(table_type), [
+                (record_id,) + project_keys(record) for record_id, record in records
+            ])
+        if fingerprints:
+            self.revisions.save_fingerprints(cursor, self.get_table_name(table_type), [
+                (record_id, record['_url'], record_fingerprint(record), record.get('_etag'), record.get('_last_modified'))
+                for record_id, record in records if '_url' in record
+            ])
+        if near_duplicates:
+            duplicates = self.near_duplicates.index_records(cursor, self.get_table_name(table_type), records)
+            if duplicates:
+                logging.info("Flagged %d near-duplicate records in %s", duplicates, self.get_table_name(table_type))
+        return records
+    
+    def get_fingerprint(self, url):
+        """Fingerprint entry stored for a detail URL, see RevisionStore.lookup"""
+        cursor = self.connection.cursor()
+        try:
+            return self.revisions.lookup(cursor, url)
+        finally:
+            cursor.close()
+    
+    def mark_unchanged(self, url):
+        """Record that a detail URL was re-checked without changes"""
+        cursor = self.connection.cursor()
+        try:
+            self.revisions.touch(cursor, url)
+            self.connection.commit()
+        finally:
+            cursor.close()
+    
+    def refresh_record(self, table_type, record):
+        """Insert a record, or rewrite its stored row if the content fingerprint changed
+        
+        The row is found through the fingerprint of its detail URL (titles may be amended too),
+        falling back to (title, time) for rows stored before fingerprints existed.
+        Returns 'inserted', 'updated' or 'unchanged'.
+        """
+        table_name = self.get_table_name(table_type)
+        columns = [column for column in record if column != 'createtime' and not column.startswith('_')]
+        
+        cursor = self.connection.cursor()
+        try:
+            known = self.revisions.lookup(cursor, record['_url'])
+            if known and known[0] == table_name:
+                record_id, old_fingerprint = known[1], known[2]
+            else:
+                key = (record['title'], record['time'])
+                record_id, old_fingerprint = self.find_ids(table_type, [key]).get(key), None
+            
+            if record_id is not None:
+                column_sql = ', '.join(f"`{column}`" for column in columns)
+                cursor.execute(f"SELECT {column_sql} FROM `{table_name}` WHERE `id` = %s", (record_id,))
+                values = cursor.fetchone()
+                if values:
+                    return self.rewrite_record(cursor, table_type, record_id, record,
+                                               dict(zip(columns, values)), old_fingerprint)
+        finally:
+            cursor.close()
+        
+        self.insert_records(table_type, [record])
+        return 'inserted'
+    
+    def rewrite_record(self, cursor, table_type, record_id, record, old_row, old_fingerprint=None):
+        """Rewrite a stored row if its fingerprint changed, keeping the old version in the revision table"""
+        table_name = self.get_table_name(table_type)
+        fingerprint = record_fingerprint(record)
+        old_fingerprint = old_fingerprint or record_fingerprint(old_row)
+        validators = (record_id, record['_url'], fingerprint, record.get('_etag'), record.get('_last_modified'))
+        if old_fingerprint == fingerprint:
+            self.revisions.save_fingerprints(cursor, table_name, [validators])
+            self.connection.commit()
+            return 'unchanged'
+        
+        # The revision, the rewritten row and its index entries are stored together or not at all
+        self.connection.begin()
+        try:
+            self.revisions.add_revision(cursor, table_name, record_id, old_fingerprint, old_row)
+            set_sql = ', '.join(f"`{column}` = %s" for column in old_row)
+            cursor.execute(f"UPDATE `{table_name}` SET {set_sql} WHERE `id` = %s",
+                           [record[column] for column in old_row] + [record_id])
+            self.revisions.save_fingerprints(cursor, table_name, [validators])
+            if table_type == 'candidate' and self.companies.enabled:
+                self.companies.relink_candidate(cursor, record_id, record['candidate'])
+            if table_type in TABLE_COLUMNS and self.projects.enabled:
+                self.projects.relink_record(cursor, table_name, record_id, *project_keys(record))
+            if table_type in TABLE_COLUMNS and self.near_duplicates.enabled:
+                self.near_duplicates.reindex_record(cursor, table_name, record_id, record)
+            self.connection.commit()
+        except Exception:
+            self.rollback()
+            raise
+        touch_write_stamp(self.write_stamp)
+        self.publish(table_name, 'update', [(record_id, record)])
+        logging.info("Updated amended record in %s (id %s): %.50s...", table_name, record_id, record['title'])
+        return 'updated'
+    
     def check_duplicate(self, table_type, title, time_str):
         """Check if a record with the same title and time already exists"""
         try:
@@ -168,15 +561,46 @@ class DatabaseManager:
             if cursor:
                 cursor.close()
 
-class BidCandidateScraper:
-    def __init__(self, target_date=None):
-        self.base_url = "https://zb.shudaojt.com"
-        self.list_url = "https://zb.shudaojt.com/hxrgs/people.html"
+class ChannelScraper:
+    """Generic channel scraper - pagination, date filtering and storage shared by every channel
+    
+    Subclasses provide the detail extractor for one kind of page; which site section is crawled,
+    its URLs, selectors and target table come from the channel configuration.
+    """
+    
+    # Extractor name used by [Channel:*] EXTRACTOR and the default channel of the subclass
+    extractor = None
+    default_channel = None
+    
+    def __init__(self, target_date=None, base_url=None, start_date=None, end_date=None, resume=False,
+                 channel=None, rate_limiter=None, spool=None, checkpoint=None, config_file='config.ini'):
+        self.config = load_config(config_file)
+        
+        # Resolve the channel this scraper crawls
+        if channel is None or isinstance(channel, str):
+            channel = load_channels(self.config)[channel or self.default_channel]
+        self.channel = channel
+        
+        self.base_url = (base_url or channel.base_url).rstrip('/')
+        self.list_url = channel.get_list_url(self.base_url)
+        # requests is imported when the first scraper is built, not when this module is loaded
+        import requests
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
         
+        # Request settings from the [Scraping] section
+        self.request_delay = self.config.getfloat('Scraping', 'REQUEST_DELAY', fallback=1.0)
+        self.max_retries = self.config.getint('Scraping', 'MAX_RETRIES', fallback=3)
+        self.timeout = self.config.getfloat('Scraping', 'TIMEOUT', fallback=30)
+        self.max_pages = self.config.getint('Scraping', 'MAX_PAGES', fallback=50)
+        # Bodies are read up to this size, pages with embedded attachments are cut off
+        self.max_body_bytes = self.config.getint('Scraping', 'MAX_BODY_BYTES', fallback=5 * 1024 * 1024)
+        
+        # Shared across channels when crawled by CrawlEngine
+        self.rate_limiter = rate_limiter or RateLimiter(self.request_delay)
+        
         # Set target date, if not specified use yesterday
         if target_date:
             self.target_date = target_date
@@ -184,124 +608,532 @@ class BidCandidateScraper:
             yesterday = datetime.now() - timedelta(days=1)
             self.target_date = yesterday.strftime('%Y-%m-%d')
         
+        # Date range to scrape, defaults to the single target date
+        self.start_date = start_date or self.target_date
+        self.end_date = end_date or self.target_date
+        
+        # Checkpoint journal used to resume an interrupted run, shared across channels when crawled by CrawlEngine
+        self.resume = resume
+        self.checkpoint = checkpoint or CheckpointJournal(config_file)
+        
         # Initialize database manager
-        self.db = DatabaseManager()
+        self.db = DatabaseManager(config_file)
+        
+        # Local write-ahead spool, records are bulk-loaded into the database in the background
+        # The owner of a shared spool (CrawlEngine, distributed.Worker) runs one drainer for all channels
+        self.spool = spool or RecordSpool(config_file)
+        self.start_drainer = spool is None
         
-        logging.info(f"Target scraping date: {self.target_date}")
+        # Summary line interval for per-link progress at INFO level
+        self.progress_every = max(1, self.config.getint('Logging', 'PROGRESS_EVERY', fallback=50))
         
-    def get_page_content(self, url, max_retries=3):
+        # Only one crawl of a channel at a time, whether started by the scheduler, by hand or by a second scheduler
+        self.run_lock = None
+        if self.config.getboolean('Scraping', 'RUN_LOCK', fallback=True):
+            self.run_lock = RunLock(f"crawl-{channel.name}", self.config.get('Scraping', 'LOCK_DIR', fallback='locks'))
+        
+        # Time and request budget shared with the other channels of the run, the rest of the range is left for the next run
+        self.budget = None
+        self.budget_reached = False
+        
+        # Refresh mode re-checks already stored detail pages and rewrites amended rows
+        self.refresh = False
+        self.refresh_stats = {'not_modified': 0, 'unchanged': 0, 'updated': 0, 'inserted': 0}
+        
+        # Export sinks (JSONL, CSV, Parquet, SQLite) written alongside or instead of the database
+        self.use_database = True
+        self.sink = None
+        
+        # Sanitizes/compresses the HTML stored in the content column
+        self.content_pipeline = ContentPipeline(config_file)
+        
+        logging.info(f"[{self.channel.name}] Target scraping date range: {self.start_date} ~ {self.end_date}")
+    
+    def get_page_content(self, url, max_retries=None):
         """Get webpage content with retry mechanism"""
+        return self.fetch(url, max_retries=max_retries).text
+    
+    def fetch(self, url, headers=None, max_retries=None, stop_when=None):
+        """Get a webpage with retry mechanism, a 304 answer to conditional headers is returned as is
+        
+        The body is streamed and decoded chunk by chunk, and reading stops at MAX_BODY_BYTES or
+        as soon as stop_when(text so far, newly decoded text) returns True. Returns a Page.
+        """
+        import requests
+        
+        # At least one attempt, so the loop always returns a page or raises the last error
+        max_retries = max(1, self.max_retries if max_retries is None else max_retries)
         for attempt in range(max_retries):
             try:
-                response = self.session.get(url, timeout=30)
-                response.raise_for_status()
-                response.encoding = 'utf-8'
-                return response.text
+                self.rate_limiter.wait()
+                if self.budget:
+                    self.budget.consume()
+                with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+                    response.raise_for_status()
+                    return self.read_body(url, response, stop_when)
             except requests.RequestException as e:
-                logging.warning(f"Attempt {attempt + 1} to get {url} failed: {e}")
+                logging.warning("Attempt %d to get %s failed: %s", attempt + 1, url, e)
                 if attempt == max_retries - 1:
                     raise
                 time.sleep(2)
     
+    def read_body(self, url, response, stop_when=None):
+        """Read and decode a streamed response, see fetch"""
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        parts = []
+        size = 0
+        truncated = False
+        for chunk in response.iter_content(CHUNK_SIZE):
+            if size + len(chunk) > self.max_body_bytes:
+                parts.append(decoder.decode(chunk[:self.max_body_bytes - size]))
+                truncated = True
+                logging.warning("[%s] %s is larger than %d bytes, the rest is not read",
+                                self.channel.name, url, self.max_body_bytes)
+                break
+            size += len(chunk)
+            text = decoder.decode(chunk)
+            parts.append(text)
+            if stop_when and text and stop_when(parts, text):
+                truncated = True
+                break
+        if not truncated:
+            parts.append(decoder.decode(b'', final=True))
+        return Page(url, response.status_code, response.headers, ''.join(parts), truncated)
+    
+    def fetch_links(self, page_url):
+        """Extract the detail links of a list page, reading it only up to the first item older than the range
+        
+        Items are listed newest first. When a chunk contains a date before start_date, the part read
+        so far is parsed; if it already has an item older than the range, the rest of the page is
+        not downloaded. Otherwise (a date outside the list, e.g. in a sidebar) reading continues.
+        """
+        found = []
+        
+        def stop_when(parts, text):
+            # Dates cut in two by a chunk boundary are completed by the previous chunk's tail
+            tail = (parts[-2][-9:] if len(parts) > 1 else '') + text
+            if not any(date < self.start_date for date in ANY_DATE_PATTERN.findall(tail)):
+                return False
+            links, should_continue = self.extract_links(''.join(parts), partial=True)
+            if should_continue:
+                return False
+            found.append((links, should_continue))
+            return True
+        
+        page = self.fetch(page_url, stop_when=stop_when)
+        if found:
+            logging.debug("[%s] Stopped reading %s after %d characters", self.channel.name, page_url, len(page.text))
+            self.report_links(*found[0])
+            return found[0]
+        return self.extract_links(page.text)
+    
     def get_page_url(self, page_num):
-        """Generate URL based on page number"""
-        if page_num == 1:
-            return self.list_url
-        else:
-            return f"https://zb.shudaojt.com/hxrgs/{page_num}.html"
+        """Generate list page URL based on page number"""
+        return self.channel.get_page_url(page_num, self.base_url)
     
     def is_target_date(self, date_str):
-        """Check if date matches target date"""
+        """Check if date falls in the target date range"""
         if not date_str:
             return False
         try:
             # Standardize date format, handle possible format variations
-            if date_str.startswith('2025-') and len(date_str) >= 10:
+            if DATE_PATTERN.match(date_str):
                 # Only compare date part, ignore possible time part
                 date_part = date_str[:10]
-                return date_part == self.target_date
+                return self.start_date <= date_part <= self.end_date
             return False
         except Exception as e:
             logging.warning(f"Date format parsing error: {date_str}, error: {e}")
             return False
     
-    def extract_candidate_links(self, html_content):
-        """Extract candidate detail links from list page"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        links = []
-        
-        # Find main content area
-        main_section = soup.find('div', {'class': 'zhongbiaoPeople', 'id': 'main'})
-        if not main_section:
-            logging.error("Main content area not found")
-            return links, False
-        
-        # Extract all candidate links
-        candidate_items = main_section.find_all('div', class_='list-details-right-single')
+    def extract_links(self, html_content, partial=False):
+        """Extract detail links with target dates from a list page
         
-        target_date_found = False
+        partial marks the part of a page read so far (see fetch_links). It is cut off on purpose
+        and may not contain the list yet, so nothing is logged above DEBUG for it.
+        """
+        links = []
         should_stop = False  # Whether to stop pagination
         
-        for item in candidate_items:
-            link_element = item.find('a')
-            if link_element and link_element.get('href'):
-                href = link_element.get('href')
-                title = link_element.get('title', '').strip()
-                
-                # Extract time information
-                time_element = item.find('div', class_='single-time')
-                date_str = time_element.text.strip() if time_element else ''
-                
-                logging.debug(f"Checking project: {title[:50]}..., date: {date_str}")
-                
-                # Check date
-                if self.is_target_date(date_str):
-                    target_date_found = True
-                    links.append({
-                        'href': href,
-                        'title': title,
-                        'date': date_str
-                    })
-                    logging.debug(f"✓ Found target date data: {title[:50]}...")
-                elif date_str < self.target_date and date_str.startswith('2025-'):
-                    # If we encounter an earlier date, we should stop pagination
-                    should_stop = True
-                    logging.debug(f"Encountered earlier date: {date_str}, should stop pagination")
-                    break
+        with parsed_html(html_content) as soup:
+            # Find main content area
+            main_section = soup.select_one(self.channel.container)
+            if not main_section:
+                if not partial:
+                    logging.error(f"[{self.channel.name}] Main content area not found")
+                    return links, False
+                # Keep reading, the list starts further down the page
+                logging.debug("[%s] Main content area not read yet", self.channel.name)
+                return links, True
+            
+            for item in main_section.select(self.channel.item):
+                link_element = item.find('a')
+                if link_element and link_element.get('href'):
+                    href = link_element.get('href')
+                    title = link_element.get('title', '').strip()
+                    
+                    # Extract time information
+                    time_element = item.select_one(self.channel.date)
+                    date_str = time_element.text.strip() if time_element else ''
+                    
+                    logging.debug("Checking project: %.50s..., date: %s", title, date_str)
+                    
+                    # Check date
+                    if self.is_target_date(date_str):
+                        links.append(Link(href, title, date_str))
+                        logging.debug("✓ Found target date data: %.50s...", title)
+                    elif DATE_PATTERN.match(date_str) and date_str[:10] < self.start_date:
+                        # If we encounter an earlier date, we should stop pagination
+                        should_stop = True
+                        logging.debug("Encountered earlier date: %s, should stop pagination", date_str)
+                        break
         
         # Continue to next page condition: haven't encountered earlier dates
         should_continue = not should_stop
+        if not partial:
+            self.report_links(links, should_continue)
+        return links, should_continue
+    
+    def report_links(self, links, should_continue):
+        """Log what was extracted from a list page"""
+        logging.info("[%s] Extracted %d links with target date from current page", self.channel.name, len(links))
+        if not should_continue:
+            logging.info("[%s] Encountered data earlier than target date, will stop pagination", self.channel.name)
+    
+    def extract_publish_time(self, soup, original_date):
+        """Extract the publish date from a detail page, falling back to the list page date"""
+        for span in soup.find_all('span'):
+            span_text = span.get_text().strip()
+            if DATE_PATTERN.match(span_text):
+                return span_text[:10]  # Only take date part
+        return original_date[:10] if original_date else original_date
+    
+    def extract_content(self, html_content):
+        """Extract the HTML block stored in the content column using the channel's content selectors"""
+        try:
+            with parsed_html(html_content) as soup:
+                return self.select_content(soup)
+        except Exception as e:
+            logging.error(f"[{self.channel.name}] Error extracting content: {e}")
+            return ""
+    
+    def select_content(self, soup):
+        """HTML of the first element matching the channel's content selectors in a parsed page"""
+        try:
+            for i, selector in enumerate(self.channel.content):
+                element = soup.select_one(selector)
+                if element:
+                    if i > 0:
+                        logging.warning(f"[{self.channel.name}] {self.channel.content[0]} not found, using {selector} as fallback")
+                    # Return HTML content of the element, including the tag itself
+                    return str(element)
+            
+            logging.warning(f"[{self.channel.name}] No content container found, saving empty content")
+            return ""
+            
+        except Exception as e:
+            logging.error(f"[{self.channel.name}] Error extracting content: {e}")
+            return ""
+    
+    def build_record(self, detail_content, link):
+        """Build the table record for one detail page, implemented by each extractor"""
+        raise NotImplementedError
+    
+    def finish_run(self, summary):
+        """Add refresh and extractor statistics to the run summary"""
+        if self.refresh:
+            summary['refresh'] = dict(self.refresh_stats)
+            logging.info(f"[{self.channel.name}] Refresh: {self.refresh_stats['updated']} updated, "
+                         f"{self.refresh_stats['inserted']} new, {self.refresh_stats['unchanged']} unchanged, "
+                         f"{self.refresh_stats['not_modified']} not modified")
+    
+    def save_record(self, record):
+        """Write a record to the export sinks, and to the database through the spool or directly"""
+        if self.sink:
+            self.sink.write(self.channel.table, record)
+            logging.debug("[%s] Exported: %.50s...", self.channel.name, record['title'])
+            if not self.use_database:
+                return True
         
-        logging.info(f"Extracted {len(links)} candidate links with target date from current page")
-        if should_stop:
-            logging.info("Encountered data earlier than target date, will stop pagination")
+        if self.spool.enabled:
+            self.spool.append(self.channel.table, record)
+            logging.debug("[%s] Spooled for database: %.50s...", self.channel.name, record['title'])
+            return True
         
-        return links, should_continue
+        try:
+            if self.db.insert_records(self.channel.table, [record]):
+                logging.debug("[%s] Saved to database: %.50s...", self.channel.name, record['title'])
+                return True
+            return False
+        except Exception as e:
+            logging.error("[%s] Failed to insert data: %s", self.channel.name, e)
+            return False
+    
+    def process_link(self, link):
+        """Fetch one detail page and store its record, returns True when a new record was saved"""
+        if self.refresh:
+            return self.refresh_link(link)
+        
+        detail_url = self.base_url + link.href
+        
+        # Get detail page
+        response = self.fetch(detail_url)
+        
+        # Extract detail information
+        record = self.build_record(response.text, link)
+        self.content_pipeline.apply(record)
+        self.add_fetch_metadata(record, detail_url, response)
+        
+        # Check for duplicates (spooled records are deduplicated in bulk when loaded)
+        if self.use_database and not self.spool.enabled and self.db.check_duplicate(self.channel.table, record['title'], record['time']):
+            logging.debug("[%s] Record already exists, skipping: %.50s...", self.channel.name, record['title'])
+            return False
+        
+        return self.save_record(record)
+    
+    def budget_exhausted(self):
+        """Check whether the run has used up its time or request budget"""
+        reason = self.budget.exhausted() if self.budget else None
+        if not reason:
+            return False
+        if not self.budget_reached:
+            self.budget_reached = True
+            logging.warning(f"[{self.channel.name}] {reason.capitalize()} budget exhausted, "
+                            f"the rest of the range is left for the next run")
+        return True
+    
+    def record_leftover(self, run_key, summary, frontier):
+        """Record what is left of the date range when the budget ran out
+        
+        List pages are newest first, so every day after the frontier (the day being crawled when
+        the budget ran out) is complete and is recorded as covered; the next run only has to
+        crawl start_date ~ frontier. With failed links the whole range stays open, and like
+        finished runs, only crawls that wrote to the database are recorded.
+        """
+        leftover_end = self.end_date
+        if (frontier and self.start_date <= frontier < self.end_date and not summary['failed']
+                and self.use_database and not self.refresh):
+            covered_start = (datetime.strptime(frontier, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+            self.checkpoint.record_covered(run_key, covered_start, self.end_date)
+            leftover_end = frontier
+        summary['leftover'] = {'start_date': self.start_date, 'end_date': leftover_end}
+        logging.warning(f"[{self.channel.name}] Left for the next run: {self.start_date} ~ {leftover_end}")
+    
+    def add_fetch_metadata(self, record, url, response):
+        """Attach the detail URL and HTTP validators used for fingerprints and conditional refreshes"""
+        record['_url'] = url
+        if response.headers.get('ETag'):
+            record['_etag'] = response.headers['ETag']
+        if response.headers.get('Last-Modified'):
+            record['_last_modified'] = response.headers['Last-Modified']
+    
+    def refresh_link(self, link):
+        """Re-check a detail page and rewrite its row if the content changed, returns True when a row was written"""
+        detail_url = self.base_url + link.href
+        
+        # Conditional request with the validators of the last fetch, unchanged pages answer 304
+        headers = {}
+        known = self.db.get_fingerprint(detail_url)
+        if known:
+            if known[3]:
+                headers['If-None-Match'] = known[3]
+            if known[4]:
+                headers['If-Modified-Since'] = known[4]
+        response = self.fetch(detail_url, headers=headers)
+        if response.status_code == 304:
+            self.db.mark_unchanged(detail_url)
+            self.refresh_stats['not_modified'] += 1
+            return False
+        
+        record = self.build_record(response.text, link)
+        self.content_pipeline.apply(record)
+        self.add_fetch_metadata(record, detail_url, response)
+        result = self.db.refresh_record(self.channel.table, record)
+        self.refresh_stats[result] += 1
+        if result != 'unchanged' and self.sink:
+            self.sink.write(self.channel.table, record)
+        return result != 'unchanged'
+    
+    def scrape(self):
+        """Execute complete scraping process, returns a summary of the run"""
+        name = self.channel.name
+        summary = {'channel': name, 'pages': 0, 'links': 0, 'saved': 0, 'failed': 0, 'finished': False}
+        drainer = None
+        locked = False
+        try:
+            if self.run_lock:
+                locked = self.run_lock.acquire()
+                if not locked:
+                    holder = self.run_lock.holder()
+                    logging.warning(f"[{name}] Another crawl of this channel is running"
+                                    + (f" (pid {holder['pid']} since {holder['started_at']})" if holder else "")
+                                    + ", skipping")
+                    summary['skipped'] = True
+                    return summary
+            
+            logging.info(f"[{name}] Starting to scrape {self.channel.title} data for {self.start_date} ~ {self.end_date}...")
+            
+            # With the spool enabled (or export sinks only) the crawl does not depend on the database
+            # Refreshing compares against the stored rows, so it always writes to the database directly
+            if self.refresh and not self.use_database:
+                logging.error(f"[{name}] Refresh needs the mysql sink, aborting scraping")
+                return summary
+            if self.use_database and self.spool.enabled and not self.refresh:
+                if self.start_drainer:
+                    drainer = SpoolDrainer(self.spool, self.db)
+                    drainer.start()
+            elif self.use_database and not self.db.connect():
+                logging.error(f"[{name}] Cannot connect to database, aborting scraping")
+                return summary
+            
+            # Start from the first unfinished list page when resuming
+            run_key = self.checkpoint.begin(name, self.start_date, self.end_date, self.resume)
+            page_num = self.checkpoint.resume_page(run_key)
+            
+            # Traverse all pages until no more data for target date is found
+            processed = 0
+            frontier = None  # Day of the newest link not completed when the budget ran out
+            while not self.budget_exhausted():
+                page_url = self.get_page_url(page_num)
+                logging.info("[%s] Scraping page %d: %s", name, page_num, page_url)
+                
+                try:
+                    # Get list page, its HTML is not kept while the detail pages are processed
+                    links, should_continue = self.fetch_links(page_url)
+                    
+                    page_failed = False
+                    if links:
+                        summary['links'] += len(links)
+                        logging.info("[%s] Found %d records with target date on page %d", name, len(links), page_num)
+                        
+                        # Process each detail link
+                        for i, link in enumerate(links):
+                            if self.budget_exhausted():
+                                frontier = link.date[:10]
+                                break
+                            if self.checkpoint.is_processed(run_key, link.href):
+                                logging.debug("[%s] Already processed before interruption, skipping: %.50s...", name, link.title)
+                                continue
+                            
+                            try:
+                                logging.debug("[%s] Processing link %d/%d on page %d", name, i + 1, len(links), page_num)
+                                if self.process_link(link):
+                                    summary['saved'] += 1
+                                self.checkpoint.mark_processed(run_key, link.href)
+                                # The day of the last completed link may continue on the next page
+                                frontier = link.date[:10]
+                                
+                                # Per-link lines are DEBUG, INFO gets a progress line every PROGRESS_EVERY links
+                                processed += 1
+                                if processed % self.progress_every == 0:
+                                    logging.info("[%s] Progress: %d links processed, %d saved, %d failed",
+                                                 name, processed, summary['saved'], summary['failed'])
+                                
+                            except Exception as e:
+                                page_failed = True
+                                summary['failed'] += 1
+                                logging.error("[%s] Error processing link %s: %s", name, link.href, e)
+                                continue
+                    else:
+                        logging.info("[%s] No data found with target date on page %d", name, page_num)
+                    
+                    # A page cut short by the budget stays open for the next run
+                    if self.budget_exhausted():
+                        break
+                    
+                    # Pages with failed links stay open so a resumed run retries them
+                    if not page_failed:
+                        self.checkpoint.mark_page_completed(run_key, page_num)
+                    summary['pages'] += 1
+                    
+                    # Check if we should continue to next page
+                    if not should_continue:
+                        summary['finished'] = True
+                        logging.info(f"[{name}] Reached data beyond target date range or no more data, stopping pagination")
+                        break
+                    
+                    page_num += 1
+                    
+                    # Safety check: avoid infinite loop
+                    if summary['pages'] >= self.max_pages:
+                        logging.warning(f"[{name}] Checked {self.max_pages} pages, stopping to avoid infinite loop")
+                        break
+                        
+                except Exception as e:
+                    logging.error(f"[{name}] Error processing page {page_num}: {e}")
+                    break
+            
+            # Keep the journal of incomplete runs so --resume can pick them up
+            if summary['finished'] and not summary['failed']:
+                # Only crawls that wrote to the database (directly or through the spool) cover their days;
+                # export-only runs and refreshes leave the run ledger alone
+                self.checkpoint.finish(run_key, record=self.use_database and not self.refresh)
+            elif self.budget_reached:
+                self.record_leftover(run_key, summary, frontier)
+            
+            logging.info(f"[{name}] Scraping completed! Processed {summary['pages']} pages, found {summary['links']} links, "
+                         f"successfully saved {summary['saved']} records")
+            
+            summary['content'] = self.content_pipeline.summary()
+            content = summary['content']
+            if content['rows']:
+                logging.info(f"[{name}] Content ({content['mode']}): {content['raw_bytes']} -> {content['stored_bytes']} bytes, "
+                             f"saved {content['saved_per_row']:.0f} bytes per row")
+            self.finish_run(summary)
+                
+        except Exception as e:
+            logging.error(f"[{name}] Error during scraping process: {e}")
+        finally:
+            # Flush the spool before closing the database connection
+            if drainer:
+                drainer.stop()
+            self.db.close()
+            if self.sink:
+                self.sink.flush()
+            if locked:
+                self.run_lock.release()
+        
+        return summary
+
+class BidCandidateScraper(ChannelScraper):
+    """Bid Candidate Scraper - extractor for candidate notices"""
+    
+    extractor = 'candidate'
+    default_channel = 'hxrgs'
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Optionally persisted between runs so recurring names cost a dictionary lookup
+        CANDIDATE_CACHE.configure(self.config.getint('Cache', 'NAME_CACHE_SIZE', fallback=20000),
+                                  self.config.get('Cache', 'NAME_CACHE_FILE', fallback='').strip() or None)
+    
+    def extract_candidate_links(self, html_content):
+        """Extract candidate detail links from list page"""
+        return self.extract_links(html_content)
     
     def extract_candidate_details(self, html_content, original_title, original_date):
         """Extract candidate information from detail page"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
+        with parsed_html(html_content) as soup:
+            return self.parse_candidate_details(soup, original_title, original_date)
+    
+    def parse_candidate_details(self, soup, original_title, original_date):
+        """Extract candidate information from a parsed detail page"""
         # Extract title
         title_element = soup.find('h3', class_='detail-tt')
         title = title_element.text.strip() if title_element else original_title
         
         # Extract publish time
-        info_time = original_date
-        time_elements = soup.find_all('span')
-        for span in time_elements:
-            span_text = span.get_text().strip()
-            if span_text.startswith('2025-') and len(span_text) >= 10:
-                info_time = span_text[:10]  # Only take date part
-                break
+        info_time = self.extract_publish_time(soup, original_date)
         
         # Extract candidate information
         candidates = []
+        project_code = None
         content_div = soup.find('div', class_='detail-content')
         
         if content_div:
             # Get all text content, including table content
             all_text = content_div.get_text()
+            project_code = extract_project_code(all_text)
             
             # Also parse tables in HTML structure
             tables = content_div.find_all('table')
@@ -318,61 +1150,37 @@ class BidCandidateScraper:
                 # Skip empty lines and too short lines
                 if not line or len(line) < 4:
                     continue
-                    
-                # Extended candidate format matching
-                candidate_patterns = [
-                    # Standard formats
-                    r'第[一二三四五六七八九十\d]+入围单位\s*[:：]\s*(.+)',
-                    r'第[一二三四五六七八九十\d]+中标候选人\s*[:：]\s*(.+)',
-                    r'第[一二三四五六七八九十\d]+名\s*[:：]\s*(.+)',
-                    r'入围单位\s*[:：]\s*(.+)',
-                    r'中标候选人\s*[:：]\s*(.+)',
-                    r'成交候选人\s*[:：]\s*(.+)',
-                    r'供应商\s*[:：]\s*(.+)',
-                    
-                    # Extended formats - handle more complex expressions
-                    r'第[一二三四五六七八九十\d]+\s*[:：]\s*(.+)',  # Simplified: No.[X]: Company name
-                    r'[一二三四五六七八九十\d]+\s*[:：]\s*(.+)',    # More simplified: Number: Company name
-                    r'入围.*?[:：]\s*(.+)',                        # Line containing "shortlisted"
-                    r'中标.*?[:：]\s*(.+)',                        # Line containing "winning bid"
-                    r'成交.*?[:：]\s*(.+)',                        # Line containing "transaction"
-                    r'候选人.*?[:：]\s*(.+)',                      # Line containing "candidate"
-                    
-                    # Common formats in tables
-                    r'^\s*([^：:]*有限公司)\s*$',                  # Company name on its own line
-                    r'^\s*([^：:]*集团[^：:]*)\s*$',               # Group name on its own line
-                    r'^\s*([^：:]*企业[^：:]*)\s*$',               # Enterprise name on its own line
-                    r'^\s*([^：:]*股份[^：:]*)\s*$',               # Corporation name on its own line
-                ]
-                
-                matched = False
-                for pattern in candidate_patterns:
-                    match = re.search(pattern, line, re.IGNORECASE)
-                    if match:
-                        candidate_name = match.group(1).strip()
-                        # Clean candidate name
-                        cleaned_name = self.clean_candidate_name(candidate_name)
-                        if cleaned_name and cleaned_name not in candidates:
-                            candidates.append(cleaned_name)
-                            logging.debug(f"Extracted candidate: {cleaned_name} (source: {line[:50]}...)")
-                        matched = True
-                        break
                 
-                # If no pattern matched but the line contains company keywords, also try to extract
-                if not matched and self.contains_company_keywords(line):
-                    cleaned_name = self.clean_candidate_name(line)
-                    if cleaned_name and cleaned_name not in candidates:
-                        candidates.append(cleaned_name)
-                        logging.debug(f"Keyword matched candidate: {cleaned_name}")
+                cleaned_name = self.classify_candidate_line(line)
+                if cleaned_name and cleaned_name not in candidates:
+                    candidates.append(cleaned_name)
+                    logging.debug("Extracted candidate: %s (source: %.50s...)", cleaned_name, line)
         
-        return {
-            'title': title,
-            'candidates': candidates,
-            'date': info_time
-        }
+        return CandidateDetails(title, info_time, candidates, project_code or extract_project_code(title))
+    
+    def classify_candidate_line(self, line):
+        """Cleaned candidate name found in a line, or None"""
+        return CANDIDATE_CACHE.get('line', line, self._classify_candidate_line)
+    
+    def _classify_candidate_line(self, line):
+        """Uncached classify_candidate_line"""
+        # Extended candidate format matching
+        for pattern in CANDIDATE_PATTERNS:
+            match = pattern.search(line)
+            if match:
+                return self.clean_candidate_name(match.group(1).strip())
+        
+        # If no pattern matched but the line contains company keywords, also try to extract
+        if self.contains_company_keywords(line):
+            return self.clean_candidate_name(line)
+        return None
     
     def contains_company_keywords(self, text):
         """Check if text contains company keywords"""
+        return CANDIDATE_CACHE.get('keywords', text, self._contains_company_keywords)
+    
+    def _contains_company_keywords(self, text):
+        """Uncached contains_company_keywords"""
         company_keywords = ['有限公司', '股份有限公司', '集团有限公司', '建设集团', '投资集团', 
                            '科技有限公司', '工程有限公司', '建筑有限公司', '商贸有限公司',
                            '实业有限公司', '发展有限公司', '贸易有限公司']
@@ -382,6 +1190,10 @@ class BidCandidateScraper:
         """Clean candidate name, keep only company name"""
         if not name:
             return None
+        return CANDIDATE_CACHE.get('clean', name, self._clean_candidate_name)
+    
+    def _clean_candidate_name(self, name):
+        """Uncached clean_candidate_name"""
             
         # Remove leading numbers and spaces
         name = re.sub(r'^[\d一二三四五六七八九十\s\.、\-\(\)（）]+', '', name)
@@ -452,271 +1264,72 @@ class BidCandidateScraper:
             
         return None
     
+    def build_record(self, detail_content, link):
+        """Build a candidate table record from a detail page"""
+        # One parse tree serves the extracted fields and the stored content block
+        with parsed_html(detail_content) as soup:
+            details = self.parse_candidate_details(soup, link.title, link.date)
+            # Only save zhongbiaoPeople div content
+            content = self.select_content(soup)
+        return {
+            'title': details.title,
+            'time': details.date,
+            'content': content,
+            'candidate': '; '.join(details.candidates) if details.candidates else 'No candidate information extracted',
+            # Links the notice to its tender announcement, not stored in the table
+            '_project_code': details.project_code,
+            '_project_name': normalize_project_name(details.title),
+        }
+    
+    def finish_run(self, summary):
+        """Report the name cache and persist it if configured"""
+        super().finish_run(summary)
+        summary['name_cache'] = CANDIDATE_CACHE.stats()
+        cache = summary['name_cache']
+        logging.info(f"[{self.channel.name}] Name cache: {cache['hits']} hits, {cache['misses']} misses "
+                     f"({cache['hit_rate']:.0%}), {cache['size']} entries")
+        CANDIDATE_CACHE.save()
+    
     def scrape_candidates(self):
-        """Execute complete scraping process"""
-        try:
-            logging.info(f"Starting to scrape candidate data for {self.target_date}...")
-            
-            # Connect to database
-            if not self.db.connect():
-                logging.error("Cannot connect to database, aborting scraping")
-                return
-            
-            page_num = 1
-            total_links_found = 0
-            saved_count = 0
-            
-            # Traverse all pages until no more data for target date is found
-            while True:
-                page_url = self.get_page_url(page_num)
-                logging.info(f"Scraping page {page_num}: {page_url}")
-                
-                try:
-                    # Get list page
-                    list_content = self.get_page_content(page_url)
-                    candidate_links, should_continue = self.extract_candidate_links(list_content)
-                    
-                    if candidate_links:
-                        total_links_found += len(candidate_links)
-                        logging.info(f"Found {len(candidate_links)} records with target date on page {page_num}")
-                        
-                        # Process each detail link
-                        for i, link_info in enumerate(candidate_links):
-                            try:
-                                detail_url = self.base_url + link_info['href']
-                                logging.info(f"Processing link {i+1}/{len(candidate_links)} on page {page_num}")
-                                
-                                # Get detail page
-                                detail_content = self.get_page_content(detail_url)
-                                
-                                # Extract detail information
-                                details = self.extract_candidate_details(
-                                    detail_content, 
-                                    link_info['title'], 
-                                    link_info['date']
-                                )
-                                
-                                # Check for duplicates
-                                if not self.db.check_duplicate('candidate', details['title'], details['date']):
-                                    # Extract zhongbiaoPeople div content for storage
-                                    content_to_save = self.extract_zhongbiao_content(detail_content)
-                                    
-                                    # Save to database
-                                    candidate_str = '; '.join(details['candidates']) if details['candidates'] else 'No candidate information extracted'
-                                    
-                                    if self.db.insert_candidate(
-                                        title=details['title'],
-                                        time_str=details['date'],
-                                        content=content_to_save,  # Only save zhongbiaoPeople div content
-                                        candidate=candidate_str
-                                    ):
-                                        saved_count += 1
-                                        logging.info(f"Saved to database: {details['title'][:50]}...")
-                                else:
-                                    logging.info(f"Record already exists, skipping: {details['title'][:50]}...")
-                                
-                                # Avoid requesting too frequently
-                                time.sleep(1)
-                                
-                            except Exception as e:
-                                logging.error(f"Error processing link {link_info['href']}: {e}")
-                                continue
-                    else:
-                        logging.info(f"No data found with target date on page {page_num}")
-                    
-                    # Check if we should continue to next page
-                    if not should_continue:
-                        logging.info(f"Reached data beyond target date range or no more data, stopping pagination")
-                        break
-                    
-                    page_num += 1
-                    
-                    # Safety check: avoid infinite loop
-                    if page_num > 50:
-                        logging.warning("Checked 50 pages, stopping to avoid infinite loop")
-                        break
-                        
-                except Exception as e:
-                    logging.error(f"Error processing page {page_num}: {e}")
-                    break
-            
-            # Close database connection
-            self.db.close()
-            
-            logging.info(f"Candidate scraping completed! Processed {page_num} pages, found {total_links_found} links, successfully saved {saved_count} records to database")
-                
-        except Exception as e:
-            logging.error(f"Error during scraping process: {e}")
-            if hasattr(self, 'db'):
-                self.db.close()
+        """Execute complete candidate scraping process"""
+        return self.scrape()
     
     def extract_zhongbiao_content(self, html_content):
         """Extract content from zhongbiaoPeople div tag"""
-        try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Find zhongbiaoPeople div
-            zhongbiao_div = soup.find('div', class_='zhongbiaoPeople')
-            
-            if zhongbiao_div:
-                # Return HTML content of the div, including the tag itself
-                return str(zhongbiao_div)
-            else:
-                # If zhongbiaoPeople div is not found, try to find other possible containers
-                detail_content = soup.find('div', class_='detail-content')
-                if detail_content:
-                    logging.warning("zhongbiaoPeople div not found, using detail-content as fallback")
-                    return str(detail_content)
-                else:
-                    logging.warning("Neither zhongbiaoPeople nor detail-content div found, saving empty content")
-                    return ""
-                    
-        except Exception as e:
-            logging.error(f"Error extracting zhongbiaoPeople content: {e}")
-            return ""
+        return self.extract_content(html_content)
 
-class BidAnnouncementScraper:
-    """Bid Announcement Scraper"""
+class BidAnnouncementScraper(ChannelScraper):
+    """Bid Announcement Scraper - extractor for tender announcements"""
     
-    def __init__(self, target_date=None):
-        self.base_url = "https://zb.shudaojt.com"
-        self.list_url = "https://zb.shudaojt.com/zbgg/zhaobiao.html"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-        
-        # Set target date, if not specified use yesterday
-        if target_date:
-            self.target_date = target_date
-        else:
-            yesterday = datetime.now() - timedelta(days=1)
-            self.target_date = yesterday.strftime('%Y-%m-%d')
-        
-        # Initialize database manager
-        self.db = DatabaseManager()
-        
-        logging.info(f"Bid announcement target scraping date: {self.target_date}")
-    
-    def get_page_content(self, url, max_retries=3):
-        """Get webpage content with retry mechanism"""
-        for attempt in range(max_retries):
-            try:
-                response = self.session.get(url, timeout=30)
-                response.raise_for_status()
-                response.encoding = 'utf-8'
-                return response.text
-            except requests.RequestException as e:
-                logging.warning(f"Attempt {attempt + 1} to get {url} failed: {e}")
-                if attempt == max_retries - 1:
-                    raise
-                time.sleep(2)
-    
-    def get_page_url(self, page_num):
-        """Generate bid announcement URL based on page number"""
-        if page_num == 1:
-            return self.list_url
-        else:
-            return f"https://zb.shudaojt.com/zbgg/{page_num}.html"
-    
-    def is_target_date(self, date_str):
-        """Check if date matches target date"""
-        if not date_str:
-            return False
-        try:
-            if date_str.startswith('2025-') and len(date_str) >= 10:
-                date_part = date_str[:10]
-                return date_part == self.target_date
-            return False
-        except Exception as e:
-            logging.warning(f"Date format parsing error: {date_str}, error: {e}")
-            return False
+    extractor = 'announcement'
+    default_channel = 'zbgg'
     
     def extract_announcement_links(self, html_content):
         """Extract bid announcement detail links from list page"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        links = []
-        
-        # Find main content area - bid announcements use different class
-        main_section = soup.find('div', {'class': 'zhaobiao-content', 'id': 'main'})
-        if not main_section:
-            logging.error("Bid announcement main content area not found")
-            return links, False
-        
-        # Extract all bid announcement links
-        announcement_items = main_section.find_all('div', class_='list-details-right-single')
-        
-        target_date_found = False
-        should_stop = False
-        
-        for item in announcement_items:
-            link_element = item.find('a')
-            if link_element and link_element.get('href'):
-                href = link_element.get('href')
-                title = link_element.get('title', '').strip()
-                
-                # Extract time information
-                time_element = item.find('div', class_='single-time')
-                date_str = time_element.text.strip() if time_element else ''
-                
-                logging.debug(f"Checking bid announcement: {title[:50]}..., date: {date_str}")
-                
-                # Check date
-                if self.is_target_date(date_str):
-                    target_date_found = True
-                    links.append({
-                        'href': href,
-                        'title': title,
-                        'date': date_str
-                    })
-                    logging.debug(f"✓ Found target date bid announcement: {title[:50]}...")
-                elif date_str < self.target_date and date_str.startswith('2025-'):
-                    should_stop = True
-                    logging.debug(f"Encountered earlier date: {date_str}, stopping pagination")
-                    break
-        
-        should_continue = not should_stop
-        
-        logging.info(f"Extracted {len(links)} bid announcement links with target date from current page")
-        if should_stop:
-            logging.info("Encountered data earlier than target date, will stop pagination")
-        
-        return links, should_continue
+        return self.extract_links(html_content)
     
     def extract_announcement_details(self, html_content, original_title, original_date):
         """Extract bid announcement information from detail page"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
+        with parsed_html(html_content) as soup:
+            return self.parse_announcement_details(soup, original_title, original_date)
+    
+    def parse_announcement_details(self, soup, original_title, original_date):
+        """Extract bid announcement information from a parsed detail page"""
         # Extract title
         title_element = soup.find('h3', class_='detail-tt')
         title = title_element.text.strip() if title_element else original_title
         
         # Extract publish time
-        info_time = original_date
-        time_elements = soup.find_all('span')
-        for span in time_elements:
-            span_text = span.get_text().strip()
-            if span_text.startswith('2025-') and len(span_text) >= 10:
-                info_time = span_text[:10]
-                break
+        info_time = self.extract_publish_time(soup, original_date)
         
         # Initialize extraction results
-        result = {
-            'title': title,
-            'time': info_time,
-            'bid_conditions': '',
-            'tenderer': '',
-            'address': '',
-            'contact_person': '',
-            'contact_phone': '',
-            'email': '',
-            'packages': ''
-        }
+        result = AnnouncementDetails(title, info_time)
         
         # Get detail content
         content_div = soup.find('div', class_='detail-content')
         if content_div:
             full_text = content_div.get_text()
+            result.project_code = extract_project_code(full_text)
             lines = full_text.split('\n')
             
             # Use regex to extract various fields
@@ -726,7 +1339,7 @@ class BidAnnouncementScraper:
                     continue
                 
                 # Tenderer (bidding party)
-                if not result['tenderer']:
+                if not result.tenderer:
                     patterns = [
                         r'招标人[：:\s]*([^：:\n\r]+?)(?=\n|地址|联系|电话|邮编|$)',
                         r'采购人[：:\s]*([^：:\n\r]+?)(?=\n|地址|联系|电话|邮编|$)',
@@ -735,11 +1348,11 @@ class BidAnnouncementScraper:
                     for pattern in patterns:
                         match = re.search(pattern, line, re.IGNORECASE)
                         if match:
-                            result['tenderer'] = match.group(1).strip()
+                            result.tenderer = match.group(1).strip()
                             break
                 
                 # Contact person
-                if not result['contact_person']:
+                if not result.contact_person:
                     patterns = [
                         r'联系人[：:\s]*([^：:\n\r电话邮箱地址]+?)(?=\n|电话|邮箱|地址|$)',
                         r'项目联系人[：:\s]*([^：:\n\r电话邮箱地址]+?)(?=\n|电话|邮箱|地址|$)',
@@ -747,11 +1360,11 @@ class BidAnnouncementScraper:
                     for pattern in patterns:
                         match = re.search(pattern, line, re.IGNORECASE)
                         if match:
-                            result['contact_person'] = match.group(1).strip()
+                            result.contact_person = match.group(1).strip()
                             break
                 
                 # Contact phone
-                if not result['contact_phone']:
+                if not result.contact_phone:
                     patterns = [
                         r'联系电话[：:\s]*([^：:\n\r邮箱地址传真]+?)(?=\n|邮箱|地址|$)',
                         r'电话[：:\s]*([^：:\n\r邮箱地址传真]+?)(?=\n|邮箱|地址|$)',
@@ -761,18 +1374,18 @@ class BidAnnouncementScraper:
                     for pattern in patterns:
                         match = re.search(pattern, line)
                         if match:
-                            result['contact_phone'] = match.group(1).strip()
+                            result.contact_phone = match.group(1).strip()
                             break
                 
                 # Email
-                if not result['email']:
+                if not result.email:
                     pattern = r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})'
                     match = re.search(pattern, line)
                     if match:
-                        result['email'] = match.group(1)
+                        result.email = match.group(1)
                 
                 # Address
-                if not result['address']:
+                if not result.address:
                     patterns = [
                         r'地址[：:\s]*([^：:\n\r]+?)(?=\n|邮编|电话|联系|$)',
                         r'联系地址[：:\s]*([^：:\n\r]+?)(?=\n|邮编|电话|联系|$)',
@@ -780,11 +1393,11 @@ class BidAnnouncementScraper:
                     for pattern in patterns:
                         match = re.search(pattern, line, re.IGNORECASE)
                         if match:
-                            result['address'] = match.group(1).strip()
+                            result.address = match.group(1).strip()
                             break
                 
                 # Bid conditions
-                if not result['bid_conditions']:
+                if not result.bid_conditions:
                     patterns = [
                         r'招标条件[：:\s]*(.+?)(?=\n|$)',
                         r'(.+?已具备招标条件[^。]*?)(?=现|，|。)',
@@ -792,159 +1405,189 @@ class BidAnnouncementScraper:
                     for pattern in patterns:
                         match = re.search(pattern, line, re.IGNORECASE)
                         if match:
-                            result['bid_conditions'] = match.group(1).strip()
+                            result.bid_conditions = match.group(1).strip()
                             break
         
         # If bid conditions is empty, use default value
-        if not result['bid_conditions']:
-            result['bid_conditions'] = 'See bidding document for details'
+        if not result.bid_conditions:
+            result.bid_conditions = 'See bidding document for details'
+        if not result.project_code:
+            result.project_code = extract_project_code(title)
             
         return result
     
+    def build_record(self, detail_content, link):
+        """Build an announcement table record from a detail page"""
+        # One parse tree serves the extracted fields and the stored content block
+        with parsed_html(detail_content) as soup:
+            details = self.parse_announcement_details(soup, link.title, link.date)
+            # Only save specific div content
+            content = self.select_content(soup)
+        return {
+            'title': details.title,
+            'time': details.time,
+            'condition': details.bid_conditions,
+            'content': content,
+            'tenderer': details.tenderer,
+            'address': details.address,
+            'contacts': details.contact_person,
+            'mobile': details.contact_phone,
+            'email': details.email,
+            # Links the announcement to its candidate notices, not stored in the table
+            '_project_code': details.project_code,
+            '_project_name': normalize_project_name(details.title),
+        }
+    
     def scrape_announcements(self):
         """Execute complete bid announcement scraping process"""
-        try:
-            logging.info(f"Starting to scrape bid announcement data for {self.target_date}...")
-            
-            # Connect to database
-            if not self.db.connect():
-                logging.error("Cannot connect to database, aborting bid announcement scraping")
-                return
-            
-            page_num = 1
-            total_links_found = 0
-            saved_count = 0
-            
-            # Traverse all pages until no more data for target date is found
-            while True:
-                page_url = self.get_page_url(page_num)
-                logging.info(f"Scraping bid announcement page {page_num}: {page_url}")
-                
-                try:
-                    # Get list page
-                    list_content = self.get_page_content(page_url)
-                    announcement_links, should_continue = self.extract_announcement_links(list_content)
-                    
-                    if announcement_links:
-                        total_links_found += len(announcement_links)
-                        logging.info(f"Found {len(announcement_links)} records with target date on bid announcement page {page_num}")
-                        
-                        # Process each detail link
-                        for i, link_info in enumerate(announcement_links):
-                            try:
-                                detail_url = self.base_url + link_info['href']
-                                logging.info(f"Processing bid announcement link {i+1}/{len(announcement_links)} on page {page_num}")
-                                
-                                # Get detail page
-                                detail_content = self.get_page_content(detail_url)
-                                
-                                # Extract detail information
-                                details = self.extract_announcement_details(
-                                    detail_content, 
-                                    link_info['title'], 
-                                    link_info['date']
-                                )
-                                
-                                # Check for duplicates
-                                if not self.db.check_duplicate('crawler', details['title'], details['time']):
-                                    # Extract specific div content for storage
-                                    content_to_save = self.extract_announcement_content(detail_content)
-                                    
-                                    # Save to database
-                                    if self.db.insert_announcement(
-                                        title=details['title'],
-                                        time_str=details['time'],
-                                        condition=details['bid_conditions'],
-                                        content=content_to_save,  # Only save specific div content
-                                        tenderer=details['tenderer'],
-                                        address=details['address'],
-                                        contacts=details['contact_person'],
-                                        mobile=details['contact_phone'],
-                                        email=details['email']
-                                    ):
-                                        saved_count += 1
-                                        logging.info(f"Saved bid announcement to database: {details['title'][:50]}...")
-                                else:
-                                    logging.info(f"Bid announcement record already exists, skipping: {details['title'][:50]}...")
-                                
-                                # Avoid requesting too frequently
-                                time.sleep(1)
-                                
-                            except Exception as e:
-                                logging.error(f"Error processing bid announcement link {link_info['href']}: {e}")
-                                continue
-                    else:
-                        logging.info(f"No data found with target date on bid announcement page {page_num}")
-                    
-                    # Check if we should continue to next page
-                    if not should_continue:
-                        logging.info(f"Reached data beyond target date range or no more data, stopping bid announcement pagination")
-                        break
-                    
-                    page_num += 1
-                    
-                    # Safety check: avoid infinite loop
-                    if page_num > 50:
-                        logging.warning("Checked 50 pages of bid announcements, stopping to avoid infinite loop")
-                        break
-                        
-                except Exception as e:
-                    logging.error(f"Error processing bid announcement page {page_num}: {e}")
-                    break
-            
-            # Close database connection
-            self.db.close()
-            
-            logging.info(f"Bid announcement scraping completed! Processed {page_num} pages, found {total_links_found} links, successfully saved {saved_count} records to database")
-                
-        except Exception as e:
-            logging.error(f"Error during bid announcement scraping process: {e}")
-            if hasattr(self, 'db'):
-                self.db.close()
+        return self.scrape()
     
     def extract_announcement_content(self, html_content):
         """Extract content from specific div tag for bid announcements"""
+        return self.extract_content(html_content)
+
+# Detail extractors available to [Channel:*] EXTRACTOR
+EXTRACTORS = {
+    BidCandidateScraper.extractor: BidCandidateScraper,
+    BidAnnouncementScraper.extractor: BidAnnouncementScraper,
+}
+
+def create_scraper(channel, **kwargs):
+    """Create the scraper for a configured channel"""
+    return EXTRACTORS[channel.extractor](channel=channel, **kwargs)
+
+class CrawlEngine:
+    """Crawl Engine Class - crawls several channels concurrently under one rate limiter, spool drainer and set of sinks"""
+    
+    def __init__(self, channels=None, target_date=None, start_date=None, end_date=None, resume=False,
+                 base_url=None, sinks=None, refresh=False, time_budget=None, request_budget=None, budget=None,
+                 rate_limiter=None, config_file='config.ini'):
+        self.config_file = config_file
+        self.config = load_config(config_file)
+        
+        available = load_channels(self.config)
+        names = channels or get_enabled_channels(self.config, available)
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            raise ValueError(f"Unknown channels: {', '.join(unknown)}")
+        
+        # Higher priority channels are started first when there are more channels than workers
+        names = sorted(names, key=lambda name: available[name].priority)
+        
+        unsupported = [name for name in names if available[name].extractor not in EXTRACTORS]
+        if unsupported:
+            raise ValueError(f"Channels with unknown extractor: {', '.join(unsupported)}")
+        
+        self.max_workers = self.config.getint('Scraping', 'MAX_CONCURRENT_CHANNELS', fallback=2)
+        # Passed in when the catch-up and refresh crawls of one scheduled task share it (scheduler.py)
+        self.rate_limiter = rate_limiter or RateLimiter(self.config.getfloat('Scraping', 'REQUEST_DELAY', fallback=1.0))
+        self.spool = RecordSpool(config_file)
+        self.checkpoint = CheckpointJournal(config_file)
+        
+        # --sink value, e.g. "mysql,jsonl:out.jsonl"; [Export] SINKS from config by default
+        sinks = sinks or self.config.get('Export', 'SINKS', fallback='mysql')
+        self.use_database, self.sink = open_sinks(sinks, config_file)
+        
+        self.scrapers = []
+        for name in names:
+            scraper = create_scraper(available[name], target_date=target_date, base_url=base_url,
+                                     start_date=start_date, end_date=end_date, resume=resume,
+                                     rate_limiter=self.rate_limiter, spool=self.spool, checkpoint=self.checkpoint,
+                                     config_file=config_file)
+            scraper.use_database = self.use_database
+            scraper.sink = self.sink
+            scraper.refresh = refresh
+            self.scrapers.append(scraper)
+        
+        # Seconds and list/detail requests the whole crawl may take, None or 0 for no limit
+        self.time_budget = time_budget or self.config.getfloat('Scraping', 'TIME_BUDGET', fallback=0) or None
+        self.request_budget = request_budget or self.config.getint('Scraping', 'REQUEST_BUDGET', fallback=0) or None
+        # A budget shared with other crawls of the same task (scheduler.py), started by run() otherwise
+        self.budget = budget
+    
+    def run(self):
+        """Crawl all channels, returns the per-channel summaries"""
+        budget = self.budget or CrawlBudget(self.time_budget, self.request_budget)
+        for scraper in self.scrapers:
+            scraper.budget = budget
+        logging.info(f"Crawling channels: {', '.join(s.channel.name for s in self.scrapers)} "
+                     f"with up to {self.max_workers} concurrent channels")
+        
+        drainer = None
+        if self.use_database and self.spool.enabled and not any(scraper.refresh for scraper in self.scrapers):
+            drainer = SpoolDrainer(self.spool, DatabaseManager(self.config_file))
+            drainer.start()
+        
+        # Pushes the rows published while crawling to the webhook, if one is configured
+        dispatcher = None
+        feed = ChangeFeed(self.config_file)
+        if self.use_database and feed.enabled and self.config.get('Feed', 'WEBHOOK_URL', fallback=''):
+            dispatcher = WebhookDispatcher(feed, self.config_file)
+            dispatcher.start()
+        
+        summaries = []
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Prioritize finding zhaobiao-content div
-            zhaobiao_div = soup.find('div', class_='zhaobiao-content')
-            if zhaobiao_div:
-                return str(zhaobiao_div)
-            
-            # If not found, try to find detail-content div
-            detail_content = soup.find('div', class_='detail-content')
-            if detail_content:
-                logging.warning("zhaobiao-content div not found, using detail-content as fallback")
-                return str(detail_content)
-            
-            # If both not found, try to find main container
-            main_div = soup.find('div', id='main')
-            if main_div:
-                logging.warning("Specific content div not found, using main container as fallback")
-                return str(main_div)
-            
-            # Last resort
-            logging.warning("No specific div found, saving empty content")
-            return ""
-                    
-        except Exception as e:
-            logging.error(f"Error extracting bid announcement content: {e}")
-            return ""
+            with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+                futures = [executor.submit(scraper.scrape) for scraper in self.scrapers]
+                for future in futures:
+                    summaries.append(future.result())
+        finally:
+            if drainer:
+                drainer.stop()
+                drainer.db.close()
+            if dispatcher:
+                dispatcher.stop()
+                feed.close()
+            if self.sink:
+                self.sink.close()
+        
+        for summary in summaries:
+            if summary.get('skipped'):
+                logging.info(f"[{summary['channel']}] skipped, another crawl of the channel was running")
+                continue
+            logging.info(f"[{summary['channel']}] pages={summary['pages']} links={summary['links']} "
+                         f"saved={summary['saved']} failed={summary['failed']}")
+        usage = budget.summary()
+        logging.info(f"Budget used: {usage['requests']} requests in {usage['elapsed']}s"
+                     + (f", {usage['exhausted']} budget exhausted" if usage['exhausted'] else ""))
+        return summaries
+
+# Channels crawled by the legacy --type argument
+TYPE_CHANNELS = {
+    'candidates': ['hxrgs'],
+    'announcements': ['zbgg'],
+    'both': ['hxrgs', 'zbgg'],
+}
 
 def main():
-    """Main function - execute candidate and bid announcement scraping in sequence"""
+    """Main function - crawl the selected channels concurrently"""
     import argparse
     
     # Parse command line arguments
     parser = argparse.ArgumentParser(description='Bid information scraping tool')
     parser.add_argument('--date', type=str, help='Specify scraping date (format: YYYY-MM-DD)')
     parser.add_argument('--type', choices=['candidates', 'announcements', 'both'], 
-                       default='both', help='Specify scraping type: candidates, announcements, or both')
+                       help='Specify scraping type: candidates, announcements, or both (default: all channels in config)')
+    parser.add_argument('--channels', type=str, help='Comma-separated channel names to crawl, e.g. hxrgs,zbgg')
     parser.add_argument('date_positional', nargs='?', help='Positional argument for date (format: YYYY-MM-DD)')
+    parser.add_argument('--start-date', type=str, help='Start of date range to scrape (format: YYYY-MM-DD)')
+    parser.add_argument('--end-date', type=str, help='End of date range to scrape (format: YYYY-MM-DD), defaults to the target date')
+    parser.add_argument('--resume', action='store_true', help='Continue an interrupted run from the checkpoint journal')
+    parser.add_argument('--sink', type=str, action='append',
+                        help='Output sinks, repeatable or comma-separated: mysql, jsonl[:path], csv[:path], '
+                             'parquet[:path], sqlite[:path], search[:path] (default: [Export] SINKS or mysql)')
+    parser.add_argument('--refresh', type=int, nargs='?', const=-1, metavar='DAYS',
+                        help='Re-check detail pages of the last DAYS days (default: [Refresh] DAYS) '
+                             'and update rows whose content changed')
+    parser.add_argument('--time-budget', type=float, default=None, metavar='SECONDS',
+                        help='Stop after this many seconds, newest days first (default: [Scraping] TIME_BUDGET)')
+    parser.add_argument('--request-budget', type=int, default=None, metavar='N',
+                        help='Stop after this many requests to the site (default: [Scraping] REQUEST_BUDGET)')
     
     args = parser.parse_args()
     
+    setup_logging('scraper.log')
+    
     # Determine target date
     target_date = None
     if args.date:
@@ -956,29 +1599,35 @@ def main():
     else:
         logging.info("No date specified, using yesterday as target date")
     
-    # Execute tasks based on type argument
-    if args.type in ['candidates', 'both']:
-        # Execute candidate information scraping
-        logging.info("=" * 60)
-        logging.info("Starting bid candidate information scraping task")
-        logging.info("=" * 60)
-        
-        candidate_scraper = BidCandidateScraper(target_date)
-        candidate_scraper.scrape_candidates()
-        
-        # If also scraping bid announcements, wait before starting
-        if args.type == 'both':
-            logging.info("Candidate scraping completed, waiting 5 seconds before starting bid announcement scraping...")
-            time.sleep(5)
-    
-    if args.type in ['announcements', 'both']:
-        # Execute bid announcement scraping
-        logging.info("=" * 60)
-        logging.info("Starting bid announcement information scraping task")
-        logging.info("=" * 60)
-        
-        announcement_scraper = BidAnnouncementScraper(target_date)
-        announcement_scraper.scrape_announcements()
+    # Determine channels: explicit list, legacy --type, or [Scraping] CHANNELS from config
+    if args.channels:
+        channels = [name.strip() for name in args.channels.split(',') if name.strip()]
+    elif args.type:
+        channels = TYPE_CHANNELS[args.type]
+    else:
+        channels = None
+    
+    # Refresh a rolling window of recent days ending today
+    start_date, end_date = args.start_date, args.end_date
+    if args.refresh is not None:
+        config = load_config('config.ini')
+        days = args.refresh if args.refresh >= 0 else config.getint('Refresh', 'DAYS', fallback=7)
+        today = datetime.now()
+        start_date = start_date or (today - timedelta(days=days)).strftime('%Y-%m-%d')
+        end_date = end_date or today.strftime('%Y-%m-%d')
+        target_date = target_date or end_date
+        logging.info(f"Refreshing records published {start_date} ~ {end_date}")
+    
+    logging.info("=" * 60)
+    logging.info("Starting bid information scraping task")
+    logging.info("=" * 60)
+    
+    engine = CrawlEngine(channels, target_date=target_date, start_date=start_date,
+                         end_date=end_date, resume=args.resume,
+                         sinks=','.join(args.sink) if args.sink else None,
+                         refresh=args.refresh is not None, time_budget=args.time_budget,
+                         request_budget=args.request_budget)
+    engine.run()
     
     logging.info("=" * 60)
     logging.info("All scraping tasks completed!")
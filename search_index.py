@@ -0,0 +1,146 @@
+import sqlite3
+import threading
+
+from content_pipeline import decode_content, html_to_text
+from log_config import setup_logging
+from settings import load_config
+
+# Columns searchable by field name, "body" holds the plain text of the detail content
+SEARCH_FIELDS = ('title', 'tenderer', 'candidate', 'body')
+
+# The trigram tokenizer indexes every 3-character window, so Chinese text needs no word segmentation
+MIN_MATCH_LENGTH = 3
+
+
+class SearchIndex:
+    """Search Index Class - local SQLite FTS5 index over scraped titles, tenderers, candidates and content
+
+    Records are added one at a time as they are written; a record with the same table, title
+    and time replaces the previous entry, so the index is never rebuilt.
+    """
+
+    def __init__(self, config_file='config.ini', path=None):
+        config = load_config(config_file)
+        self.path = path or config.get('Search', 'INDEX_FILE', fallback='search.db')
+        # Indexing the full detail text makes the index several times larger
+        self.index_content = config.getboolean('Search', 'INDEX_CONTENT', fallback=True)
+
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                table_name TEXT NOT NULL,
+                title TEXT NOT NULL,
+                time TEXT NOT NULL,
+                UNIQUE (table_name, title, time)
+            )
+        """)
+        self.connection.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS search USING fts5("
+            "title, tenderer, candidate, body, tokenize='trigram')")
+        self.connection.commit()
+
+    def document_values(self, record):
+        """Values of the searchable columns for a record"""
+        body = ''
+        if self.index_content and record.get('content'):
+            body = html_to_text(decode_content(record['content']))
+        return (record.get('title') or '', record.get('tenderer') or '',
+                record.get('candidate') or '', body)
+
+    def add_records(self, table_name, records):
+        """Add or replace records in the index, committed as one transaction"""
+        rows = [(record['title'], record['time'], self.document_values(record)) for record in records]
+        with self.lock:
+            try:
+                for title, time_str, values in rows:
+                    row = self.connection.execute(
+                        "SELECT id FROM documents WHERE table_name = ? AND title = ? AND time = ?",
+                        (table_name, title, time_str)).fetchone()
+                    if row:
+                        doc_id = row[0]
+                        self.connection.execute("DELETE FROM search WHERE rowid = ?", (doc_id,))
+                    else:
+                        doc_id = self.connection.execute(
+                            "INSERT INTO documents (table_name, title, time) VALUES (?, ?, ?)",
+                            (table_name, title, time_str)).lastrowid
+                    self.connection.execute(
+                        "INSERT INTO search (rowid, title, tenderer, candidate, body) VALUES (?, ?, ?, ?, ?)",
+                        (doc_id,) + values)
+                self.connection.commit()
+            except Exception:
+                self.connection.rollback()
+                raise
+
+    def search(self, text, field=None, table_name=None, limit=50):
+        """Records whose field (or any field) contains text, newest first"""
+        if field and field not in SEARCH_FIELDS:
+            raise ValueError(f"Unknown field {field}, choose from: {', '.join(SEARCH_FIELDS)}")
+        fields = [field] if field else list(SEARCH_FIELDS)
+
+        if len(text) >= MIN_MATCH_LENGTH:
+            # Phrase query on the trigram index, restricted to the requested columns
+            phrase = '"' + text.replace('"', '""') + '"'
+            condition = "search MATCH ?"
+            params = ['{' + ' '.join(fields) + '} : ' + phrase]
+        else:
+            # Too short for a trigram: LIKE still scans only the index, not the database tables
+            condition = '(' + ' OR '.join(f"search.{name} LIKE ?" for name in fields) + ')'
+            params = [f"%{text}%"] * len(fields)
+
+        if table_name:
+            condition += " AND documents.table_name = ?"
+            params.append(table_name)
+        params.append(limit)
+
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT documents.table_name, documents.title, documents.time, search.tenderer, search.candidate "
+                "FROM search JOIN documents ON documents.id = search.rowid "
+                f"WHERE {condition} ORDER BY documents.time DESC, documents.id DESC LIMIT ?", params).fetchall()
+        return [
+            {'table': table, 'title': title, 'time': time_str, 'tenderer': tenderer, 'candidate': candidate}
+            for table, title, time_str, tenderer, candidate in rows
+        ]
+
+    def count(self):
+        """Number of indexed records"""
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+def main():
+    """Main function - query the local search index"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Search scraped announcements and candidates in the local full-text index')
+    parser.add_argument('text', nargs='?', help='Text to search for, e.g. a tenderer or company name')
+    parser.add_argument('--field', choices=SEARCH_FIELDS, help='Only search this field (default: all fields)')
+    parser.add_argument('--table', type=str, help='Only return records of this table, e.g. fa_crawler')
+    parser.add_argument('--limit', type=int, default=50, help='Maximum number of results')
+    parser.add_argument('--index', type=str, default=None, help='Index file (default: [Search] INDEX_FILE)')
+    parser.add_argument('--config', type=str, default='config.ini', help='Configuration file')
+    args = parser.parse_args()
+
+    setup_logging(config_file=args.config)
+    index = SearchIndex(args.config, args.index)
+    if not args.text:
+        print(f"{index.count()} records indexed in {index.path}")
+    else:
+        for result in index.search(args.text, args.field, args.table, args.limit):
+            print(f"{result['time']}  [{result['table']}]  {result['title']}")
+            if result['tenderer']:
+                print(f"    招标人: {result['tenderer']}")
+            if result['candidate']:
+                print(f"    候选人: {result['candidate']}")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import configparser
+import logging
+import os
+import threading
+import time
+
+# Parsed config files keyed by absolute path, with the (mtime, size) they were parsed at
+_configs = {}
+_lock = threading.Lock()
+
+
+def load_config(config_file='config.ini'):
+    """Parsed ConfigParser for a config file, read once per process
+
+    Every component reads its own section from the same file; they share one parse. The file
+    is parsed again only if it changed on disk. The returned parser is shared, do not modify it.
+    """
+    path = os.path.abspath(config_file)
+    try:
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        version = None
+
+    with _lock:
+        cached = _configs.get(path)
+        if cached and cached[0] == version:
+            return cached[1]
+        config = configparser.ConfigParser()
+        config.read(path, encoding='utf-8')
+        _configs[path] = (version, config)
+        return config
+
+
+def touch_write_stamp(path):
+    """Mark that new rows were committed, read API processes drop their cached responses"""
+    if not path:
+        return
+    try:
+        with open(path, 'a'):
+            pass
+        os.utime(path, ns=(time.time_ns(), time.time_ns()))
+    except OSError as e:
+        logging.warning(f"Cannot update API write stamp {path}: {e}")
+
+
+def read_write_stamp(path):
+    """Modification time of the write stamp, None if there is none yet"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except (OSError, TypeError):
+        return None
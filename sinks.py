@@ -0,0 +1,309 @@
+import csv
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from channels import TABLE_COLUMNS
+from search_index import SearchIndex
+from settings import load_config
+
+# Names accepted by --sink; "mysql" is handled by the scraper itself (spool / DatabaseManager)
+SINK_TYPES = ('mysql', 'jsonl', 'csv', 'parquet', 'sqlite', 'search')
+
+
+class Sink:
+    """Output Sink Interface - receives records one at a time as they are scraped"""
+
+    def __init__(self, table_names=None):
+        self.table_names = table_names or {}
+        self.lock = threading.Lock()
+        self.count = 0
+
+    def table_name(self, table_type):
+        """Configured table name for a table type (candidate, crawler) or the literal name"""
+        return self.table_names.get(table_type, table_type)
+
+    def write(self, table_type, record):
+        """Write one record"""
+        raise NotImplementedError
+
+    def flush(self):
+        """Write out anything buffered"""
+
+    def close(self):
+        """Flush and release resources"""
+        self.flush()
+
+
+class JsonlSink(Sink):
+    """One JSON object per line, written and flushed per record"""
+
+    def __init__(self, path, table_names=None):
+        super().__init__(table_names)
+        self.path = path
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def write(self, table_type, record):
+        line = json.dumps(dict(record, table=self.table_name(table_type)), ensure_ascii=False)
+        with self.lock:
+            self.file.write(line + '\n')
+            self.file.flush()
+            self.count += 1
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+class CsvSink(Sink):
+    """One CSV file per table ({table} in the path), rows written as they arrive"""
+
+    def __init__(self, path, table_names=None):
+        super().__init__(table_names)
+        self.path = path if '{table}' in path else path.replace('.csv', '') + '_{table}.csv'
+        self.files = {}
+
+    def write(self, table_type, record):
+        table = self.table_name(table_type)
+        with self.lock:
+            if table not in self.files:
+                path = self.path.format(table=table)
+                new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+                # utf-8-sig so the Chinese text opens correctly in Excel
+                handle = open(path, 'a', encoding='utf-8-sig' if new_file else 'utf-8', newline='')
+                writer = csv.DictWriter(handle, fieldnames=list(record))
+                if new_file:
+                    writer.writeheader()
+                self.files[table] = (handle, writer)
+            handle, writer = self.files[table]
+            writer.writerow(record)
+            handle.flush()
+            self.count += 1
+
+    def close(self):
+        with self.lock:
+            for handle, writer in self.files.values():
+                handle.close()
+            self.files = {}
+
+
+class BatchedSink(Sink):
+    """Sink buffering up to batch_size records per table before writing a batch"""
+
+    def __init__(self, batch_size=500, table_names=None):
+        super().__init__(table_names)
+        self.batch_size = batch_size
+        self.buffers = {}
+
+    def write(self, table_type, record):
+        table = self.table_name(table_type)
+        with self.lock:
+            buffer = self.buffers.setdefault(table, [])
+            buffer.append(record)
+            self.count += 1
+            if len(buffer) >= self.batch_size:
+                self.buffers[table] = []
+                self.write_or_drop(table, buffer)
+
+    def flush(self):
+        with self.lock:
+            buffers, self.buffers = self.buffers, {}
+            for table, buffer in buffers.items():
+                if buffer:
+                    self.write_or_drop(table, buffer)
+
+    def write_or_drop(self, table, records):
+        """Write a batch; a batch that fails is dropped so it does not block every later write"""
+        try:
+            self.write_batch(table, records)
+        except Exception as e:
+            logging.error(f"{type(self).__name__} dropped {len(records)} records of {table}: {e}")
+
+    def write_batch(self, table, records):
+        raise NotImplementedError
+
+
+class SQLiteSink(BatchedSink):
+    """Local SQLite database with one table per target table, committed per batch"""
+
+    def __init__(self, path, batch_size=500, table_names=None):
+        super().__init__(batch_size, table_names)
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.created = set()
+
+    def write_batch(self, table, records):
+        columns = list(records[0])
+        if table not in self.created:
+            column_sql = ', '.join(f'"{column}" {self.column_type(column)}' for column in columns)
+            self.connection.execute(
+                f'CREATE TABLE IF NOT EXISTS "{table}" ("id" INTEGER PRIMARY KEY AUTOINCREMENT, {column_sql})')
+            # Files written before a column was configured (e.g. TEXT_COLUMN) get it added
+            existing = {row[1] for row in self.connection.execute(f'PRAGMA table_info("{table}")')}
+            for column in columns:
+                if column not in existing:
+                    self.connection.execute(f'ALTER TABLE "{table}" ADD COLUMN "{column}" {self.column_type(column)}')
+            self.created.add(table)
+        placeholders = ', '.join(['?'] * len(columns))
+        column_sql = ', '.join(f'"{column}"' for column in columns)
+        self.connection.executemany(
+            f'INSERT INTO "{table}" ({column_sql}) VALUES ({placeholders})',
+            [[record.get(column) for column in columns] for record in records])
+        self.connection.commit()
+
+    @staticmethod
+    def column_type(column):
+        return 'INTEGER' if column == 'createtime' else 'TEXT'
+
+    def close(self):
+        super().close()
+        self.connection.close()
+
+
+class ParquetSink(BatchedSink):
+    """Parquet files ({table} in the path) written one row group per batch, requires pyarrow"""
+
+    def __init__(self, path, batch_size=5000, table_names=None):
+        super().__init__(batch_size, table_names)
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("The pyarrow package is required for the parquet sink (pip install pyarrow)")
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.path = path if '{table}' in path else path.replace('.parquet', '') + '_{table}.parquet'
+        self.writers = {}
+        self.schemas = {}
+
+    def write_batch(self, table, records):
+        if table not in self.writers:
+            # The first batch fixes the columns of the file
+            self.schemas[table] = self.pa.schema([
+                (column, self.pa.int64() if column == 'createtime' else self.pa.string()) for column in records[0]])
+            self.writers[table] = self.pq.ParquetWriter(self.path.format(table=table), self.schemas[table])
+        schema = self.schemas[table]
+        columns = {name: [record.get(name) for record in records] for name in schema.names}
+        self.writers[table].write_table(self.pa.table(columns, schema=schema))
+
+    def close(self):
+        super().close()
+        for writer in self.writers.values():
+            writer.close()
+        self.writers = {}
+
+
+class SearchIndexSink(BatchedSink):
+    """Keeps the local full-text search index up to date, see search_index.py"""
+
+    def __init__(self, config_file='config.ini', path=None, batch_size=100, table_names=None):
+        super().__init__(batch_size, table_names)
+        self.index = SearchIndex(config_file, path)
+
+    def write_batch(self, table, records):
+        self.index.add_records(table, records)
+
+    def close(self):
+        super().close()
+        self.index.close()
+
+
+class MultiSink(Sink):
+    """Fans records out to several sinks
+
+    Every record of a table is written with the same fixed columns: the table's known columns,
+    the configured extra columns (TEXT_COLUMN) and createtime. Keys starting with "_" are
+    fetch metadata (URL, validators, project code) and are not exported, as in the database.
+    """
+
+    def __init__(self, sinks, extra_columns=()):
+        super().__init__()
+        self.sinks = sinks
+        self.extra_columns = [column for column in extra_columns if column]
+        self.table_columns = {}
+
+    def columns(self, table_type, record):
+        """Fixed column list of a table type, custom tables keep the columns of their first record"""
+        columns = self.table_columns.get(table_type)
+        if columns is None:
+            known = TABLE_COLUMNS.get(table_type)
+            if known is None:
+                known = [column for column in record if column != 'createtime' and not column.startswith('_')]
+            columns = list(known) + [column for column in self.extra_columns if column not in known]
+            self.table_columns[table_type] = columns = columns + ['createtime']
+        return columns
+
+    def write(self, table_type, record):
+        row = {column: record.get(column, '') for column in self.columns(table_type, record)}
+        # createtime matches what the database rows get
+        row['createtime'] = record.get('createtime') or int(datetime.now().timestamp())
+        for sink in self.sinks:
+            try:
+                sink.write(table_type, row)
+            except Exception as e:
+                logging.error(f"{type(sink).__name__} failed to write record: {e}")
+        self.count += 1
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self):
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                logging.error(f"{type(sink).__name__} failed to close: {e}")
+            logging.info(f"{type(sink).__name__} wrote {sink.count} records")
+
+
+def parse_sink_spec(spec):
+    """Split a --sink value like "mysql,jsonl:out.jsonl,csv" into (type, path) pairs"""
+    sinks = []
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        sink_type, _, path = item.partition(':')
+        sink_type = sink_type.strip().lower()
+        if sink_type not in SINK_TYPES:
+            raise ValueError(f"Unknown sink {sink_type}, choose from: {', '.join(SINK_TYPES)}")
+        sinks.append((sink_type, path.strip() or None))
+    return sinks
+
+
+def open_sinks(spec, config_file='config.ini'):
+    """Open the export sinks of a --sink value
+
+    Returns (use_database, sink) where sink is a MultiSink over the non-MySQL sinks, or None.
+    """
+    config = load_config(config_file)
+    table_names = {
+        'candidate': config.get('Tables', 'CANDIDATE_TABLE', fallback='fa_candidate'),
+        'crawler': config.get('Tables', 'CRAWLER_TABLE', fallback='fa_crawler'),
+    }
+    batch_size = config.getint('Export', 'BATCH_SIZE', fallback=500)
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    use_database = False
+    sinks = []
+    for sink_type, path in parse_sink_spec(spec):
+        if sink_type == 'mysql':
+            use_database = True
+        elif sink_type == 'jsonl':
+            sinks.append(JsonlSink(path or f"export_{stamp}.jsonl", table_names))
+        elif sink_type == 'csv':
+            sinks.append(CsvSink(path or f"export_{stamp}_{{table}}.csv", table_names))
+        elif sink_type == 'sqlite':
+            sinks.append(SQLiteSink(path or 'export.db', batch_size, table_names))
+        elif sink_type == 'parquet':
+            sinks.append(ParquetSink(path or f"export_{stamp}_{{table}}.parquet", batch_size * 10, table_names))
+        elif sink_type == 'search':
+            sinks.append(SearchIndexSink(config_file, path, config.getint('Search', 'BATCH_SIZE', fallback=100),
+                                         table_names))
+
+    extra_columns = [config.get('Content', 'TEXT_COLUMN', fallback='').strip()]
+    return use_database, (MultiSink(sinks, extra_columns) if sinks else None)
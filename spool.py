@@ -0,0 +1,217 @@
+import configparser
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from settings import load_config
+
+
+class RecordSpool:
+    """Record Spool Class - durable local write-ahead queue of scraped records awaiting MySQL"""
+
+    def __init__(self, config_file='config.ini', path=None):
+        """Open (or create) the spool file, an explicit path always enables the spool"""
+        config = load_config(config_file)
+        try:
+            self.enabled = config.getboolean('Spool', 'SPOOL_ENABLED') or path is not None
+            self.path = path or config.get('Spool', 'SPOOL_FILE')
+            self.batch_size = config.getint('Spool', 'DRAIN_BATCH_SIZE')
+            self.drain_interval = config.getfloat('Spool', 'DRAIN_INTERVAL')
+            self.drain_timeout = config.getfloat('Spool', 'DRAIN_TIMEOUT')
+        except (configparser.NoSectionError, configparser.NoOptionError) as e:
+            logging.warning(f"Spool configuration not found ({e}), writing directly to the database")
+            self.enabled = path is not None
+            self.path = path or 'spool.db'
+            self.batch_size = 200
+            self.drain_interval = 2.0
+            self.drain_timeout = 30.0
+
+        self.lock = threading.Lock()
+        self.connection = None
+        if self.enabled:
+            self.open()
+
+    def open(self):
+        """Open the SQLite spool file"""
+        self.connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS records (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                table_type TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                claimed_until REAL NOT NULL DEFAULT 0
+            )
+        """)
+        # Add the claim column to spool files created by older versions
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(records)")]
+        if 'claimed_until' not in columns:
+            self.connection.execute("ALTER TABLE records ADD COLUMN claimed_until REAL NOT NULL DEFAULT 0")
+
+    def append(self, table_type, record):
+        """Durably append one record for the candidate or crawler table"""
+        payload = json.dumps(record, ensure_ascii=False)
+        now = datetime.now().isoformat(timespec='seconds')
+        with self.lock:
+            self.connection.execute(
+                "INSERT INTO records (table_type, payload, created_at) VALUES (?, ?, ?)",
+                (table_type, payload, now))
+
+    def claim(self, limit, claim_seconds=60):
+        """Claim the oldest unclaimed records as (id, table_type, record) without removing them
+        
+        A claim keeps other drainers (other channels, worker processes or spool.py) from loading
+        the same batch; records whose claim expires without an ack become available again.
+        """
+        now = time.time()
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self.connection.execute(
+                    "SELECT id, table_type, payload FROM records WHERE claimed_until < ? ORDER BY id LIMIT ?",
+                    (now, limit)).fetchall()
+                self.connection.executemany(
+                    "UPDATE records SET claimed_until = ? WHERE id = ?",
+                    [(now + claim_seconds, row[0]) for row in rows])
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+        return [(row_id, table_type, json.loads(payload)) for row_id, table_type, payload in rows]
+    
+    def release(self, ids):
+        """Give up the claim on records that could not be loaded"""
+        if not ids:
+            return
+        with self.lock:
+            self.connection.executemany("UPDATE records SET claimed_until = 0 WHERE id = ?", [(row_id,) for row_id in ids])
+
+    def ack(self, ids):
+        """Remove records that have been loaded into the database"""
+        if not ids:
+            return
+        with self.lock:
+            self.connection.executemany("DELETE FROM records WHERE id = ?", [(row_id,) for row_id in ids])
+
+    def count(self):
+        """Number of records waiting in the spool"""
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def close(self):
+        """Close the spool file"""
+        with self.lock:
+            if self.connection:
+                self.connection.close()
+                self.connection = None
+
+
+class SpoolDrainer(threading.Thread):
+    """Background thread that bulk-loads spooled records into the database"""
+
+    def __init__(self, spool, db):
+        super().__init__(name='SpoolDrainer', daemon=True)
+        self.spool = spool
+        self.db = db
+        self.stop_event = threading.Event()
+        self.loaded_count = 0
+        self.duplicate_count = 0
+
+    def drain_once(self):
+        """Load one batch from the spool, returns the number of records taken off the spool"""
+        batch = self.spool.claim(self.spool.batch_size, max(60.0, self.spool.drain_timeout))
+        if not batch:
+            return 0
+        ids = [row_id for row_id, table_type, record in batch]
+
+        if not self.db.connection or not self.db.connection.open:
+            if not self.db.connect():
+                self.spool.release(ids)
+                raise ConnectionError("Database unavailable, records kept in spool")
+
+        # Group by target table so each table gets one bulk insert
+        groups = {}
+        for row_id, table_type, record in batch:
+            groups.setdefault(table_type, []).append(record)
+
+        try:
+            for table_type, records in groups.items():
+                inserted = self.db.insert_records(table_type, records)
+                self.loaded_count += inserted
+                self.duplicate_count += len(records) - inserted
+        except Exception:
+            self.spool.release(ids)
+            # Force a reconnect on the next attempt
+            try:
+                self.db.close()
+            except Exception:
+                pass
+            self.db.connection = None
+            raise
+
+        self.spool.ack(ids)
+        return len(batch)
+
+    def run(self):
+        """Drain continuously until stopped"""
+        while not self.stop_event.is_set():
+            try:
+                if self.drain_once():
+                    continue
+            except Exception as e:
+                logging.warning(f"Spool drain failed, will retry: {e}")
+            self.stop_event.wait(self.spool.drain_interval)
+
+    def stop(self):
+        """Stop the thread and flush what is left within the drain timeout"""
+        self.stop_event.set()
+        if self.is_alive():
+            self.join()
+
+        deadline = time.monotonic() + self.spool.drain_timeout
+        while time.monotonic() < deadline:
+            try:
+                if not self.drain_once():
+                    break
+            except Exception as e:
+                logging.warning(f"Spool drain failed: {e}")
+                time.sleep(min(self.spool.drain_interval, max(0.0, deadline - time.monotonic())))
+
+        remaining = self.spool.count()
+        if remaining:
+            logging.warning(f"{remaining} records remain in spool {self.spool.path}, they will be loaded on the next run")
+        logging.info(f"Spool drainer loaded {self.loaded_count} records, skipped {self.duplicate_count} duplicates")
+
+
+def main():
+    """Main function - flush the spool into the database"""
+    import argparse
+    from log_config import setup_logging
+    from scraper import DatabaseManager
+
+    parser = argparse.ArgumentParser(description='Load spooled records into the database')
+    parser.add_argument('--status', action='store_true', help='Only show the number of spooled records')
+    args = parser.parse_args()
+
+    setup_logging('scraper.log')
+    spool = RecordSpool()
+    if not spool.enabled:
+        spool.open()
+    print(f"{spool.count()} records in spool {spool.path}")
+    if args.status:
+        return
+
+    drainer = SpoolDrainer(spool, DatabaseManager())
+    drainer.stop()
+    drainer.db.close()
+    print(f"Loaded {drainer.loaded_count} records, skipped {drainer.duplicate_count} duplicates, "
+          f"{spool.count()} remaining")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Startup paths measured by default, each in a fresh interpreter
+DEFAULT_COMMANDS = [
+    ('import scraper', [sys.executable, '-c', 'import scraper']),
+    ('import scheduler', [sys.executable, '-c', 'import scheduler']),
+    ('import search_index', [sys.executable, '-c', 'import search_index']),
+    ('scraper.py --help', [sys.executable, 'scraper.py', '--help']),
+    ('companies.py --help', [sys.executable, 'companies.py', '--help']),
+    ('search_index.py --help', [sys.executable, 'search_index.py', '--help']),
+    ('spool.py --help', [sys.executable, 'spool.py', '--help']),
+]
+
+
+def time_command(command, runs):
+    """Wall-clock seconds of each of runs executions of a command"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def slowest_imports(module, limit):
+    """(cumulative microseconds, module name) of the slowest top-level imports of a module"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    # A module's own imports are listed just before it, one level deeper
+    imports, children = [], []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            children.append((int(cumulative), name.strip()))
+        elif depth == 0:
+            if name.strip() == module:
+                imports = children
+            children = []
+    return sorted(imports, reverse=True)[:limit]
+
+
+def main():
+    """Main function - measure process startup time of the command-line tools"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Measure startup time of the scraper command-line tools')
+    parser.add_argument('--runs', type=int, default=10, help='Executions per command')
+    parser.add_argument('--command', action='append', default=None,
+                        help='Command line to time instead of the defaults, e.g. "dist/BidScraper.exe --help" (repeatable)')
+    parser.add_argument('--imports', type=str, default=None, metavar='MODULE',
+                        help='Also list the slowest imports of a module, e.g. scraper')
+    args = parser.parse_args()
+
+    # Run from the project folder so the modules and config.ini are found
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    commands = [(command, command.split()) for command in args.command] if args.command else DEFAULT_COMMANDS
+
+    print(f"{'command':<28} {'min':>9} {'median':>9} {'max':>9}")
+    for label, command in commands:
+        timings = time_command(command, args.runs)
+        print(f"{label:<28} {min(timings) * 1000:>7.1f}ms {statistics.median(timings) * 1000:>7.1f}ms "
+              f"{max(timings) * 1000:>7.1f}ms")
+
+    if args.imports:
+        print(f"\nSlowest imports of {args.imports}:")
+        for cumulative, name in slowest_imports(args.imports, 10):
+            print(f"  {cumulative / 1000:>7.1f}ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
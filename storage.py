@@ -0,0 +1,229 @@
+import logging
+import re
+from datetime import datetime, timedelta
+
+from companies import INSERT_IGNORE
+from content_pipeline import COMPRESSED_PREFIX, compress_content, decode_content
+from settings import load_config
+
+# Catch-all partition holding rows beyond the last monthly partition
+MAX_PARTITION = 'pmax'
+
+SCHEMAS = {
+    'mysql': """
+        CREATE TABLE IF NOT EXISTS `{archive}` (
+            `table_name` VARCHAR(64) NOT NULL,
+            `record_id` INT UNSIGNED NOT NULL,
+            `content` LONGTEXT NOT NULL,
+            `archived_at` INT UNSIGNED NOT NULL,
+            PRIMARY KEY (`table_name`, `record_id`)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    'sqlite': """
+        CREATE TABLE IF NOT EXISTS `{archive}` (
+            `table_name` TEXT NOT NULL, `record_id` INTEGER NOT NULL, `content` TEXT NOT NULL,
+            `archived_at` INTEGER NOT NULL, PRIMARY KEY (`table_name`, `record_id`)
+        )
+    """,
+}
+
+
+def add_months(month, count):
+    """First day of the month count months after the month of a date"""
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"p{month:%Y%m}"
+
+
+def partition_clause(month):
+    """Definition of the partition holding the rows of one month"""
+    return f"PARTITION {partition_name(month)} VALUES LESS THAN ('{add_months(month, 1):%Y-%m-%d}')"
+
+
+class StorageManager:
+    """Storage Manager Class - monthly partitions of the scraper tables and archiving of old content
+
+    The candidate and announcement tables are partitioned by month on `time` (MySQL RANGE
+    COLUMNS), so duplicate checks and date-range queries only touch the partitions of their
+    dates, and old months can be backed up or dropped on their own. Table names, ids and
+    queries stay the same. Content older than ARCHIVE_AFTER_DAYS is moved, compressed, to an
+    archive table; the row keeps its metadata and an empty content column.
+    """
+
+    def __init__(self, config_file='config.ini', dialect='mysql'):
+        config = load_config(config_file)
+        self.partitioning = config.getboolean('Storage', 'PARTITIONING', fallback=False)
+        self.months_ahead = config.getint('Storage', 'PARTITION_MONTHS_AHEAD', fallback=3)
+        self.archive_after_days = config.getint('Storage', 'ARCHIVE_AFTER_DAYS', fallback=0)
+        self.archive_table = config.get('Tables', 'ARCHIVE_TABLE', fallback='fa_content_archive')
+        self.batch_size = config.getint('Storage', 'ARCHIVE_BATCH_SIZE', fallback=500)
+        self.dialect = dialect
+
+    def partitions(self, cursor, table_name):
+        """Names of the partitions of a table, empty if it is not partitioned"""
+        cursor.execute(
+            "SELECT `PARTITION_NAME` FROM information_schema.`PARTITIONS` "
+            "WHERE `TABLE_SCHEMA` = DATABASE() AND `TABLE_NAME` = %s AND `PARTITION_NAME` IS NOT NULL",
+            (table_name,))
+        return [row[0] for row in cursor.fetchall()]
+
+    def partition_table(self, cursor, table_name):
+        """Convert a table to monthly partitions, from its oldest row to PARTITION_MONTHS_AHEAD ahead
+
+        Rebuilds the table, so it only runs during maintenance. It runs from storage.py --partition,
+        or from DatabaseManager.maintain_storage, the scheduler's daily storage_maintenance job, when
+        [Storage] PARTITIONING is on and the table is not partitioned yet. Crawls never call it.
+        The primary key becomes (id, time) because MySQL requires the partitioning column in
+        every unique key; id stays AUTO_INCREMENT and unique.
+        """
+        if self.dialect != 'mysql':
+            logging.warning(f"Partitioning needs MySQL, {table_name} is left as is")
+            return False
+        if self.partitions(cursor, table_name):
+            logging.info(f"{table_name} is already partitioned")
+            return False
+
+        cursor.execute(f"SELECT MIN(`time`) FROM `{table_name}`")
+        oldest = cursor.fetchone()[0]
+        first = datetime.strptime(str(oldest)[:7], '%Y-%m') if oldest else datetime.now()
+        months = self.months_until(first, add_months(datetime.now(), self.months_ahead))
+        clauses = [partition_clause(month) for month in months]
+        clauses.append(f"PARTITION {MAX_PARTITION} VALUES LESS THAN (MAXVALUE)")
+
+        # Duplicate checks look rows up by (title, time)
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.`STATISTICS` WHERE `TABLE_SCHEMA` = DATABASE() "
+            "AND `TABLE_NAME` = %s AND `COLUMN_NAME` = 'time' AND `SEQ_IN_INDEX` = 1", (table_name,))
+        time_index = '' if cursor.fetchone()[0] else ", ADD KEY `idx_time_title` (`time`, `title`(100))"
+
+        logging.info(f"Partitioning {table_name} into {len(months)} monthly partitions, this rebuilds the table")
+        cursor.execute(
+            f"ALTER TABLE `{table_name}` DROP PRIMARY KEY, ADD PRIMARY KEY (`id`, `time`){time_index} "
+            f"PARTITION BY RANGE COLUMNS(`time`) ({', '.join(clauses)})")
+        return True
+
+    def months_until(self, first, last):
+        """First days of the months from first to last, inclusive"""
+        months = []
+        month = add_months(first, 0)
+        while month <= last:
+            months.append(month)
+            month = add_months(month, 1)
+        return months
+
+    def ensure_partitions(self, cursor, table_name):
+        """Split the catch-all partition so months up to PARTITION_MONTHS_AHEAD have their own
+
+        Returns the number of partitions added; tables that are not partitioned are skipped.
+        """
+        if self.dialect != 'mysql':
+            return 0
+        names = [name for name in self.partitions(cursor, table_name) if re.fullmatch(r'p\d{6}', name)]
+        if not names:
+            return 0
+        newest = datetime.strptime(max(names)[1:], '%Y%m')
+        months = self.months_until(add_months(newest, 1), add_months(datetime.now(), self.months_ahead))
+        if not months:
+            return 0
+        # The catch-all partition is empty while partitions are kept ahead, so reorganizing it is cheap
+        clauses = [partition_clause(month) for month in months]
+        clauses.append(f"PARTITION {MAX_PARTITION} VALUES LESS THAN (MAXVALUE)")
+        cursor.execute(f"ALTER TABLE `{table_name}` REORGANIZE PARTITION {MAX_PARTITION} INTO ({', '.join(clauses)})")
+        logging.info(f"Added partitions {', '.join(partition_name(month) for month in months)} to {table_name}")
+        return len(months)
+
+    def create_archive_table(self, cursor):
+        cursor.execute(SCHEMAS[self.dialect].format(archive=self.archive_table))
+
+    def archive_content(self, connection, table_name, cutoff=None):
+        """Move the content of rows published before cutoff to the archive table
+
+        cutoff defaults to ARCHIVE_AFTER_DAYS before today; with neither set nothing is archived.
+        Runs in batches, each committed on its own, and returns the number of rows archived.
+        """
+        if cutoff is None:
+            if not self.archive_after_days:
+                return 0
+            cutoff = (datetime.now() - timedelta(days=self.archive_after_days)).strftime('%Y-%m-%d')
+
+        cursor = connection.cursor()
+        total = 0
+        try:
+            self.create_archive_table(cursor)
+            while True:
+                cursor.execute(
+                    f"SELECT `id`, `content` FROM `{table_name}` WHERE `time` < %s AND `content` != '' "
+                    f"ORDER BY `id` LIMIT %s", (cutoff, self.batch_size))
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                archived_at = int(datetime.now().timestamp())
+                cursor.executemany(
+                    f"{INSERT_IGNORE[self.dialect]} INTO `{self.archive_table}` "
+                    f"(`table_name`, `record_id`, `content`, `archived_at`) VALUES (%s, %s, %s, %s)",
+                    [(table_name, record_id, self.compress(content), archived_at) for record_id, content in rows])
+                placeholders = ', '.join(['%s'] * len(rows))
+                cursor.execute(f"UPDATE `{table_name}` SET `content` = '' WHERE `id` IN ({placeholders})",
+                               [record_id for record_id, _ in rows])
+                connection.commit()
+                total += len(rows)
+                logging.info(f"Archived content of {total} rows of {table_name} published before {cutoff}")
+        finally:
+            cursor.close()
+        return total
+
+    def compress(self, content):
+        """Archived form of a content value, already compressed values are kept as they are"""
+        if content.startswith(COMPRESSED_PREFIX):
+            return content
+        return compress_content(content, level=9)
+
+    def load_content(self, cursor, table_name, record_id):
+        """Content of a row, read back from the archive if it was archived"""
+        cursor.execute(f"SELECT `content` FROM `{table_name}` WHERE `id` = %s", (record_id,))
+        row = cursor.fetchone()
+        if row and row[0]:
+            return decode_content(row[0])
+        self.create_archive_table(cursor)
+        cursor.execute(f"SELECT `content` FROM `{self.archive_table}` WHERE `table_name` = %s AND `record_id` = %s",
+                       (table_name, record_id))
+        archived = cursor.fetchone()
+        return decode_content(archived[0]) if archived else ''
+
+
+def main():
+    """Main function - partition the scraper tables, add upcoming partitions and archive old content"""
+    import argparse
+    from log_config import setup_logging
+    from scraper import DatabaseManager
+
+    parser = argparse.ArgumentParser(description='Storage maintenance of the candidate and announcement tables')
+    parser.add_argument('--partition', action='store_true',
+                        help='Convert the tables to monthly partitions (rebuilds them, run once in a quiet hour)')
+    parser.add_argument('--archive-before', type=str, default=None, metavar='YYYY-MM-DD',
+                        help='Archive the content of rows published before this date (default: [Storage] ARCHIVE_AFTER_DAYS)')
+    args = parser.parse_args()
+
+    setup_logging('scraper.log')
+    db = DatabaseManager()
+    if not db.connect():
+        return
+    try:
+        if args.partition:
+            cursor = db.connection.cursor()
+            try:
+                for table_name in (db.candidate_table, db.crawler_table):
+                    db.storage.partition_table(cursor, table_name)
+            finally:
+                cursor.close()
+        result = db.maintain_storage(args.archive_before)
+        print(f"Added {result['partitions']} partitions, archived content of {result['archived']} rows")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import configparser
+import time
+
+import pytest
+
+from api import ApiError, ReadApi
+from load_test import SQLiteDatabaseManager, write_test_config
+
+
+def make_api(tmp_path, page_size=2, **features):
+    config_file = write_test_config(str(tmp_path), use_spool=False)
+    config = configparser.ConfigParser()
+    config.read(config_file, encoding='utf-8')
+    config.set('API', 'PAGE_SIZE', str(page_size))
+    for section in features:
+        config.set(section, 'ENABLED', 'true')
+    with open(config_file, 'w', encoding='utf-8') as f:
+        config.write(f)
+    db = SQLiteDatabaseManager(str(tmp_path / 'test.db'), config_file)
+    assert db.connect()
+    return ReadApi(db, config_file), db
+
+
+def announcement(title, time_str='2025-07-19'):
+    return {'title': title, 'time': time_str, 'content': '<p>x</p>', 'tenderer': 'T'}
+
+
+def test_pages_continue_from_the_next_cursor(tmp_path):
+    api, db = make_api(tmp_path)
+    db.insert_records('crawler', [announcement(f"t{i}") for i in range(1, 6)])
+    pages = []
+    params = ''
+    while True:
+        page = api.handle('/announcements', params)
+        pages.append([item['title'] for item in page['items']])
+        if page['next'] is None:
+            break
+        params = f"before={page['next']}"
+    assert pages == [['t5', 't4'], ['t3', 't2'], ['t1']]
+    assert [item['id'] for item in api.handle('/changes', 'since=3')['items']] == [4, 5]
+    db.close()
+
+
+def test_cache_is_dropped_when_the_scraper_writes(tmp_path):
+    api, db = make_api(tmp_path)
+    db.insert_records('crawler', [announcement('t1')])
+    assert len(api.handle('/announcements', '')['items']) == 1
+    assert api.cache.stats()['misses'] == 1
+    api.handle('/announcements', '')
+    assert api.cache.stats()['hits'] == 1
+
+    # The insert touches the write stamp; the pause lets its mtime move on coarse file systems
+    time.sleep(0.01)
+    db.insert_records('crawler', [announcement('t2')])
+    assert [item['title'] for item in api.handle('/announcements', '')['items']] == ['t2', 't1']
+    db.close()
+
+
+def test_bad_requests(tmp_path):
+    api, db = make_api(tmp_path)
+    for path, params in [('/announcements', 'date=19-07-2025'), ('/announcements', 'before=abc'),
+                         ('/candidates', 'tenderer=T'), ('/candidates', 'company=A公司')]:
+        with pytest.raises(ApiError) as error:
+            api.handle(path, params)
+        assert error.value.status == 400
+    db.close()
+
+
+def test_company_filter(tmp_path):
+    api, db = make_api(tmp_path, Companies=True)
+    db.insert_records('candidate', [
+        {'title': 't1', 'time': '2025-07-19', 'content': '', 'candidate': 'A公司;B公司'},
+        {'title': 't2', 'time': '2025-07-19', 'content': '', 'candidate': 'B公司'},
+    ])
+    assert [item['title'] for item in api.handle('/candidates', 'company=ａ公司')['items']] == ['t1']
+    db.close()
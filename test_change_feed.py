@@ -0,0 +1,56 @@
+import configparser
+
+from change_feed import ChangeFeed
+from load_test import SQLiteDatabaseManager, write_test_config
+
+
+def test_seq_increases_and_is_not_reused(tmp_path):
+    feed = ChangeFeed(path=str(tmp_path / 'feed.db'))
+    assert feed.last_seq() == 0
+    assert feed.publish('fa_crawler', 'insert', [(1, {'title': 'a'}), (2, {'title': 'b'})]) == 2
+    feed.connection.execute("DELETE FROM events")
+    assert feed.publish('fa_crawler', 'update', [(1, {'title': 'a2'})]) == 3
+    events = feed.read(0)
+    assert [(event['seq'], event['op'], event['id']) for event in events] == [(3, 'update', 1)]
+    feed.close()
+
+
+def test_events_hide_metadata_and_content(tmp_path):
+    feed = ChangeFeed(path=str(tmp_path / 'feed.db'))
+    feed.publish('fa_crawler', 'insert', [(1, {'title': 'a', 'content': '<p>x</p>', 'createtime': 1,
+                                              '_url': 'http://x/1.html', '_etag': '"1"'})])
+    assert feed.read(0)[0]['record'] == {'title': 'a', 'url': 'http://x/1.html'}
+    feed.close()
+
+
+def test_consumers_resume_from_their_offset(tmp_path):
+    feed = ChangeFeed(path=str(tmp_path / 'feed.db'))
+    feed.publish('fa_crawler', 'insert', [(record_id, {'title': str(record_id)}) for record_id in range(1, 6)])
+    batch = feed.read(feed.get_offset('erp'), limit=3)
+    feed.commit_offset('erp', batch[-1]['seq'])
+    assert [event['seq'] for event in feed.read(feed.get_offset('erp'))] == [4, 5]
+    # Offsets never move backwards, a late commit of an older batch is ignored
+    feed.commit_offset('erp', 1)
+    assert feed.get_offset('erp') == 3
+    assert feed.get_offset('bi') == 0
+    feed.close()
+
+
+def test_feed_errors_do_not_fail_a_committed_batch(tmp_path, monkeypatch):
+    config_file = write_test_config(str(tmp_path), use_spool=False)
+    config = configparser.ConfigParser()
+    config.read(config_file, encoding='utf-8')
+    config.set('Feed', 'ENABLED', 'true')
+    with open(config_file, 'w', encoding='utf-8') as f:
+        config.write(f)
+    db = SQLiteDatabaseManager(str(tmp_path / 'test.db'), config_file)
+    assert db.connect()
+
+    def broken_publish(table_name, op, rows):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(db.feed, 'publish', broken_publish)
+    record = {'title': 'a', 'time': '2025-07-19', 'content': '<p>x</p>'}
+    assert db.insert_records('crawler', [record]) == 1
+    assert db.count_rows('crawler') == 1
+    db.close()
@@ -0,0 +1,88 @@
+import configparser
+import threading
+
+import pytest
+
+import channels
+from channels import CrawlBudget, RateLimiter, load_channels
+
+
+class FakeClock:
+    """Replaces time.monotonic and time.sleep in channels, sleeping advances the clock"""
+
+    def __init__(self, monkeypatch):
+        self.now = 1000.0
+        self.sleeps = []
+        monkeypatch.setattr(channels.time, 'monotonic', lambda: self.now)
+        monkeypatch.setattr(channels.time, 'sleep', self.sleep)
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    return FakeClock(monkeypatch)
+
+
+def test_rate_limiter_spaces_requests(clock):
+    limiter = RateLimiter(0.5)
+    for _ in range(3):
+        limiter.wait()
+    assert clock.sleeps == [0.5, 0.5]
+
+
+def test_rate_limiter_does_not_wait_after_an_idle_period(clock):
+    limiter = RateLimiter(0.5)
+    limiter.wait()
+    clock.now += 2
+    limiter.wait()
+    assert clock.sleeps == []
+
+
+def test_rate_limiter_without_interval_never_waits(clock):
+    limiter = RateLimiter(0)
+    for _ in range(5):
+        limiter.wait()
+    assert clock.sleeps == []
+
+
+def test_request_budget_is_shared_across_threads():
+    budget = CrawlBudget(max_requests=100)
+    threads = [threading.Thread(target=lambda: [budget.consume() for _ in range(25)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert budget.requests == 100
+    assert budget.exhausted() == 'requests'
+
+
+def test_time_budget_runs_out(clock):
+    budget = CrawlBudget(seconds=60)
+    assert budget.exhausted() is None
+    assert budget.remaining_seconds() == 60
+    clock.now += 60
+    assert budget.exhausted() == 'time'
+    assert budget.remaining_seconds() == 0
+
+
+def test_budget_without_limits_never_runs_out():
+    budget = CrawlBudget(seconds=0, max_requests=0)
+    for _ in range(1000):
+        budget.consume()
+    assert budget.exhausted() is None
+    assert budget.remaining_seconds() is None
+
+
+def test_channel_priority_comes_from_config():
+    config = configparser.ConfigParser()
+    config.read_dict({'Channel:hxrgs': {'PRIORITY': '5'}, 'Channel:zbgg': {'PRIORITY': '7'}})
+    loaded = load_channels(config)
+    assert sorted(loaded, key=lambda name: loaded[name].priority) == ['hxrgs', 'zbgg']
+
+
+def test_channel_priority_defaults_put_announcements_first():
+    loaded = load_channels(configparser.ConfigParser())
+    assert loaded['zbgg'].priority < loaded['hxrgs'].priority
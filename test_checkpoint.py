@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta
+
+from checkpoint import CheckpointJournal
+
+
+def day(offset):
+    return (datetime.now() + timedelta(days=offset)).strftime('%Y-%m-%d')
+
+
+def test_covered_dates_has_gaps_for_unfinished_runs(tmp_path):
+    journal = CheckpointJournal(path=str(tmp_path / 'checkpoint.db'))
+    journal.finish(journal.begin('zbgg', day(-6), day(-5)))
+    journal.begin('zbgg', day(-4), day(-3))
+    journal.finish(journal.begin('zbgg', day(-2), day(-1)))
+    journal.finish(journal.begin('hxrgs', day(-4), day(-3)))
+    assert journal.covered_dates('zbgg', day(-7), day(-1)) == {day(-6), day(-5), day(-2), day(-1)}
+
+
+def test_day_the_run_started_is_not_covered(tmp_path):
+    journal = CheckpointJournal(path=str(tmp_path / 'checkpoint.db'))
+    journal.finish(journal.begin('zbgg', day(-1), day(0)))
+    assert journal.covered_dates('zbgg', day(-2), day(0)) == {day(-1)}
+
+
+def test_refresh_runs_are_not_recorded(tmp_path):
+    journal = CheckpointJournal(path=str(tmp_path / 'checkpoint.db'))
+    journal.finish(journal.begin('zbgg', day(-3), day(0)), record=False)
+    assert journal.covered_dates('zbgg', day(-3), day(0)) == set()
+
+
+def test_record_covered_stops_before_the_run_started(tmp_path):
+    journal = CheckpointJournal(path=str(tmp_path / 'checkpoint.db'))
+    run_key = journal.begin('zbgg', day(-3), day(0))
+    journal.record_covered(run_key, day(-1), day(0))
+    journal.record_covered(run_key, day(0), day(0))
+    assert journal.covered_dates('zbgg', day(-3), day(0)) == {day(-1)}
+    # The budget-limited run itself stays open for --resume
+    assert journal.resume_page(run_key) == 1
@@ -0,0 +1,64 @@
+import configparser
+
+import pytest
+
+from companies import company_key, normalize_company_name, split_candidates
+from load_test import SQLiteDatabaseManager, write_test_config
+
+
+def make_db(tmp_path):
+    config_file = write_test_config(str(tmp_path), use_spool=False)
+    config = configparser.ConfigParser()
+    config.read(config_file, encoding='utf-8')
+    config.set('Companies', 'ENABLED', 'true')
+    with open(config_file, 'w', encoding='utf-8') as f:
+        config.write(f)
+    db = SQLiteDatabaseManager(str(tmp_path / 'test.db'), config_file)
+    assert db.connect()
+    return db
+
+
+def candidate(title, names):
+    return {'title': title, 'time': '2025-07-19', 'content': '<p>x</p>', 'candidate': names}
+
+
+def orphan_links(db):
+    cursor = db.connection.cursor()
+    cursor.execute(f"SELECT COUNT(*) FROM `{db.companies.link_table}` l "
+                   f"LEFT JOIN `{db.companies.company_table}` c ON c.`id` = l.`company_id` WHERE c.`id` IS NULL")
+    return cursor.fetchone()[0]
+
+
+def test_company_names_are_normalized():
+    assert split_candidates('A公司; B公司 ;') == ['A公司', 'B公司']
+    assert company_key('ＡＢＣ建设 有限公司') == company_key('abc建设有限公司')
+    assert normalize_company_name('某某建设(集团)有限责任公司') == normalize_company_name('某某建设（集团）有限公司')
+
+
+def test_candidates_are_linked_by_rank(tmp_path):
+    db = make_db(tmp_path)
+    db.insert_records('candidate', [candidate('t1', 'A公司;B公司'), candidate('t2', 'B公司')])
+    cursor = db.connection.cursor()
+    cursor.execute(f"SELECT c.`name`, l.`rank` FROM `{db.companies.link_table}` l "
+                   f"JOIN `{db.companies.company_table}` c ON c.`id` = l.`company_id` ORDER BY l.`candidate_id`, l.`rank`")
+    assert cursor.fetchall() == [('A公司', 1), ('B公司', 2), ('B公司', 1)]
+    db.close()
+
+
+def test_failed_batch_does_not_leave_cached_ids_behind(tmp_path, monkeypatch):
+    db = make_db(tmp_path)
+    index_inserted = db.index_inserted
+
+    def fail_after_linking(cursor, table_type, records):
+        index_inserted(cursor, table_type, records)
+        raise RuntimeError('indexing failed')
+
+    monkeypatch.setattr(db, 'index_inserted', fail_after_linking)
+    with pytest.raises(RuntimeError):
+        db.insert_records('candidate', [candidate('t1', 'A公司;B公司')])
+    monkeypatch.undo()
+
+    # The spool retries the batch; the company rows of the failed attempt were rolled back
+    assert db.insert_records('candidate', [candidate('t1', 'A公司;B公司')]) == 1
+    assert orphan_links(db) == 0
+    db.close()
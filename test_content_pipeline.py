@@ -0,0 +1,87 @@
+import configparser
+
+import pytest
+
+from content_pipeline import ContentPipeline, decode_content, html_to_text, sanitize_html
+from mock_site import MockSite
+
+DETAIL_BLOCK = (
+    '<div class="detail-content" id="content">\n'
+    '<script>var tracking = true;</script><style>p{margin:0}</style>\n'
+    '<p class="MsoNormal" style="margin:0;font-family:宋体" onclick="x()">项目编号：SDJT-2025-00001</p>\n'
+    '<!-- generated by Word -->\n'
+    '<p class="MsoNormal"><span style="font-size:12pt">  </span></p>\n'
+    '<p><a href="/files/1.pdf" style="color:red">招标文件</a></p>\n'
+    '<table><tr><td></td><td>金额</td></tr></table>\n'
+    '</div>'
+)
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    def write(**options):
+        config = configparser.ConfigParser()
+        config.read_dict({'Content': options})
+        path = tmp_path / 'config.ini'
+        with open(path, 'w', encoding='utf-8') as f:
+            config.write(f)
+        return str(path)
+    return write
+
+
+def test_sanitize_drops_scripts_styles_comments_and_presentational_attributes():
+    html = sanitize_html(DETAIL_BLOCK)
+
+    assert html.startswith('<div class="detail-content" id="content">')
+    for dropped in ('<script', '<style', 'Word', 'MsoNormal', 'style=', 'onclick', '<span'):
+        assert dropped not in html
+    assert '<p>项目编号：SDJT-2025-00001</p>' in html
+    assert '<a href="/files/1.pdf">招标文件</a>' in html
+    # Empty table cells keep the table layout
+    assert '<td></td><td>金额</td>' in html
+    assert '\n' not in html
+
+
+def test_html_to_text_keeps_one_line_per_block():
+    assert html_to_text(DETAIL_BLOCK) == '项目编号：SDJT-2025-00001\n招标文件\n金额'
+
+
+@pytest.mark.parametrize('mode', ['raw', 'minified', 'text', 'compressed'])
+def test_every_mode_decodes_to_the_same_text(mode, config_file):
+    pipeline = ContentPipeline(config_file(CONTENT_MODE=mode))
+    stored = pipeline.process(DETAIL_BLOCK)
+
+    assert html_to_text(decode_content(stored)) == html_to_text(DETAIL_BLOCK)
+    assert stored.startswith('zlib:') == (mode == 'compressed')
+
+
+def test_compressed_mode_shrinks_real_detail_pages(config_file):
+    site = MockSite()
+    pipeline = ContentPipeline(config_file(CONTENT_MODE='compressed'))
+    for index in range(20):
+        pipeline.apply({'content': site.render_detail_page('zbgg', index)})
+
+    summary = pipeline.summary()
+    assert summary['rows'] == 20
+    assert summary['ratio'] < 0.5
+    assert summary['saved_per_row'] > 0
+
+
+def test_text_column_gets_the_plain_text_of_the_raw_block(config_file):
+    pipeline = ContentPipeline(config_file(CONTENT_MODE='minified', TEXT_COLUMN='content_text'))
+    record = pipeline.apply({'content': DETAIL_BLOCK})
+
+    assert record['content'] == sanitize_html(DETAIL_BLOCK)
+    assert record['content_text'] == html_to_text(DETAIL_BLOCK)
+
+
+def test_unknown_mode_stores_raw_html(config_file):
+    pipeline = ContentPipeline(config_file(CONTENT_MODE='gzip'))
+    assert pipeline.mode == 'raw'
+    assert pipeline.process(DETAIL_BLOCK) == DETAIL_BLOCK
+
+
+def test_empty_content_is_left_alone(config_file):
+    pipeline = ContentPipeline(config_file(CONTENT_MODE='compressed'))
+    assert pipeline.apply({'content': None})['content'] == ''
+    assert decode_content(None) is None
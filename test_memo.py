@@ -0,0 +1,83 @@
+import json
+
+from memo import MemoCache
+
+
+class Counter:
+    """compute function counting its calls"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, key):
+        self.calls.append(key)
+        return key.upper()
+
+
+def test_values_are_computed_once_per_kind_and_key():
+    cache = MemoCache()
+    compute = Counter()
+    for _ in range(3):
+        assert cache.get('name', 'abc', compute) == 'ABC'
+    cache.get('line', 'abc', compute)
+
+    assert compute.calls == ['abc', 'abc']
+    assert cache.stats() == {'size': 2, 'hits': 2, 'misses': 2, 'hit_rate': 0.5}
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = MemoCache(maxsize=2)
+    compute = Counter()
+    cache.get('name', 'a', compute)
+    cache.get('name', 'b', compute)
+    cache.get('name', 'a', compute)
+    cache.get('name', 'c', compute)
+    cache.get('name', 'a', compute)
+    cache.get('name', 'b', compute)
+
+    assert compute.calls == ['a', 'b', 'c', 'b']
+
+
+def test_entries_survive_a_restart(tmp_path):
+    path = str(tmp_path / 'memo.json')
+    cache = MemoCache()
+    cache.configure(path=path)
+    cache.get('name', 'a', Counter())
+    cache.save()
+
+    restarted = MemoCache()
+    restarted.configure(path=path)
+    compute = Counter()
+    assert restarted.get('name', 'a', compute) == 'A'
+    assert compute.calls == []
+
+
+def test_file_of_other_cleaning_rules_is_ignored(tmp_path):
+    path = str(tmp_path / 'memo.json')
+    cache = MemoCache(version=1)
+    cache.get('name', 'a', Counter())
+    cache.save(path)
+
+    changed = MemoCache(version=2)
+    changed.configure(path=path)
+    assert changed.stats()['size'] == 0
+
+
+def test_load_keeps_the_most_recently_used_entries(tmp_path):
+    path = tmp_path / 'memo.json'
+    path.write_text(json.dumps({'version': 1, 'entries': [['name', key, key] for key in 'abcd']}), encoding='utf-8')
+
+    cache = MemoCache(maxsize=2)
+    cache.configure(path=str(path))
+    compute = Counter()
+    for key in 'dcba':
+        cache.get('name', key, compute)
+    assert compute.calls == ['b', 'a']
+
+
+def test_unreadable_file_is_ignored(tmp_path):
+    path = tmp_path / 'memo.json'
+    path.write_text('{not json', encoding='utf-8')
+    cache = MemoCache()
+    cache.configure(path=str(path))
+    assert cache.stats()['size'] == 0
@@ -0,0 +1,29 @@
+from near_duplicates import NearDuplicateIndex, hamming_distance, normalize_title, simhash, title_numbers
+
+ORIGINAL = 'XX市第一中学工程施工招标公告'
+
+
+def test_amended_titles_normalize_to_the_original():
+    for title in ['XX市第一中学工程施工招标更正公告', '关于XX市第一中学工程施工招标公告的更正公告',
+                  'XX市第一中学工程施工招标公告（重新）', 'XX市第一中学工程施工重新招标公告',
+                  'XX市第一中学 工程施工招标公告。']:
+        assert normalize_title(title) == normalize_title(ORIGINAL) == 'XX市第一中学工程施工'
+        assert hamming_distance(simhash(title), simhash(ORIGINAL)) == 0
+
+
+def test_marker_words_inside_the_name_are_kept():
+    assert normalize_title('重新装修工程招标公告') == '重新装修工程'
+    assert normalize_title('XX项目变更设计招标公告') == 'XX项目变更设计'
+
+
+def test_lot_numbers_are_kept_and_repost_counts_are_not():
+    assert title_numbers('XX项目2标段第二次招标公告') == title_numbers('XX项目2标段招标公告')
+    assert title_numbers('XX项目2标段招标公告') != title_numbers('XX项目3标段招标公告')
+
+
+def test_bands_fit_unsigned_int(tmp_path):
+    config_file = tmp_path / 'config.ini'
+    config_file.write_text('[NearDuplicates]\nMAX_DISTANCE = 0\n', encoding='utf-8')
+    index = NearDuplicateIndex(str(config_file))
+    assert index.max_distance == 1
+    assert [width for _, width in index.bands] == [32, 32]
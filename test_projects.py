@@ -0,0 +1,66 @@
+import configparser
+
+import pytest
+
+from load_test import SQLiteDatabaseManager, write_test_config
+from projects import normalize_project_code, normalize_project_name
+
+
+def make_db(tmp_path):
+    config_file = write_test_config(str(tmp_path), use_spool=False)
+    config = configparser.ConfigParser()
+    config.read(config_file, encoding='utf-8')
+    config.set('Projects', 'ENABLED', 'true')
+    with open(config_file, 'w', encoding='utf-8') as f:
+        config.write(f)
+    db = SQLiteDatabaseManager(str(tmp_path / 'test.db'), config_file)
+    assert db.connect()
+    return db
+
+
+def announcement(title, code=None):
+    record = {'title': title, 'time': '2025-07-19', 'content': '<p>x</p>'}
+    if code:
+        record['_project_code'] = code
+    return record
+
+
+def links(db):
+    cursor = db.connection.cursor()
+    cursor.execute(f"SELECT l.`table_name`, p.`code`, p.`norm_name` FROM `{db.projects.link_table}` l "
+                   f"LEFT JOIN `{db.projects.project_table}` p ON p.`id` = l.`project_id` "
+                   f"ORDER BY l.`table_name`, l.`record_id`")
+    return cursor.fetchall()
+
+
+def test_project_names_and_codes_are_normalized():
+    assert normalize_project_name('关于某某项目一标段招标公告') == normalize_project_name('某某项目一标段中标候选人公示')
+    assert normalize_project_code(' sdjt-2025-0012.') == 'SDJT-2025-0012'
+
+
+def test_announcement_and_candidate_share_a_project(tmp_path):
+    db = make_db(tmp_path)
+    db.insert_records('crawler', [announcement('某某项目招标公告', 'SDJT-1')])
+    db.insert_records('candidate', [dict(announcement('某某项目中标候选人公示'), candidate='A公司')])
+    assert links(db) == [('fa_candidate', 'SDJT-1', '某某项目'), ('fa_crawler', 'SDJT-1', '某某项目')]
+    db.close()
+
+
+def test_failed_batch_does_not_leave_cached_ids_behind(tmp_path, monkeypatch):
+    db = make_db(tmp_path)
+    index_inserted = db.index_inserted
+
+    def fail_after_linking(cursor, table_type, records):
+        index_inserted(cursor, table_type, records)
+        raise RuntimeError('indexing failed')
+
+    monkeypatch.setattr(db, 'index_inserted', fail_after_linking)
+    with pytest.raises(RuntimeError):
+        db.insert_records('crawler', [announcement('某某项目招标公告', 'SDJT-1')])
+    monkeypatch.undo()
+
+    # The retried batch and a later notice of the project link to a stored project row
+    db.insert_records('crawler', [announcement('某某项目招标公告', 'SDJT-1')])
+    db.insert_records('crawler', [announcement('某某项目变更公告', 'SDJT-1')])
+    assert links(db) == [('fa_crawler', 'SDJT-1', '某某项目')] * 2
+    db.close()
@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+
+from channels import RateLimiter
+from load_test import write_test_config
+from run_lock import RunLock
+from scraper import BidAnnouncementScraper
+
+
+def test_second_holder_is_refused_until_release(tmp_path):
+    first = RunLock('crawl-zbgg', str(tmp_path))
+    second = RunLock('crawl-zbgg', str(tmp_path))
+
+    assert first.acquire()
+    assert not second.acquire()
+    assert first.holder()['pid'] == os.getpid()
+
+    first.release()
+    assert second.acquire()
+    second.release()
+
+
+def test_locks_of_other_channels_are_independent(tmp_path):
+    zbgg = RunLock('crawl-zbgg', str(tmp_path))
+    hxrgs = RunLock('crawl-hxrgs', str(tmp_path))
+    assert zbgg.acquire()
+    assert hxrgs.acquire()
+    zbgg.release()
+    hxrgs.release()
+
+
+def test_lock_of_an_exited_process_is_free(tmp_path):
+    code = f"from run_lock import RunLock; assert RunLock('crawl-zbgg', {str(tmp_path)!r}).acquire()"
+    subprocess.run([sys.executable, '-c', code], check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+
+    lock = RunLock('crawl-zbgg', str(tmp_path))
+    assert lock.acquire()
+    lock.release()
+
+
+def test_scrape_is_skipped_while_another_crawl_holds_the_channel(tmp_path):
+    config_file = write_test_config(str(tmp_path), False)
+    scraper = BidAnnouncementScraper('2025-07-19', base_url='http://127.0.0.1:9', rate_limiter=RateLimiter(0),
+                                     config_file=config_file)
+    other = RunLock('crawl-zbgg', scraper.config.get('Scraping', 'LOCK_DIR'))
+    assert other.acquire()
+    try:
+        summary = scraper.scrape()
+    finally:
+        other.release()
+
+    assert summary['skipped']
+    assert summary['pages'] == 0
@@ -0,0 +1,67 @@
+import configparser
+from datetime import datetime, timedelta
+
+import pytest
+
+from checkpoint import CheckpointJournal
+from load_test import write_test_config
+from scheduler import CrawlTask, run_job
+
+
+def day(offset):
+    return (datetime.now() + timedelta(days=offset)).strftime('%Y-%m-%d')
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = write_test_config(str(tmp_path), False)
+    config = configparser.ConfigParser()
+    config.read(path, encoding='utf-8')
+    config.set('Schedule', 'CATCHUP_DAYS', '5')
+    with open(path, 'w', encoding='utf-8') as f:
+        config.write(f)
+    return path
+
+
+def test_job_runs_are_recorded_with_status_and_duration(config_file):
+    def broken():
+        raise RuntimeError('database gone')
+
+    assert run_job('daily_scraping', lambda: ('success', 'saved 3'), config_file) == 'success'
+    assert run_job('daily_scraping', broken, config_file) == 'failed'
+    assert run_job('daily_scraping', lambda: ('skipped', 'locked'), config_file) == 'skipped'
+
+    journal = CheckpointJournal(config_file)
+    try:
+        runs = journal.job_history('daily_scraping')
+        stats = journal.job_stats()
+    finally:
+        journal.close()
+    assert [(run['status'], run['detail']) for run in runs] == [
+        ('skipped', 'locked'), ('failed', 'database gone'), ('success', 'saved 3')]
+    assert all(run['finished_at'] and run['duration'] is not None for run in runs)
+    assert [(row['runs'], row['success'], row['failed'], row['skipped']) for row in stats] == [(3, 1, 1, 1)]
+
+
+def test_missed_runs_count_as_skipped(config_file):
+    journal = CheckpointJournal(config_file)
+    try:
+        journal.begin_job('daily_scraping', 'missed', 'scheduled at 08:00')
+        journal.begin_job('daily_scraping', 'overlap', 'scheduled at 08:00')
+        assert journal.job_stats()[0]['skipped'] == 2
+    finally:
+        journal.close()
+
+
+def test_days_without_a_finished_run_of_every_channel_are_missing(config_file):
+    journal = CheckpointJournal(config_file)
+    try:
+        journal.finish(journal.begin('zbgg', day(-5), day(-3)))
+        journal.finish(journal.begin('hxrgs', day(-5), day(-4)))
+        journal.finish(journal.begin('zbgg', day(-1), day(0)))
+        journal.finish(journal.begin('hxrgs', day(-1), day(0)))
+    finally:
+        journal.close()
+
+    assert CrawlTask(config_file).find_missing_dates(['zbgg', 'hxrgs']) == [day(-3), day(-2)]
+    assert CrawlTask(config_file).find_missing_dates(['zbgg']) == [day(-2)]
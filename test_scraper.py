@@ -0,0 +1,58 @@
+import logging
+
+import pytest
+import requests
+
+from channels import CrawlBudget, RateLimiter
+from load_test import write_test_config
+from mock_site import MockSite, MockSiteConfig
+from scraper import BidAnnouncementScraper
+
+
+@pytest.fixture
+def site():
+    # 400 items of about 200 bytes each, a list page is several times CHUNK_SIZE
+    site = MockSite(MockSiteConfig(pages=1, items_per_page=400, items_per_day=10, start_date='2025-07-20')).start()
+    yield site
+    site.server.shutdown()
+
+
+@pytest.fixture
+def scraper(site, tmp_path):
+    return BidAnnouncementScraper('2025-07-19', base_url=site.url, rate_limiter=RateLimiter(0),
+                                  config_file=write_test_config(str(tmp_path), False))
+
+
+def test_list_page_reading_stops_after_the_first_older_item(scraper, caplog):
+    caplog.set_level(logging.DEBUG)
+    links, should_continue = scraper.fetch_links(scraper.list_url)
+
+    assert [link.date for link in links] == ['2025-07-19'] * 10
+    assert not should_continue
+    assert any(record.getMessage().startswith('[zbgg] Stopped reading') for record in caplog.records)
+    assert not [record for record in caplog.records if record.levelno >= logging.WARNING]
+    assert sum('Extracted 10 links' in record.getMessage() for record in caplog.records) == 1
+
+
+def test_partial_page_without_the_list_keeps_reading(scraper, caplog):
+    caplog.set_level(logging.INFO)
+    assert scraper.extract_links('<html><head><style>', partial=True) == ([], True)
+    assert not caplog.records
+
+
+def test_fetch_with_zero_retries_still_tries_once(scraper, site):
+    with pytest.raises(requests.HTTPError):
+        scraper.fetch(site.url + '/zbgg/missing.html', max_retries=0)
+    assert site.stats['not_found'] == 1
+
+
+def test_request_budget_counts_fetches_and_warns_once(scraper, caplog):
+    scraper.budget = CrawlBudget(max_requests=2)
+    scraper.fetch_links(scraper.list_url)
+    assert not scraper.budget_exhausted()
+    scraper.fetch_links(scraper.list_url)
+
+    assert scraper.budget_exhausted()
+    assert scraper.budget_exhausted()
+    assert scraper.budget.requests == 2
+    assert sum('budget exhausted' in record.getMessage() for record in caplog.records) == 1
@@ -0,0 +1,66 @@
+import sqlite3
+
+import pytest
+
+from content_pipeline import compress_content
+from search_index import SearchIndex
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SearchIndex(path=str(tmp_path / 'search.db'))
+    yield index
+    index.close()
+
+
+def announcement(title, time_str, tenderer='', content=''):
+    return {'title': title, 'time': time_str, 'tenderer': tenderer, 'content': content}
+
+
+def titles(results):
+    return [result['title'] for result in results]
+
+
+def test_search_matches_any_field_newest_first(index):
+    index.add_records('crawler', [
+        announcement('成都绕城高速改造工程', '2025-07-18', tenderer='四川测试01投资集团有限公司'),
+        announcement('绵阳隧道施工招标', '2025-07-19', content='<p>本项目位于成都市</p>'),
+    ])
+
+    assert titles(index.search('成都市')) == ['绵阳隧道施工招标']
+    assert titles(index.search('成都')) == ['绵阳隧道施工招标', '成都绕城高速改造工程']
+    assert titles(index.search('测试01投资')) == ['成都绕城高速改造工程']
+
+
+def test_search_by_field_and_table(index):
+    index.add_records('crawler', [announcement('四川测试项目招标', '2025-07-19', tenderer='四川测试集团')])
+    index.add_records('candidate', [{'title': '候选人公示', 'time': '2025-07-19', 'candidate': '四川测试集团'}])
+
+    assert titles(index.search('四川测试', field='title')) == ['四川测试项目招标']
+    assert titles(index.search('四川测试集团', field='candidate')) == ['候选人公示']
+    assert titles(index.search('四川测试集团', table_name='crawler')) == ['四川测试项目招标']
+    with pytest.raises(ValueError):
+        index.search('四川', field='address')
+
+
+def test_same_record_replaces_its_entry(index):
+    index.add_records('crawler', [announcement('隧道工程招标', '2025-07-19', content='<p>开标时间七月</p>')])
+    index.add_records('crawler', [announcement('隧道工程招标', '2025-07-19', content='<p>更正公告：开标时间顺延</p>')])
+
+    assert index.count() == 1
+    assert titles(index.search('顺延')) == ['隧道工程招标']
+    assert index.search('开标时间七月') == []
+
+
+def test_compressed_content_is_indexed_as_text(index):
+    index.add_records('crawler', [announcement('桥梁工程招标', '2025-07-19',
+                                               content=compress_content('<div><p>钢箱梁制作安装</p></div>'))])
+
+    assert titles(index.search('钢箱梁')) == ['桥梁工程招标']
+    assert index.search('zlib') == []
+
+
+def test_failed_batch_leaves_the_index_unchanged(index):
+    with pytest.raises(sqlite3.IntegrityError):
+        index.add_records('crawler', [announcement('第一条', '2025-07-19'), announcement(None, '2025-07-19')])
+    assert index.count() == 0
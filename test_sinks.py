@@ -0,0 +1,71 @@
+import csv
+import json
+import sqlite3
+
+from sinks import BatchedSink, CsvSink, JsonlSink, MultiSink, SQLiteSink, parse_sink_spec
+
+TABLES = {'crawler': 'fa_crawler', 'candidate': 'fa_candidate'}
+
+
+def candidate(title, **extra):
+    return dict({'title': title, 'time': '2025-07-19', 'content': '<p>x</p>', 'candidate': 'A公司'}, **extra)
+
+
+def test_fetch_metadata_is_not_exported(tmp_path):
+    sink = MultiSink([JsonlSink(str(tmp_path / 'out.jsonl'), TABLES)])
+    sink.write('candidate', candidate('t1', _url='http://x/1.html', _etag='"1"', _project_code='P-1'))
+    sink.close()
+    row = json.loads((tmp_path / 'out.jsonl').read_text(encoding='utf-8'))
+    assert not [key for key in row if key.startswith('_')]
+    assert row['table'] == 'fa_candidate' and row['createtime']
+
+
+def test_later_records_with_new_keys_keep_the_columns(tmp_path):
+    db_path = str(tmp_path / 'out.db')
+    csv_path = str(tmp_path / 'out_{table}.csv')
+    sink = MultiSink([SQLiteSink(db_path, batch_size=1, table_names=TABLES), CsvSink(csv_path, TABLES)],
+                     extra_columns=['text'])
+    sink.write('candidate', candidate('t1'))
+    sink.write('candidate', candidate('t2', _last_modified='Sat, 19 Jul 2025', text='plain'))
+    sink.close()
+
+    connection = sqlite3.connect(db_path)
+    rows = connection.execute('SELECT title, text FROM fa_candidate ORDER BY id').fetchall()
+    assert rows == [('t1', ''), ('t2', 'plain')]
+    with open(csv_path.format(table='fa_candidate'), encoding='utf-8-sig') as f:
+        records = list(csv.DictReader(f))
+    assert [record['text'] for record in records] == ['', 'plain']
+    assert '_last_modified' not in records[0]
+
+
+def test_sqlite_sink_adds_columns_configured_later(tmp_path):
+    db_path = str(tmp_path / 'out.db')
+    first = MultiSink([SQLiteSink(db_path, table_names=TABLES)])
+    first.write('candidate', candidate('t1'))
+    first.close()
+    second = MultiSink([SQLiteSink(db_path, table_names=TABLES)], extra_columns=['text'])
+    second.write('candidate', candidate('t2', text='plain'))
+    second.close()
+    assert sqlite3.connect(db_path).execute('SELECT COUNT(*) FROM fa_candidate').fetchone()[0] == 2
+
+
+def test_failed_batch_is_dropped():
+    class FlakySink(BatchedSink):
+        def __init__(self):
+            super().__init__(batch_size=2)
+            self.batches = []
+
+        def write_batch(self, table, records):
+            if records[0] == 'bad':
+                raise ValueError('bad batch')
+            self.batches.append(list(records))
+
+    sink = FlakySink()
+    for record in ['bad', 'x', 'a', 'b', 'c']:
+        sink.write('crawler', record)
+    sink.flush()
+    assert sink.batches == [['a', 'b'], ['c']]
+
+
+def test_parse_sink_spec():
+    assert parse_sink_spec('mysql, jsonl:out.jsonl,csv') == [('mysql', None), ('jsonl', 'out.jsonl'), ('csv', None)]
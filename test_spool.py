@@ -0,0 +1,74 @@
+import pytest
+
+from spool import RecordSpool, SpoolDrainer
+
+
+class FakeConnection:
+    open = True
+
+
+class FakeDatabase:
+    """Stands in for DatabaseManager, insert_records fails while failing is set"""
+
+    def __init__(self):
+        self.connection = FakeConnection()
+        self.failing = False
+        self.inserted = []
+
+    def connect(self):
+        self.connection = FakeConnection()
+        return True
+
+    def close(self):
+        self.connection = None
+
+    def insert_records(self, table_type, records):
+        if self.failing:
+            raise RuntimeError('database gone')
+        self.inserted += [(table_type, record['title']) for record in records]
+        return len(records)
+
+
+@pytest.fixture
+def spool(tmp_path):
+    spool = RecordSpool(path=str(tmp_path / 'spool.db'))
+    yield spool
+    spool.close()
+
+
+def test_claimed_records_are_not_claimed_twice(spool):
+    for title in ['a', 'b', 'c']:
+        spool.append('crawler', {'title': title})
+    first = spool.claim(2)
+    assert [record['title'] for _, _, record in first] == ['a', 'b']
+    assert [record['title'] for _, _, record in spool.claim(2)] == ['c']
+    assert spool.claim(2) == []
+    spool.ack([row_id for row_id, _, _ in first])
+    assert spool.count() == 1
+
+
+def test_released_and_expired_claims_are_claimed_again(spool):
+    spool.append('crawler', {'title': 'a'})
+    spool.append('crawler', {'title': 'b'})
+    released = spool.claim(1)
+    spool.release([row_id for row_id, _, _ in released])
+    assert [record['title'] for _, _, record in spool.claim(1)] == ['a']
+    spool.claim(1, claim_seconds=0)
+    assert [record['title'] for _, _, record in spool.claim(2)] == ['b']
+
+
+def test_drainer_acks_loaded_records_and_keeps_failed_ones(spool):
+    db = FakeDatabase()
+    drainer = SpoolDrainer(spool, db)
+    spool.append('candidate', {'title': 'a'})
+    spool.append('crawler', {'title': 'b'})
+
+    db.failing = True
+    with pytest.raises(RuntimeError):
+        drainer.drain_once()
+    assert spool.count() == 2 and db.connection is None
+
+    db.failing = False
+    assert drainer.drain_once() == 2
+    assert sorted(db.inserted) == [('candidate', 'a'), ('crawler', 'b')]
+    assert spool.count() == 0
@@ -0,0 +1,61 @@
+import time
+
+import pytest
+
+from work_queue import RedisWorkQueue, SQLiteWorkQueue
+
+
+@pytest.fixture(params=['sqlite', 'redis'])
+def make_queue(request, tmp_path):
+    """Factory of empty queues of one backend sharing the same storage"""
+    if request.param == 'sqlite':
+        return lambda **kwargs: SQLiteWorkQueue(str(tmp_path / 'queue.db'), **kwargs)
+    fakeredis = pytest.importorskip('fakeredis')
+    pytest.importorskip('lupa')
+    server = fakeredis.FakeServer()
+    return lambda **kwargs: RedisWorkQueue(
+        client=fakeredis.FakeRedis(server=server, decode_responses=True), **kwargs)
+
+
+def test_put_deduplicates(make_queue):
+    queue = make_queue()
+    assert queue.put('zbgg:/a.html', {'href': '/a.html'})
+    assert not queue.put('zbgg:/a.html', {'href': '/a.html'})
+    task = queue.lease('w1')
+    assert queue.complete(task.task_id, 'w1')
+    assert not queue.put('zbgg:/a.html', {'href': '/a.html'})
+    assert queue.lease('w1') is None
+
+
+def test_lease_and_complete(make_queue):
+    queue = make_queue()
+    queue.put('t1', {'href': '/1.html'})
+    task = queue.lease('w1')
+    assert (task.task_id, task.payload, task.attempts) == ('t1', {'href': '/1.html'}, 1)
+    assert queue.lease('w2') is None
+    assert queue.complete('t1', 'w1')
+    assert queue.stats().get('done') == 1
+
+
+def test_expired_lease_is_released_to_another_worker(make_queue):
+    queue = make_queue(lease_seconds=0)
+    queue.put('t1', {})
+    queue.lease('w1')
+    time.sleep(0.01)
+    task = queue.lease('w2')
+    assert task.task_id == 't1' and task.attempts == 2
+    # The first worker lost its lease and cannot finish the task any more
+    assert not queue.complete('t1', 'w1')
+    assert not queue.fail('t1', 'w1', 'late')
+    assert queue.complete('t1', 'w2')
+
+
+def test_fail_requeues_until_max_attempts(make_queue):
+    queue = make_queue(max_attempts=2)
+    queue.put('t1', {})
+    assert queue.fail(queue.lease('w1').task_id, 'w1', 'timeout')
+    task = queue.lease('w1')
+    assert task.attempts == 2
+    assert queue.fail(task.task_id, 'w1', 'timeout')
+    assert queue.lease('w1') is None
+    assert queue.stats().get('failed') == 1
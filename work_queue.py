@@ -0,0 +1,281 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from settings import load_config
+
+
+class Task:
+    """A leased detail-page task"""
+
+    def __init__(self, task_id, payload, attempts):
+        self.task_id = task_id
+        self.payload = payload
+        self.attempts = attempts
+
+    def __repr__(self):
+        return f"Task({self.task_id!r}, attempts={self.attempts})"
+
+
+class WorkQueue:
+    """Work Queue Interface - shared queue of detail-page tasks with leases
+
+    A task id is put at most once: re-putting a queued, leased or finished task is ignored,
+    which deduplicates work across coordinators. Leases that are not completed within
+    lease_seconds become available again until max_attempts is reached. Only the worker
+    holding the current lease can complete or fail a task, so a worker whose lease expired
+    cannot finish a task that was handed to another worker.
+    """
+
+    def __init__(self, lease_seconds=300, max_attempts=3):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    def put(self, task_id, payload):
+        """Enqueue a task, returns True if it was new"""
+        raise NotImplementedError
+
+    def lease(self, worker_id):
+        """Lease the next available task, or None when nothing is available"""
+        raise NotImplementedError
+
+    def complete(self, task_id, worker_id):
+        """Mark a task leased by worker_id as done, returns False if the worker no longer holds the lease"""
+        raise NotImplementedError
+
+    def fail(self, task_id, worker_id, error):
+        """Return a task leased by worker_id to the queue, or mark it failed after max_attempts
+
+        Returns False if the worker no longer holds the lease.
+        """
+        raise NotImplementedError
+
+    def stats(self):
+        """Task counts by status"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """Work queue in a SQLite file, shared by worker processes on one machine
+
+    The file must be on a local disk: WAL mode does not work on network file systems. Use
+    the Redis backend for workers on several machines.
+    """
+
+    def __init__(self, path='work_queue.db', lease_seconds=300, max_attempts=3):
+        super().__init__(lease_seconds, max_attempts)
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                task_id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_owner TEXT,
+                lease_expires REAL NOT NULL DEFAULT 0,
+                last_error TEXT,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        self.connection.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, lease_expires)")
+
+    def put(self, task_id, payload):
+        now = datetime.now().isoformat(timespec='seconds')
+        with self.lock:
+            cursor = self.connection.execute(
+                "INSERT OR IGNORE INTO tasks (task_id, payload, status, updated_at) VALUES (?, ?, 'queued', ?)",
+                (task_id, json.dumps(payload, ensure_ascii=False), now))
+            return cursor.rowcount > 0
+
+    def lease(self, worker_id):
+        now = time.time()
+        with self.lock:
+            # IMMEDIATE takes the write lock up front so two workers cannot lease the same task
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    row = self.connection.execute(
+                        "SELECT task_id, payload, attempts FROM tasks "
+                        "WHERE status = 'queued' OR (status = 'leased' AND lease_expires < ?) "
+                        "ORDER BY rowid LIMIT 1", (now,)).fetchone()
+                    if row is None:
+                        self.connection.execute("COMMIT")
+                        return None
+
+                    task_id, payload, attempts = row
+                    if attempts < self.max_attempts:
+                        break
+                    # An expired lease on the last attempt is a failure, not a retry
+                    self.connection.execute(
+                        "UPDATE tasks SET status = 'failed', last_error = 'lease expired', updated_at = ? WHERE task_id = ?",
+                        (datetime.now().isoformat(timespec='seconds'), task_id))
+
+                self.connection.execute(
+                    "UPDATE tasks SET status = 'leased', attempts = attempts + 1, lease_owner = ?, "
+                    "lease_expires = ?, updated_at = ? WHERE task_id = ?",
+                    (worker_id, now + self.lease_seconds, datetime.now().isoformat(timespec='seconds'), task_id))
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+        return Task(task_id, json.loads(payload), attempts + 1)
+
+    def complete(self, task_id, worker_id):
+        with self.lock:
+            cursor = self.connection.execute(
+                "UPDATE tasks SET status = 'done', lease_owner = NULL, updated_at = ? "
+                "WHERE task_id = ? AND status = 'leased' AND lease_owner = ?",
+                (datetime.now().isoformat(timespec='seconds'), task_id, worker_id))
+            return cursor.rowcount > 0
+
+    def fail(self, task_id, worker_id, error):
+        with self.lock:
+            cursor = self.connection.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+                "lease_owner = NULL, lease_expires = 0, last_error = ?, updated_at = ? "
+                "WHERE task_id = ? AND status = 'leased' AND lease_owner = ?",
+                (self.max_attempts, str(error)[:500], datetime.now().isoformat(timespec='seconds'), task_id, worker_id))
+            return cursor.rowcount > 0
+
+    def stats(self):
+        with self.lock:
+            rows = self.connection.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+# Requeues expired leases, then moves the next pending task to the leases, in one atomic step:
+# a worker that dies between the steps cannot lose a task
+LEASE_SCRIPT = """
+local pending, payloads, leases, attempts, owners, failed = KEYS[1], KEYS[2], KEYS[3], KEYS[4], KEYS[5], KEYS[6]
+local now, max_attempts = tonumber(ARGV[1]), tonumber(ARGV[3])
+for _, id in ipairs(redis.call('ZRANGEBYSCORE', leases, 0, now)) do
+    redis.call('ZREM', leases, id)
+    redis.call('HDEL', owners, id)
+    if tonumber(redis.call('HGET', attempts, id) or 0) >= max_attempts then
+        redis.call('SADD', failed, id)
+    else
+        redis.call('RPUSH', pending, id)
+    end
+end
+local id = redis.call('LPOP', pending)
+if not id then
+    return false
+end
+redis.call('ZADD', leases, now + tonumber(ARGV[2]), id)
+redis.call('HSET', owners, id, ARGV[4])
+local count = redis.call('HINCRBY', attempts, id, 1)
+return {id, redis.call('HGET', payloads, id), count}
+"""
+
+# Completes or fails a task if the worker still holds its lease, returns 1 if it did
+RELEASE_SCRIPT = """
+local leases, owners, attempts, pending, done, failed = KEYS[1], KEYS[2], KEYS[3], KEYS[4], KEYS[5], KEYS[6]
+local id = ARGV[1]
+if redis.call('HGET', owners, id) ~= ARGV[2] then
+    return 0
+end
+redis.call('ZREM', leases, id)
+redis.call('HDEL', owners, id)
+if ARGV[3] == 'done' then
+    redis.call('SADD', done, id)
+elseif tonumber(redis.call('HGET', attempts, id) or 0) >= tonumber(ARGV[4]) then
+    redis.call('SADD', failed, id)
+else
+    redis.call('RPUSH', pending, id)
+end
+return 1
+"""
+
+
+class RedisWorkQueue(WorkQueue):
+    """Work queue on Redis (or a Redis-compatible server), shared by workers on several machines
+
+    Leasing, completing and failing run as Lua scripts, so each is atomic on the server.
+    Pass an existing client to use a stand-in such as fakeredis in tests.
+    """
+
+    def __init__(self, url='redis://localhost:6379/0', prefix='zb', lease_seconds=300, max_attempts=3, client=None):
+        super().__init__(lease_seconds, max_attempts)
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise ImportError("The redis package is required for QUEUE_BACKEND = redis (pip install redis)")
+            client = redis.Redis.from_url(url, decode_responses=True)
+        self.client = client
+        self.keys = {
+            'pending': f"{prefix}:pending",     # list of queued task ids
+            'payloads': f"{prefix}:payloads",   # hash task id -> payload
+            'leases': f"{prefix}:leases",       # sorted set task id -> lease expiry
+            'attempts': f"{prefix}:attempts",   # hash task id -> attempts
+            'owners': f"{prefix}:owners",       # hash task id -> worker holding the lease
+            'done': f"{prefix}:done",           # set of finished task ids
+            'failed': f"{prefix}:failed",       # set of failed task ids
+        }
+        self.lease_script = self.client.register_script(LEASE_SCRIPT)
+        self.release_script = self.client.register_script(RELEASE_SCRIPT)
+
+    def put(self, task_id, payload):
+        # HSETNX makes the payload hash the dedupe record for every task ever put
+        if not self.client.hsetnx(self.keys['payloads'], task_id, json.dumps(payload, ensure_ascii=False)):
+            return False
+        self.client.rpush(self.keys['pending'], task_id)
+        return True
+
+    def lease(self, worker_id):
+        keys = [self.keys[name] for name in ('pending', 'payloads', 'leases', 'attempts', 'owners', 'failed')]
+        result = self.lease_script(keys=keys, args=[time.time(), self.lease_seconds, self.max_attempts, worker_id])
+        if not result:
+            return None
+        task_id, payload, attempts = result
+        return Task(task_id, json.loads(payload), int(attempts))
+
+    def release(self, task_id, worker_id, action):
+        keys = [self.keys[name] for name in ('leases', 'owners', 'attempts', 'pending', 'done', 'failed')]
+        return bool(self.release_script(keys=keys, args=[task_id, worker_id, action, self.max_attempts]))
+
+    def complete(self, task_id, worker_id):
+        return self.release(task_id, worker_id, 'done')
+
+    def fail(self, task_id, worker_id, error):
+        return self.release(task_id, worker_id, 'fail')
+
+    def stats(self):
+        return {
+            'queued': self.client.llen(self.keys['pending']),
+            'leased': self.client.zcard(self.keys['leases']),
+            'done': self.client.scard(self.keys['done']),
+            'failed': self.client.scard(self.keys['failed']),
+        }
+
+
+def open_queue(config_file='config.ini'):
+    """Open the work queue backend configured in the [Distributed] section"""
+    config = load_config(config_file)
+    backend = config.get('Distributed', 'QUEUE_BACKEND', fallback='sqlite').strip().lower()
+    lease_seconds = config.getint('Distributed', 'LEASE_SECONDS', fallback=300)
+    max_attempts = config.getint('Distributed', 'MAX_ATTEMPTS', fallback=3)
+
+    if backend == 'redis':
+        return RedisWorkQueue(
+            url=config.get('Distributed', 'REDIS_URL', fallback='redis://localhost:6379/0'),
+            prefix=config.get('Distributed', 'QUEUE_NAME', fallback='zb'),
+            lease_seconds=lease_seconds, max_attempts=max_attempts)
+    if backend != 'sqlite':
+        logging.warning(f"Unknown queue backend {backend}, using sqlite")
+    return SQLiteWorkQueue(
+        path=config.get('Distributed', 'QUEUE_FILE', fallback='work_queue.db'),
+        lease_seconds=lease_seconds, max_attempts=max_attempts)